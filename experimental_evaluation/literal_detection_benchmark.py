@@ -0,0 +1,69 @@
+import random
+import re
+import string
+import timeit
+from typing import List, Tuple, Union
+
+from tabbyld2.helpers.utility import is_float
+from tabbyld2.preprocessing.labels import LiteralLabel, NamedEntityLabel
+from tabbyld2.preprocessing.literal_detector import COMPLEX_NUMERICAL_PATTERNS, ENTITY_MENTION_PATTERNS, LITERAL_DETECTOR, \
+    NUMBER_PATTERNS
+
+
+SAMPLE_VALUES = ["Moscow", "Leo Tolstoy", "United States of America", "1984", "-42", "3.14", "0,5", "2021-07-15", "1234-567X",
+                 "ISBN 9783161484100", "192.168.0.1", "4111-1111-1111-1111", "#ffaa00", "55.75, 37.62", "+7 903 123 4567",
+                 "36.6 °C", "0x1F", "deadbeef", "true", "False", "664033", "12345-6789", "john.smith@mail.com", "user id 15",
+                 "http://dbpedia.org", "www.example.com", "N/A", "-", "Moscow State University", "The Lord of the Rings"]
+
+
+def detect_sequentially(text: str, patterns: Tuple[Tuple[LiteralLabel, str], ...]) -> Union[LiteralLabel, NamedEntityLabel]:
+    """
+    Detect a literal label by searching patterns one after another (reference detection without precompiled patterns)
+    :param text: an input textual value
+    :param patterns: pairs of a literal label and a pattern in order of priority
+    :return: a literal label or NONE
+    """
+    for label, pattern in patterns:
+        if re.search(pattern, text):
+            return label
+    return NamedEntityLabel.NONE
+
+
+def classify_sequentially(text: str) -> List[Union[LiteralLabel, NamedEntityLabel]]:
+    number = detect_sequentially(text, NUMBER_PATTERNS)
+    if number == NamedEntityLabel.NONE and is_float(text):
+        number = LiteralLabel.FLOAT
+    return [number, detect_sequentially(text, COMPLEX_NUMERICAL_PATTERNS), detect_sequentially(text, ENTITY_MENTION_PATTERNS)]
+
+
+def classify_by_detector(text: str) -> List[Union[LiteralLabel, NamedEntityLabel]]:
+    return [LITERAL_DETECTOR.determine_number(text), LITERAL_DETECTOR.determine_complex_numerical_values(text),
+            LITERAL_DETECTOR.determine_entity_mention(text)]
+
+
+def generate_values(number: int, seed: int = 0) -> List[str]:
+    """
+    Generate values for a benchmark: sample values and their random mutations
+    :param number: number of values
+    :param seed: a seed of a random generator
+    :return: a list of textual values
+    """
+    generator, alphabet = random.Random(seed), string.ascii_letters + string.digits + " .,-#@:/°x'"
+    values = []
+    while len(values) < number:
+        value = list(generator.choice(SAMPLE_VALUES))
+        for _ in range(generator.randint(0, 3)):
+            value.insert(generator.randint(0, len(value)), generator.choice(alphabet))
+        values.append("".join(value))
+    return values
+
+
+if __name__ == "__main__":
+    benchmark_values = generate_values(20000)
+    mismatches = [value for value in benchmark_values if classify_sequentially(value) != classify_by_detector(value)]
+    print("Mismatches: " + str(len(mismatches)) + (" " + str(mismatches[:10]) if mismatches else ""))
+    sequential_time = min(timeit.repeat(lambda: [classify_sequentially(value) for value in benchmark_values], number=1, repeat=5))
+    detector_time = min(timeit.repeat(lambda: [classify_by_detector(value) for value in benchmark_values], number=1, repeat=5))
+    print("Sequential search: " + str(round(sequential_time, 4)) + " s")
+    print("Precompiled detector: " + str(round(detector_time, 4)) + " s")
+    print("Speedup: " + str(round(sequential_time / detector_time, 2)) + "x")
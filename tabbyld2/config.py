@@ -64,3 +64,59 @@ class EvaluationPath:
     COLUMN_TYPE_ANNOTATION_EVALUATION = "column_type_annotation.json"
     COLUMNS_PROPERTY_ANNOTATION_EVALUATION = "columns_property_annotation.json"
     TOTAL_EVALUATION = "total_evaluation.json"  # JSON file of dataset evaluation
+
+
+class CacheConfig:
+    # Flag to enable or disable the persistent cache of DBpedia SPARQL Endpoint responses
+    SPARQL_CACHE_ENABLED = True
+    # Path to SQLite database file with cached responses of DBpedia SPARQL Endpoint
+    SPARQL_CACHE_PATH = str(Path(__file__).parent.parent) + "/results/cache/sparql_responses.sqlite3"
+    SPARQL_CACHE_TTL = 30 * 24 * 60 * 60  # Time to live for cached responses (in seconds)
+    SPARQL_CACHE_MAX_ENTRIES = 1000000  # Maximum number of cached responses (least recently used ones are evicted first)
+
+
+class ConcurrencyConfig:
+    MAX_WORKERS = 8  # Maximum number of concurrent workers for candidate entity lookup (1 means sequential lookup)
+    DEFAULT_REQUESTS_PER_SECOND = None  # Maximum request rate for hosts without explicit limit (None means unlimited)
+    REQUESTS_PER_SECOND = {"dbpedia.org": 10}  # Maximum request rate for each host
+
+
+class HTTPConfig:
+    POOL_SIZE = 16  # Maximum number of keep-alive connections to each endpoint
+    MAX_RETRIES = 5  # Maximum number of retries for failed requests
+    BACKOFF_FACTOR = 0.5  # Factor for exponential backoff between retries (in seconds)
+    RETRY_STATUSES = (429, 500, 502, 503, 504)  # HTTP statuses for which requests are retried
+
+
+class PreprocessingConfig:
+    COLUMNAR_TABLE_MODEL_ENABLED = False  # Keep cell values of tables in per-column arrays of interned values (cells are lazy views)
+    PANDAS_CLEANING_ENABLED = False  # Clean plain (ASCII) values of a whole column at once by pandas string methods
+    NER_BATCH_SIZE = 256  # Number of distinct cell values processed by Stanford NER in one call
+    CELL_LABEL_CACHE_SIZE = 100000  # Maximum number of cell values with memoized labels shared by all tables (None means unlimited)
+    LITERAL_FAST_PATH_ENABLED = True  # Label unambiguous literal values (numbers, booleans, emails, etc.) without NER
+    LITERAL_COLUMN_SAMPLE_SIZE = 20  # Number of sampled cells of a column for detection of literal columns
+    LITERAL_COLUMN_THRESHOLD = 0.9  # Minimal share of unambiguous literals in a column sample to skip NER for a whole column
+    # Classify columns by samples of cells with early stopping, where other cells are labeled lazily (only when annotation steps
+    # read their labels, deferred labels are not serialized)
+    COLUMN_SAMPLING_ENABLED = False
+    SAMPLING_BATCH_SIZE = 32  # Number of cells of a column labeled at each sampling step
+    SAMPLING_CONFIDENCE = 0.95  # Confidence level for the decision between categorical and literal column types
+    DUCKLING_BATCH_SIZE = 512  # Number of distinct cell values joined into one Duckling call for time detection
+    DATE_PARSER_LANGUAGES = ["en", "ru"]  # Languages of DateParser (language detection over all installed locales is skipped)
+    TEMPORAL_CACHE_SIZE = 100000  # Maximum number of cell values with memoized time and date detection results
+
+
+class EmbeddingsConfig:
+    ENTITY_MODEL_PATH = "model"  # Path to a Word2Vec model (or KeyedVectors) of DBpedia entity embeddings saved by gensim
+
+
+class KnowledgeBaseConfig:
+    # Path to SQLite database file of a local knowledge base with a DBpedia subset (None means remote DBpedia services are used)
+    LOCAL_KB_PATH = None
+    FUZZY_SEARCH_ENABLED = False  # Enable approximate search of candidate entities with typos by a trigram index of labels
+    # Path to a DBpedia labels dump (*.ttl, *.nt) for a trigram index (labels of a local knowledge base are used if it is set)
+    LABELS_DUMP_PATH = None
+    FUZZY_SEARCH_MAX_RESULTS = 10  # Maximum number of candidate entities found by approximate search
+    CONTEXT_BATCH_SIZE = 50  # Maximum number of entities in one query for contexts (subjects and objects from RDF triples)
+    CONTEXT_CACHE_SIZE = 100000  # Maximum number of entities with memoized contexts (None means unlimited)
+    IDENTIFIER_CACHE_SIZE = 1000000  # Maximum number of memoized internal identifiers of resources of a local knowledge base
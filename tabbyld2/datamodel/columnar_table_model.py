@@ -0,0 +1,259 @@
+from array import array
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from tabbyld2.datamodel.knowledge_graph_model import EntityModel
+from tabbyld2.datamodel.tabular_data_model import AbstractColumnCellModel, ColumnProfile, TableColumnModel, TableModel
+from tabbyld2.preprocessing.cleaner import clean_values, fix_text, remove_multiple_spaces
+from tabbyld2.preprocessing.labels import LiteralLabel, NamedEntityLabel
+
+
+# Identifier of an absent value (None) in column arrays
+NONE_IDENTIFIER = -1
+
+
+class ValuePool:
+    """
+    Pool of interned cell values (source and cleared values, labels, annotations) shared by all columns of a table,
+    where values are distinguished by their types and a list label is stored as a tuple
+    """
+    __slots__ = ("_values", "_identifiers")
+
+    def __init__(self):
+        self._values: List[Any] = []
+        self._identifiers: Dict[Tuple[type, Any], int] = {}
+
+    def __len__(self):
+        return len(self._values)
+
+    def add(self, value: Any) -> int:
+        """
+        Intern a value
+        :param value: a cell value
+        :return: an identifier of a value in a pool
+        """
+        if value is None:
+            return NONE_IDENTIFIER
+        if isinstance(value, list):
+            value = tuple(value)
+        # Values are keyed with their types, so equal values of different types (e.g. 1, 1.0 and True) are not merged
+        key = (type(value), value)
+        identifier = self._identifiers.get(key)
+        if identifier is None:
+            identifier = self._identifiers[key] = len(self._values)
+            self._values.append(value)
+        return identifier
+
+    def get(self, identifier: int) -> Any:
+        """
+        Get a value by its identifier
+        :param identifier: an identifier of a value in a pool
+        :return: a cell value
+        """
+        if identifier == NONE_IDENTIFIER:
+            return None
+        value = self._values[identifier]
+        return list(value) if isinstance(value, tuple) else value
+
+
+class ColumnarCellView(AbstractColumnCellModel):
+    """
+    Lightweight view of a cell in column arrays with the same API as ColumnCellModel
+    """
+    __slots__ = ("_cells", "_row")
+
+    def __init__(self, cells: "ColumnarCells", row: int):
+        self._cells = cells
+        self._row = row
+
+    def __eq__(self, other):
+        return isinstance(other, ColumnarCellView) and self._cells is other._cells and self._row == other._row
+
+    def __hash__(self):
+        return hash((id(self._cells), self._row))
+
+    @property
+    def source_value(self):
+        return self._cells.pool.get(self._cells.source_values[self._row])
+
+    @property
+    def cleared_value(self):
+        return self._cells.pool.get(self._cells.cleared_values[self._row])
+
+    @property
+    def label(self):
+        # A cell skipped by sampling is labeled on first access
+        if self._cells.labels[self._row] == NONE_IDENTIFIER and self._row in self._cells.labelers:
+            self._cells.labelers[self._row]()
+        return self._cells.pool.get(self._cells.labels[self._row])
+
+    @property
+    def has_deferred_label(self) -> bool:
+        return self._cells.labels[self._row] == NONE_IDENTIFIER and self._row in self._cells.labelers
+
+    @property
+    def candidate_entities(self):
+        return self._cells.candidate_entities.get(self._row)
+
+    @property
+    def annotation(self):
+        return self._cells.pool.get(self._cells.annotations[self._row])
+
+    def set_cleared_value(self, cleared_value: str):
+        self._cells.cleared_values[self._row] = self._cells.pool.add(cleared_value)
+
+    def set_label(self, label: Union[LiteralLabel, NamedEntityLabel]):
+        self._cells.labels[self._row] = self._cells.pool.add(label)
+
+    def set_labeler(self, labeler: Optional[Callable[[], None]]):
+        if labeler is not None:
+            self._cells.labelers[self._row] = labeler
+        else:
+            self._cells.labelers.pop(self._row, None)
+
+    def set_candidate_entities(self, candidate_entities: List[EntityModel]):
+        if candidate_entities is not None:
+            self._cells.candidate_entities[self._row] = candidate_entities
+        else:
+            self._cells.candidate_entities.pop(self._row, None)
+
+    def annotate_cell(self):
+        if self.candidate_entities:
+            self._cells.annotations[self._row] = self._cells.pool.add(max(self.candidate_entities, key=attrgetter("_final_score")).uri)
+
+
+class ColumnarCells(Sequence):
+    """
+    Cells of a column stored as arrays of value identifiers in a pool (candidate entities and deferred labelers are stored
+    only for cells that have them), where cell objects are created on access as views
+    """
+    __slots__ = ("_pool", "_source_values", "_cleared_values", "_labels", "_annotations", "_candidate_entities", "_labelers")
+
+    def __init__(self, pool: ValuePool, source_values: Sequence[Any]):
+        self._pool = pool
+        self._source_values = array("i", (pool.add(value) for value in source_values))
+        self._cleared_values = array("i", [NONE_IDENTIFIER]) * len(self._source_values)
+        self._labels = array("i", [NONE_IDENTIFIER]) * len(self._source_values)
+        self._annotations = array("i", [NONE_IDENTIFIER]) * len(self._source_values)
+        self._candidate_entities: Dict[int, List[EntityModel]] = {}
+        self._labelers: Dict[int, Callable[[], None]] = {}
+
+    def __len__(self):
+        return len(self._source_values)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[ColumnarCellView, List[ColumnarCellView]]:
+        if isinstance(index, slice):
+            return [ColumnarCellView(self, row) for row in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("Cell index out of range")
+        return ColumnarCellView(self, index)
+
+    def __iter__(self) -> Iterator[ColumnarCellView]:
+        return (ColumnarCellView(self, row) for row in range(len(self)))
+
+    @property
+    def pool(self):
+        return self._pool
+
+    @property
+    def source_values(self):
+        return self._source_values
+
+    @property
+    def cleared_values(self):
+        return self._cleared_values
+
+    @property
+    def labels(self):
+        return self._labels
+
+    @property
+    def annotations(self):
+        return self._annotations
+
+    @property
+    def candidate_entities(self):
+        return self._candidate_entities
+
+    @property
+    def labelers(self):
+        return self._labelers
+
+    def value(self, row: int) -> Any:
+        """
+        Get cell content: a cleared value or a source value if a cell is not cleaned
+        :param row: a row index
+        :return: cell content
+        """
+        identifier = self._cleared_values[row]
+        return self._pool.get(identifier if identifier != NONE_IDENTIFIER else self._source_values[row])
+
+    def values(self, rows: Optional[Sequence[int]] = None) -> List[Any]:
+        """
+        Get content of column cells
+        :param rows: row indexes (all rows by default)
+        :return: a list of cell contents
+        """
+        rows = range(len(self)) if rows is None else rows
+        return [self.value(row) for row in rows]
+
+    def clean(self):
+        """
+        Clean source values, where each distinct value is cleaned only once
+        """
+        identifiers = list(dict.fromkeys(identifier for identifier in self._source_values if identifier != NONE_IDENTIFIER))
+        cleared_identifiers = {identifier: self._pool.add(cleared_value) for identifier, cleared_value in
+                               zip(identifiers, clean_values([self._pool.get(identifier) for identifier in identifiers]))}
+        cleared_identifiers[NONE_IDENTIFIER] = NONE_IDENTIFIER
+        self._cleared_values = array("i", (cleared_identifiers[identifier] for identifier in self._source_values))
+
+
+class ColumnarTableModel(TableModel):
+    """
+    Table model with a columnar representation: cell values of each column are kept in arrays of identifiers of interned
+    values, and cells are available as lazy views for code that works with cell objects
+    """
+    __slots__ = ("_pool",)
+
+    def __init__(self, table_name: str, data: Dict[str, Sequence[Any]], header_indexes: Optional[Sequence[int]] = None):
+        pool = ValuePool()
+        columns = tuple(TableColumnModel(header_name, ColumnarCells(pool, values)) for header_name, values in data.items())
+        super().__init__(table_name, columns, header_indexes)
+        self._pool = pool
+
+    @property
+    def pool(self):
+        return self._pool
+
+    def _data_rows(self, include_header: bool = False) -> Sequence[int]:
+        if include_header or not self.header_indexes:
+            return range(self.rows_number)
+        header_indexes = set(self.header_indexes)
+        return [row for row in range(self.rows_number) if row not in header_indexes]
+
+    def column(self, column_index: int, *, include_header: bool = False) -> Tuple[Any, ...]:
+        self._validate_indices(column_index)
+        return tuple(self.columns[column_index].cells.values(self._data_rows(include_header)))
+
+    def row(self, row_index: int) -> Tuple[Any, ...]:
+        self._validate_indices(row_index=row_index)
+        return tuple(column.cells.value(row_index) for column in self.columns)
+
+    def cell(self, column_index: int, row_index: int) -> Any:
+        self._validate_indices(column_index, row_index)
+        return self.columns[column_index].cells.value(row_index)
+
+    def column_profile(self, column_index: int) -> ColumnProfile:
+        profile = self._column_profiles.get(column_index)
+        if profile is None:
+            profile = self._column_profiles[column_index] = ColumnProfile(self.column(column_index))
+        return profile
+
+    def clean(self, include_header: bool = False) -> None:
+        self._column_profiles.clear()
+        for column in self.columns:
+            if include_header:
+                column.set_header_name(remove_multiple_spaces(fix_text(column.header_name)))
+            column.cells.clean()
@@ -1,8 +1,10 @@
+import threading
+import weakref
 from abc import ABC, abstractmethod
 from enum import Enum
 from typing import Any, Tuple
 
-from dbpedia_sparql_endpoint import get_objects_for_entity, get_subjects_for_entity
+from tabbyld2.table_annotation.context_provider import CONTEXT_PROVIDER
 
 
 class EntityRankingMethod(str, Enum):
@@ -62,19 +64,105 @@ class AbstractEntityModel(ABC):
         pass
 
 
-class EntityModel(AbstractEntityModel, EntityRankingWeightFactor):
-    __slots__ = ("_uri", "_label", "_comment", "_redirects", "_context", "_string_similarity", "_ner_based_similarity",
-                 "_heading_based_similarity", "_entity_embeddings_based_similarity", "_context_based_similarity", "_final_score")
+class EntityData:
+    """
+    Static data of an entity (label, comment, redirects and context) stored once for all candidate entities with the same URI
+    """
+    __slots__ = ("_uri", "_label", "_comment", "_redirects", "_context", "__weakref__")
 
     def __init__(self, uri: str = None, label: str = None, comment: str = None, redirects: Tuple[str, ...] = None,
-                 context: Tuple['EntityModel', ...] = None, string_similarity: float = 0, ner_based_similarity: float = 0,
-                 heading_based_similarity: float = 0, entity_embeddings_based_similarity: float = 0,
-                 context_based_similarity: float = 0, final_score: float = 0):
+                 context: Tuple['EntityModel', ...] = None):
         self._uri = uri
         self._label = label
         self._comment = comment
         self._redirects = redirects
         self._context = context
+
+    @property
+    def uri(self):
+        return self._uri
+
+    @property
+    def label(self):
+        return self._label
+
+    @property
+    def comment(self):
+        return self._comment
+
+    @property
+    def redirects(self):
+        return self._redirects
+
+    @property
+    def context(self):
+        return self._context
+
+    def set_context(self, context: Tuple['EntityModel', ...]):
+        self._context = context
+
+    def update(self, label: str = None, comment: str = None, redirects: Tuple[str, ...] = None):
+        """
+        Fill in missing static data of an entity
+        :param label: an entity label
+        :param comment: an entity comment
+        :param redirects: a set of redirect pages of an entity
+        """
+        self._label = self._label if self._label is not None else label
+        self._comment = self._comment if self._comment is not None else comment
+        self._redirects = self._redirects if self._redirects is not None else redirects
+
+
+class EntityRegistry:
+    """
+    Registry of interned static data of entities by URIs, where data is kept while at least one candidate entity refers to it
+    """
+    __slots__ = ("_entities", "_lock")
+
+    def __init__(self):
+        self._entities = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entities)
+
+    def get(self, uri: str, label: str = None, comment: str = None, redirects: Tuple[str, ...] = None) -> EntityData:
+        """
+        Get static data of an entity by its URI, where new data is created only for an unknown entity
+        :param uri: an entity URI
+        :param label: an entity label
+        :param comment: an entity comment
+        :param redirects: a set of redirect pages of an entity
+        :return: static data of an entity
+        """
+        with self._lock:
+            entity = self._entities.get(uri) if uri is not None else None
+            if entity is None:
+                entity = EntityData(uri, label, comment, redirects)
+                if uri is not None:
+                    self._entities[uri] = entity
+            else:
+                entity.update(label, comment, redirects)
+            return entity
+
+
+ENTITY_REGISTRY = EntityRegistry()
+
+
+class EntityModel(AbstractEntityModel, EntityRankingWeightFactor):
+    """
+    Candidate entity for a cell: a lightweight record of similarity scores referring to shared static data of an entity
+    """
+    __slots__ = ("_entity", "_string_similarity", "_ner_based_similarity", "_heading_based_similarity",
+                 "_entity_embeddings_based_similarity", "_context_based_similarity", "_final_score")
+
+    def __init__(self, uri: str = None, label: str = None, comment: str = None, redirects: Tuple[str, ...] = None,
+                 context: Tuple['EntityModel', ...] = None, string_similarity: float = 0, ner_based_similarity: float = 0,
+                 heading_based_similarity: float = 0, entity_embeddings_based_similarity: float = 0,
+                 context_based_similarity: float = 0, final_score: float = 0):
+        self._entity = ENTITY_REGISTRY.get(uri, label, comment, redirects)
+        if context is not None:
+            self._entity.set_context(context)
         self._string_similarity = string_similarity
         self._ner_based_similarity = ner_based_similarity
         self._heading_based_similarity = heading_based_similarity
@@ -82,25 +170,29 @@ class EntityModel(AbstractEntityModel, EntityRankingWeightFactor):
         self._context_based_similarity = context_based_similarity
         self._final_score = final_score
 
+    @property
+    def entity(self):
+        return self._entity
+
     @property
     def uri(self):
-        return self._uri
+        return self._entity.uri
 
     @property
     def label(self):
-        return self._label
+        return self._entity.label
 
     @property
     def comment(self):
-        return self._comment
+        return self._entity.comment
 
     @property
     def redirects(self):
-        return self._redirects
+        return self._entity.redirects
 
     @property
     def context(self):
-        return self._context
+        return self._entity.context
 
     @property
     def string_similarity(self):
@@ -127,8 +219,12 @@ class EntityModel(AbstractEntityModel, EntityRankingWeightFactor):
         return self._final_score
 
     def get_context(self):
-        context = {**get_subjects_for_entity(self.uri), **get_objects_for_entity(self.uri)}
-        self._context = tuple([EntityModel(uri, label, comment) for uri, (label, comment) in context.items()])
+        # Context is shared by all candidate entities with the same URI, so it is fetched only once (together with contexts
+        # of other requested entities), where a context that could not be fetched stays unset to be fetched again later
+        if self.context is None:
+            context = CONTEXT_PROVIDER.get_context(self.uri)
+            if context is not None:
+                self._entity.set_context(tuple([EntityModel(uri, label, comment) for uri, (label, comment) in context.items()]))
 
     def aggregate_scores(self):
         self._final_score = self.string_similarity * self.STRING_SIMILARITY + self.ner_based_similarity * self.NER_BASED_SIMILARITY +  \
@@ -1,9 +1,10 @@
+import re
 from abc import ABC, abstractmethod
 from operator import attrgetter
 from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 from tabbyld2.datamodel.knowledge_graph_model import ClassModel, ClassRankingMethod, EntityModel, EntityRankingMethod
-from tabbyld2.preprocessing.cleaner import fix_text, remove_garbage_characters, remove_multiple_spaces
+from tabbyld2.preprocessing.cleaner import clean_values, fix_text, remove_multiple_spaces
 from tabbyld2.preprocessing.labels import LiteralLabel, NamedEntityLabel
 
 
@@ -19,7 +20,7 @@ class AbstractColumnCellModel(ABC):
 
 
 class ColumnCellModel(AbstractColumnCellModel):
-    __slots__ = ("_source_value", "_cleared_value", "_label", "_candidate_entities", "_annotation")
+    __slots__ = ("_source_value", "_cleared_value", "_label", "_candidate_entities", "_annotation", "_labeler")
 
     def __init__(self, source_value: Any = None, cleared_value: str = None, label: str = None,
                  candidate_entities: Tuple[EntityModel, ...] = None, annotation: EntityModel = None):
@@ -28,6 +29,7 @@ class ColumnCellModel(AbstractColumnCellModel):
         self._label = label
         self._candidate_entities = candidate_entities
         self._annotation = annotation
+        self._labeler = None
 
     @property
     def source_value(self):
@@ -39,8 +41,15 @@ class ColumnCellModel(AbstractColumnCellModel):
 
     @property
     def label(self):
+        # A cell skipped by sampling is labeled on first access
+        if self._label is None and self._labeler is not None:
+            self._labeler()
         return self._label
 
+    @property
+    def has_deferred_label(self) -> bool:
+        return self._label is None and self._labeler is not None
+
     @property
     def candidate_entities(self):
         return self._candidate_entities
@@ -55,6 +64,9 @@ class ColumnCellModel(AbstractColumnCellModel):
     def set_label(self, label: Union[LiteralLabel, NamedEntityLabel]):
         self._label = label
 
+    def set_labeler(self, labeler: Optional[Callable[[], None]]):
+        self._labeler = labeler
+
     def set_candidate_entities(self, candidate_entities: List[EntityModel]):
         self._candidate_entities = candidate_entities
 
@@ -122,6 +134,46 @@ class TableColumnModel(AbstractTableColumnModel):
             self._annotation = max(self.candidate_classes, key=attrgetter("_final_score")).uri
 
 
+# Pattern of acronyms in cell values (two or more capital letters or dots)
+ACRONYM_PATTERN = re.compile(r"\b[A-ZА-Я.]{2,}\b")
+
+
+class ColumnProfile:
+    """
+    Statistics of column cell values for subject column identification computed in one pass
+    """
+    __slots__ = ("_empty_cell_number", "_acronym_cell_number", "_unique_cell_number", "_word_number")
+
+    def __init__(self, values: Iterable[Any]):
+        self._empty_cell_number, self._acronym_cell_number, self._word_number = 0, 0, 0
+        unique_values = set()
+        for value in values:
+            unique_values.add(value)
+            if not value:
+                self._empty_cell_number += 1
+                continue
+            self._word_number += len(value.split())
+            if ACRONYM_PATTERN.search(value):
+                self._acronym_cell_number += 1
+        self._unique_cell_number = len(unique_values)
+
+    @property
+    def empty_cell_number(self):
+        return self._empty_cell_number
+
+    @property
+    def acronym_cell_number(self):
+        return self._acronym_cell_number
+
+    @property
+    def unique_cell_number(self):
+        return self._unique_cell_number
+
+    @property
+    def word_number(self):
+        return self._word_number
+
+
 class AbstractTableModel(ABC):
     __slots__ = ()
 
@@ -181,6 +233,15 @@ class AbstractTableModel(ABC):
         """
         pass
 
+    @abstractmethod
+    def column_profile(self, column_index: int) -> ColumnProfile:
+        """
+        Get statistics of column cells (excluding header cells), which are computed once and cached in a table
+        :param column_index: target column index in range [0; columns_number)
+        :return: a column profile
+        """
+        pass
+
     @abstractmethod
     def clean(self, include_header: bool = False) -> None:
         """
@@ -257,7 +318,7 @@ class AbstractTableModel(ABC):
 
 
 class TableModel(AbstractTableModel):
-    __slots__ = ("_table_name", "_columns", "_header_indexes", "_columns_number", "_rows_number")
+    __slots__ = ("_table_name", "_columns", "_header_indexes", "_columns_number", "_rows_number", "_column_profiles")
 
     def __init__(self, table_name: str, columns: Tuple[TableColumnModel, ...], header_indexes: Optional[Iterable[int]] = None):
         self._table_name = table_name
@@ -265,6 +326,7 @@ class TableModel(AbstractTableModel):
         self._header_indexes = tuple(header_indexes) if header_indexes is not None else ()
         self._columns_number = len(self.columns) if len(self.columns) != 0 else 0
         self._rows_number = len(self.columns[0].cells) if len(self.columns[0].cells) != 0 else 0
+        self._column_profiles: Dict[int, ColumnProfile] = {}
 
     @property
     def table_name(self):
@@ -288,6 +350,7 @@ class TableModel(AbstractTableModel):
 
     def set_header_indexes(self, rows: Iterable[int]):
         self._header_indexes = tuple(rows)
+        self._column_profiles.clear()
 
     def _validate_indices(self, column_index: Optional[int] = None, row_index: Optional[int] = None):
         """
@@ -354,21 +417,33 @@ class TableModel(AbstractTableModel):
         context.remove(self.cell(column_index, row_index))
         return tuple(context)
 
+    def column_profile(self, column_index: int) -> ColumnProfile:
+        profile = self._column_profiles.get(column_index)
+        if profile is None:
+            self._validate_indices(column_index)
+            header_indexes = set(self.header_indexes)
+            profile = self._column_profiles[column_index] = ColumnProfile(
+                cell.cleared_value if cell.cleared_value is not None else cell.source_value
+                for row, cell in enumerate(self.columns[column_index].cells) if row not in header_indexes)
+        return profile
+
     def clean(self, include_header: bool = False) -> None:
+        self._column_profiles.clear()
         for column in self.columns:
             if include_header:
                 column.set_header_name(remove_multiple_spaces(fix_text(column.header_name)))
-            for cell in column.cells:
-                if cell.source_value is not None:
-                    cell.set_cleared_value(remove_multiple_spaces(remove_garbage_characters(fix_text(cell.source_value))))
-                    if not cell.cleared_value:
-                        cell.set_cleared_value(None)
+            # Cleaning of all values of a column at once (repeated values are cleaned only once)
+            cells = [cell for cell in column.cells if cell.source_value is not None]
+            for cell, cleared_value in zip(cells, clean_values([cell.source_value for cell in cells])):
+                cell.set_cleared_value(cleared_value)
 
     def serialize_cleared_table(self) -> List[dict]:
         return [{column.header_name: column.cells[i].cleared_value for column in self.columns} for i in range(self.rows_number)]
 
     def serialize_recognized_named_entities(self) -> List[dict]:
-        return [{column.header_name: column.cells[i].label for column in self.columns} for i in range(self.rows_number)]
+        # Deferred labels of cells skipped by sampling are not serialized (None), so serialization does not run NER for them
+        return [{column.header_name: None if column.cells[i].has_deferred_label else column.cells[i].label for column in self.columns}
+                for i in range(self.rows_number)]
 
     def serialize_classified_columns(self) -> Dict[str, str]:
         return {column.header_name: column.column_type for column in self.columns}
@@ -0,0 +1,237 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from hashlib import sha256
+from typing import Any, Dict, Optional
+
+
+class ResponseCache:
+    """
+    Persistent content-addressed cache of query responses backed by SQLite with TTL and LRU eviction
+    """
+    __slots__ = ("_path", "_ttl", "_max_entries", "_connection", "_size", "_hits", "_misses", "_lock")
+
+    def __init__(self, path: str, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        self._path = path
+        self._ttl = ttl
+        self._max_entries = max_entries
+        self._connection = None
+        self._size = 0
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.RLock()
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def ttl(self):
+        return self._ttl
+
+    @property
+    def max_entries(self):
+        return self._max_entries
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    @property
+    def hit_rate(self) -> float:
+        requests_number = self.hits + self.misses
+        return self.hits / requests_number if requests_number else 0
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """
+        Normalize a query text by collapsing all whitespace sequences into single spaces
+        :param query: a source query text
+        :return: a normalized query text
+        """
+        return " ".join(query.split())
+
+    @classmethod
+    def make_key(cls, query: str, namespace: str = "") -> str:
+        """
+        Make a content-addressed key for a query
+        :param query: a source query text
+        :param namespace: a namespace of a query (e.g. an endpoint URL)
+        :return: a SHA-256 hex digest of a namespace and a normalized query text
+        """
+        return sha256((namespace + "\n" + cls.normalize_query(query)).encode("utf-8")).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open (and create if necessary) a SQLite database of cached responses on first use
+        :return: a database connection
+        """
+        if self._connection is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            self._connection = sqlite3.connect(self.path, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            self._connection.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)")
+            self._connection.commit()
+            self._size = self._connection.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return self._connection
+
+    def get(self, query: str, namespace: str = "") -> Optional[Any]:
+        """
+        Get a cached response for a query
+        :param query: a source query text
+        :param namespace: a namespace of a query (e.g. an endpoint URL)
+        :return: a cached response or None if there is no fresh response for a query
+        """
+        key, now = self.make_key(query, namespace), time.time()
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute("SELECT response, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None and self.ttl is not None and now - row[1] > self.ttl:
+                connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                connection.commit()
+                self._size -= 1
+                row = None
+            if row is None:
+                self._misses += 1
+                return None
+            connection.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            connection.commit()
+            self._hits += 1
+        return json.loads(row[0])
+
+    def set(self, query: str, response: Any, namespace: str = ""):
+        """
+        Put a response for a query into cache and evict least recently used responses if cache size is exceeded
+        :param query: a source query text
+        :param response: a JSON serializable response
+        :param namespace: a namespace of a query (e.g. an endpoint URL)
+        """
+        key, now = self.make_key(query, namespace), time.time()
+        with self._lock:
+            connection = self._connect()
+            exist = connection.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone() is not None
+            connection.execute("INSERT OR REPLACE INTO responses (key, response, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                               (key, json.dumps(response, ensure_ascii=False), now, now))
+            self._size += 0 if exist else 1
+            if self.max_entries is not None and self._size > self.max_entries:
+                connection.execute("DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                                   (self._size - self.max_entries,))
+                self._size = self.max_entries
+            connection.commit()
+
+    def clear(self):
+        """
+        Remove all cached responses and reset hit/miss counters
+        """
+        with self._lock:
+            connection = self._connect()
+            connection.execute("DELETE FROM responses")
+            connection.commit()
+            self._size, self._hits, self._misses = 0, 0, 0
+
+    def statistics(self) -> Dict[str, Any]:
+        """
+        Get cache usage statistics
+        :return: a dict with number of cached responses, hits, misses and hit rate
+        """
+        with self._lock:
+            self._connect()
+            return {"size": self._size, "hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate}
+
+
+class LRUCache:
+    """
+    Thread-safe in-memory cache of values with LRU eviction and hit/miss counters
+    """
+    __slots__ = ("_max_entries", "_values", "_hits", "_misses", "_lock")
+
+    def __init__(self, max_entries: Optional[int] = None):
+        self._max_entries = max_entries
+        self._values = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._values)
+
+    def __contains__(self, key: Any):
+        return key in self._values
+
+    @property
+    def max_entries(self):
+        return self._max_entries
+
+    @property
+    def hits(self):
+        return self._hits
+
+    @property
+    def misses(self):
+        return self._misses
+
+    @property
+    def hit_rate(self) -> float:
+        requests_number = self.hits + self.misses
+        return self.hits / requests_number if requests_number else 0
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """
+        Get a cached value for a key
+        :param key: a key
+        :param default: a value returned if there is no cached value for a key
+        :return: a cached value or a default value
+        """
+        with self._lock:
+            if key not in self._values:
+                self._misses += 1
+                return default
+            self._values.move_to_end(key)
+            self._hits += 1
+            return self._values[key]
+
+    def set(self, key: Any, value: Any):
+        """
+        Put a value into cache and evict least recently used values if cache size is exceeded
+        :param key: a key
+        :param value: a value
+        """
+        with self._lock:
+            self._values[key] = value
+            self._values.move_to_end(key)
+            if self.max_entries is not None:
+                while len(self._values) > self.max_entries:
+                    self._values.popitem(last=False)
+
+    def clear(self):
+        """
+        Remove all cached values and reset hit/miss counters
+        """
+        with self._lock:
+            self._values.clear()
+            self._hits, self._misses = 0, 0
+
+    def statistics(self) -> Dict[str, Any]:
+        """
+        Get cache usage statistics
+        :return: a dict with number of cached values, hits, misses and hit rate
+        """
+        with self._lock:
+            return {"size": len(self._values), "hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate}
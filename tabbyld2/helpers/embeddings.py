@@ -0,0 +1,55 @@
+import threading
+from typing import Dict, Optional
+
+from gensim.models import KeyedVectors, Word2Vec
+
+
+# Process-wide store of loaded embedding models (vectors are memory-mapped, so worker processes share the same pages)
+_MODELS: Dict[str, KeyedVectors] = {}
+_LOCK = threading.Lock()
+
+
+def load_keyed_vectors(path: str, mmap: Optional[str] = "r") -> KeyedVectors:
+    """
+    Load word (entity) vectors from a file saved by gensim, where the saved type is detected: a full Word2Vec model
+    is loaded by Word2Vec.load (with its compatibility handling of models saved by older gensim versions) and its
+    vectors are taken, otherwise a file is loaded as KeyedVectors
+    :param path: a path to a saved Word2Vec model or KeyedVectors
+    :param mmap: memory-mapping mode for vector arrays (None means arrays are fully loaded into memory)
+    :return: keyed vectors of a model
+    """
+    try:
+        return Word2Vec.load(path, mmap=mmap).wv
+    except AttributeError:
+        # Word2Vec.load rejects a file of another type (or an incompatible model, which is not KeyedVectors either)
+        keyed_vectors = KeyedVectors.load(path, mmap=mmap)
+        if not isinstance(keyed_vectors, KeyedVectors):
+            raise
+        return keyed_vectors
+
+
+def get_keyed_vectors(path: str, mmap: Optional[str] = "r") -> KeyedVectors:
+    """
+    Get word (entity) vectors of a model saved by gensim, where a model is loaded from disk only once per process
+    :param path: a path to a saved Word2Vec model or KeyedVectors
+    :param mmap: memory-mapping mode for vector arrays (None means arrays are fully loaded into memory)
+    :return: keyed vectors of a model
+    """
+    with _LOCK:
+        if path not in _MODELS:
+            print("Model '" + path + "' is loading")
+            _MODELS[path] = load_keyed_vectors(path, mmap)
+            print("Model loading completed")
+        return _MODELS[path]
+
+
+def release_keyed_vectors(path: Optional[str] = None):
+    """
+    Remove loaded models from the store
+    :param path: a path to a model (None means all models are removed)
+    """
+    with _LOCK:
+        if path is None:
+            _MODELS.clear()
+        else:
+            _MODELS.pop(path, None)
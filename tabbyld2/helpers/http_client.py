@@ -0,0 +1,44 @@
+import threading
+from typing import Dict
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from tabbyld2.config import HTTPConfig
+from urllib3.util.retry import Retry
+
+
+_SESSIONS: Dict[str, requests.Session] = {}
+_SESSIONS_LOCK = threading.Lock()
+
+
+def create_session(pool_size: int = HTTPConfig.POOL_SIZE, max_retries: int = HTTPConfig.MAX_RETRIES,
+                   backoff_factor: float = HTTPConfig.BACKOFF_FACTOR) -> requests.Session:
+    """
+    Create a HTTP session with a keep-alive connection pool and retries with exponential backoff
+    :param pool_size: maximum number of connections in a pool
+    :param max_retries: maximum number of retries for failed requests
+    :param backoff_factor: factor for exponential backoff between retries (in seconds)
+    :return: a new session
+    """
+    retries = Retry(total=max_retries, backoff_factor=backoff_factor, status_forcelist=HTTPConfig.RETRY_STATUSES,
+                    allowed_methods=frozenset({"GET", "POST"}))
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retries, pool_block=True)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_session(url: str) -> requests.Session:
+    """
+    Get a session shared by all threads for an endpoint (scheme and host) of URL
+    :param url: a request URL
+    :return: a shared session with a pool of keep-alive connections to an endpoint
+    """
+    parsed_url = urlparse(url)
+    endpoint = parsed_url.scheme + "://" + parsed_url.netloc
+    with _SESSIONS_LOCK:
+        if endpoint not in _SESSIONS:
+            _SESSIONS[endpoint] = create_session()
+        return _SESSIONS[endpoint]
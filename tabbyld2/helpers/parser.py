@@ -2,19 +2,23 @@ import os
 from typing import Optional
 
 import pandas as pd
-from tabbyld2.config import EvaluationPath, ResultPath
+from tabbyld2.config import EvaluationPath, PreprocessingConfig, ResultPath
+from tabbyld2.datamodel.columnar_table_model import ColumnarTableModel
 from tabbyld2.datamodel.tabular_data_model import ColumnCellModel, TableColumnModel, TableModel
 from tabbyld2.helpers.file import allowed_file, check_path
 
 
-def deserialize_table(filename: str, source_json_data: dict) -> TableModel:
+def deserialize_table(filename: str, source_json_data: dict, columnar: bool = None) -> TableModel:
     """
     Deserialize a source table in JSON format and create table model object
     :param filename: a table file name
     :param source_json_data: a tabular data in JSON format
+    :param columnar: flag to create a table model with columnar representation (configuration value is used by default)
     :return: a TableModel object
     """
     dicts = {k: [d[k] for d in source_json_data] for k in source_json_data[0]}
+    if columnar if columnar is not None else PreprocessingConfig.COLUMNAR_TABLE_MODEL_ENABLED:
+        return ColumnarTableModel(filename, dicts)
     columns = [TableColumnModel(key, tuple([ColumnCellModel(item) for item in items])) for key, items in dicts.items()]
     return TableModel(filename, tuple(columns))
 
@@ -0,0 +1,44 @@
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+class RateLimiter:
+    """
+    Thread-safe limiter that spaces out requests to the same host according to its maximum request rate
+    """
+    __slots__ = ("_default_rate", "_rates", "_next_request_times", "_lock")
+
+    def __init__(self, default_rate: Optional[float] = None, rates: Optional[Dict[str, float]] = None):
+        self._default_rate = default_rate
+        self._rates = dict(rates) if rates is not None else {}
+        self._next_request_times = {}
+        self._lock = threading.Lock()
+
+    @property
+    def default_rate(self):
+        return self._default_rate
+
+    @property
+    def rates(self):
+        return self._rates
+
+    def set_rate(self, host: str, rate: Optional[float]):
+        self._rates[host] = rate
+
+    def acquire(self, url: str):
+        """
+        Block a calling thread until a new request to a host of URL is allowed
+        :param url: a request URL
+        """
+        host = urlparse(url).hostname or url
+        rate = self.rates.get(host, self.default_rate)
+        if not rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            request_time = max(now, self._next_request_times.get(host, now))
+            self._next_request_times[host] = request_time + 1 / rate
+        if request_time > now:
+            time.sleep(request_time - now)
@@ -4,10 +4,13 @@ from datetime import datetime
 
 import stanza
 from duckling import DucklingWrapper
-from tabbyld2.config import ResultPath
+from tabbyld2.config import KnowledgeBaseConfig, ResultPath
 from tabbyld2.helpers.file import allowed_file, remove_suffix_in_filename
 from tabbyld2.helpers.parser import deserialize_table, save_json_dataset
 from tabbyld2.pipeline import pipeline_cell_entity_annotation, pipeline_column_type_annotation, pipeline_preprocessing
+from tabbyld2.table_annotation.dbpedia_sparql_endpoint import set_fuzzy_index, set_knowledge_base
+from tabbyld2.table_annotation.fuzzy_index import FuzzyLabelIndex
+from tabbyld2.table_annotation.local_knowledge_base import LocalKnowledgeBase, Vocabulary, parse_triples
 
 
 if __name__ == "__main__":
@@ -16,6 +19,17 @@ if __name__ == "__main__":
     stanza.download("en")  # Init Stanford NER annotator
     named_entity_recognition = stanza.Pipeline(lang="en", processors="tokenize,ner")  # Neural pipeline preparation
     duckling_wrapper = DucklingWrapper()  # Init DucklingWrapper object
+    local_knowledge_base = None
+    if KnowledgeBaseConfig.LOCAL_KB_PATH is not None:
+        local_knowledge_base = LocalKnowledgeBase(KnowledgeBaseConfig.LOCAL_KB_PATH)
+        set_knowledge_base(local_knowledge_base)  # Use a local knowledge base instead of DBpedia
+    if KnowledgeBaseConfig.FUZZY_SEARCH_ENABLED:
+        # Build a trigram index of entity labels for the approximate search of candidate entities
+        if local_knowledge_base is not None:
+            set_fuzzy_index(FuzzyLabelIndex(local_knowledge_base.get_labels()))
+        elif KnowledgeBaseConfig.LABELS_DUMP_PATH is not None:
+            set_fuzzy_index(FuzzyLabelIndex((subject, literal) for subject, predicate, _, literal, language in parse_triples(
+                KnowledgeBaseConfig.LABELS_DUMP_PATH) if predicate == Vocabulary.RDFS_LABEL and language == "en"))
     for _, _, files in os.walk(ResultPath.JSON_FILE_PATH):
         for file in files:
             if allowed_file(file, {"json"}):
@@ -2,7 +2,7 @@ from typing import Optional
 
 from duckling import DucklingWrapper
 from stanza import Pipeline
-from tabbyld2.config import ResultPath
+from tabbyld2.config import PreprocessingConfig, ResultPath
 from tabbyld2.datamodel.knowledge_graph_model import ClassRankingMethod, EntityRankingMethod
 from tabbyld2.datamodel.tabular_data_model import TableModel
 from tabbyld2.helpers.file import remove_suffix_in_filename, write_json_file
@@ -26,7 +26,7 @@ def pipeline_preprocessing(table_model: TableModel, file: str, named_entity_reco
     table_model.set_header_indexes([0])  # Set header indexes for table
     table_model.clean(True)  # Tabular data cleaning
     column_classifier = AtomicColumnClassifier(table_model, named_entity_recognition, duckling_wrapper)
-    column_classifier.classify_columns()  # Classify table columns on atomic types
+    column_classifier.classify_columns(PreprocessingConfig.COLUMN_SAMPLING_ENABLED)  # Classify table columns on atomic types
     subject_column_identifier = SubjectColumnIdentifier(column_classifier.table_model)
     subject_column_identifier.identify_subject_column()  # Identify a subject column among categorical columns (named entity columns)
     # Serialize results in json format
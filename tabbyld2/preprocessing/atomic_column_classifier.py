@@ -1,15 +1,22 @@
-import re
+import math
+import random
 from abc import ABC, abstractmethod
 from collections import defaultdict
 from enum import Enum
-from typing import Dict, Tuple, Union
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 
-import dateparser
-from duckling import Dim, DucklingWrapper
-from stanza import Pipeline
-from tabbyld2.datamodel.tabular_data_model import TableModel
-from tabbyld2.helpers.utility import is_float
+from duckling import DucklingWrapper
+from stanza import Document, Pipeline
+from tabbyld2.config import PreprocessingConfig
+from tabbyld2.datamodel.tabular_data_model import ColumnCellModel, TableColumnModel, TableModel
+from tabbyld2.helpers.cache import LRUCache
 from tabbyld2.preprocessing.labels import LiteralLabel, NamedEntityLabel
+from tabbyld2.preprocessing.literal_detector import LITERAL_DETECTOR
+from tabbyld2.preprocessing.temporal_detector import TemporalLiteralDetector
+
+
+# Memoized final labels of cell values (keyed by a cleared value) shared by all tables of a process
+CELL_LABEL_CACHE = LRUCache(PreprocessingConfig.CELL_LABEL_CACHE_SIZE)
 
 
 class ColumnType(str, Enum):
@@ -29,20 +36,22 @@ class AbstractAtomicColumnClassifier(ABC):
         pass
 
     @abstractmethod
-    def classify_columns(self) -> None:
+    def classify_columns(self, sampling: bool = False) -> None:
         """
         Determine column types based on recognized named entities in table cells
+        :param sampling: flag to classify columns by samples of cells (other cells are labeled on first access)
         """
         pass
 
 
 class AtomicColumnClassifier(AbstractAtomicColumnClassifier):
-    __slots__ = ("_named_entity_recognition", "_duckling_wrapper", "_table_model")
+    __slots__ = ("_named_entity_recognition", "_duckling_wrapper", "_table_model", "_temporal_detector")
 
     def __init__(self, table_model: TableModel, named_entity_recognition: Pipeline, duckling_wrapper: DucklingWrapper):
         self._table_model = table_model
         self._named_entity_recognition = named_entity_recognition
         self._duckling_wrapper = duckling_wrapper
+        self._temporal_detector = TemporalLiteralDetector(duckling_wrapper)
 
     @property
     def table_model(self):
@@ -63,16 +72,7 @@ class AtomicColumnClassifier(AbstractAtomicColumnClassifier):
         :param text: an input textual value
         :return: a new literal label for a cell value
         """
-        # If negative integer
-        if re.search(r"^-[1-9]\d*$", text):
-            return LiteralLabel.NEGATIVE_INTEGER
-        # If positive integer
-        if re.search(r"^[1-9]\d*$", text):
-            return LiteralLabel.POSITIVE_INTEGER
-        # If float
-        if is_float(text):
-            return LiteralLabel.FLOAT
-        return NamedEntityLabel.NONE
+        return LITERAL_DETECTOR.determine_number(text)
 
     @staticmethod
     def _determine_complex_numerical_values(text: str) -> Union[LiteralLabel, NamedEntityLabel]:
@@ -81,51 +81,23 @@ class AtomicColumnClassifier(AbstractAtomicColumnClassifier):
         :param text: an input textual value
         :return: a new literal label for a cell value
         """
-        if re.search(r"^[0-9]{4}-[0-9]{3}[0-9xX]$", text):
-            return LiteralLabel.ISSN
-        if re.search(r"^(?:ISBN(?:: ?| ))?((?:97[89])?\d{9}[\dx])+$", text):
-            return LiteralLabel.ISBN
-        if re.search(r"(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9]["
-                     r"0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$", text):
-            return LiteralLabel.IP_ADDRESS_V4
-        if re.search(r"^([456][0-9]{3})-?([0-9]{4})-?([0-9]{4})-?([0-9]{4})$", text):
-            return LiteralLabel.BANK_CARD
-        if re.search(r"#[0-9A-Fa-f]{6}", text):
-            return LiteralLabel.COLOR
-        if re.search(r"^(-?\d+(\.\d+)?),\s*(-?\d+(\.\d+)?)$", text):
-            return LiteralLabel.COORDINATES
-        if re.search(r"^((?:\+\d{2}[-\.\s]??|\d{4}[-\.\s]??)?(?:\d{3}[-\.\s]??\d{3}[-\.\s]??\d{4}|\(\d{3}\)\s*\d{3}[-\.\s]??\d{4}|\d{3}["
-                     r"-\.\s]??\d{4}))$", text):
-            return LiteralLabel.PHONE
-        if re.search(r"([+-]?\d+(\.\d+)*)\s?°([CcFf])", text):
-            return LiteralLabel.TEMPERATURE
-        if re.search(r"^(0x)?[a-fA-F0-9]+$", text):
-            return LiteralLabel.HEXADECIMAL
-        return NamedEntityLabel.NONE
+        return LITERAL_DETECTOR.determine_complex_numerical_values(text)
 
-    @staticmethod
-    def _determine_time(text: str, duckling_wrapper: DucklingWrapper) -> Union[LiteralLabel, NamedEntityLabel]:
+    def _determine_time(self, text: str) -> Union[LiteralLabel, NamedEntityLabel]:
         """
         Determine time label in a source text based on the Duckling library
         :param text: an input textual value
-        :param duckling_wrapper: a DucklingWrapper object
         :return: a time label for cell value
         """
-        dim_list = duckling_wrapper.parse(text, reference_time="1")
-        if dim_list is not None:
-            for item in dim_list:
-                if item["text"] == text and item["dim"] == Dim.TIME:
-                    return LiteralLabel.TIME
-        return NamedEntityLabel.NONE
+        return self._temporal_detector.determine_time(text)
 
-    @staticmethod
-    def _determine_date(text: str) -> Union[LiteralLabel, NamedEntityLabel]:
+    def _determine_date(self, text: str) -> Union[LiteralLabel, NamedEntityLabel]:
         """
-        Determine date label in a source text based on the DateParser library
+        Determine date label in a source text based on the DateParser library restricted to configured languages
         :param text: an input textual value
         :return: a date label for cell value
         """
-        return LiteralLabel.DATE if dateparser.parse(text) else NamedEntityLabel.NONE
+        return self._temporal_detector.determine_date(text)
 
     @staticmethod
     def _determine_entity_mention(text: str) -> Union[LiteralLabel, NamedEntityLabel]:
@@ -134,17 +106,7 @@ class AtomicColumnClassifier(AbstractAtomicColumnClassifier):
         :param text: an input textual value
         :return: a new literal label for cell value
         """
-        if re.search(r"^'true|false|True|False|TRUE|FALSE'&", text):
-            return LiteralLabel.BOOLEAN
-        if re.search(r"^\d{6}$", text) or re.search(r"^\d{5}(?:[-\s]\d{4})?$", text):
-            return LiteralLabel.MAIL
-        if re.search(r"[\w.-]+@[\w.-]+\.?[\w]+?", text):
-            return LiteralLabel.EMAIL
-        if re.search(r"((id|ID)[^a-zA-Z])|((([[:punct:]]id)|([[:punct:]]ID))^[^a-zA-Z])", text):
-            return LiteralLabel.ID
-        if re.search(r"((http|https)\:\/\/)?[a-zA-Z0-9\.\/\?\:@\-_=#]+\.([a-zA-Z]){2,6}([a-zA-Z0-9\.\&\/\?\:@\-_=#])*", text):
-            return LiteralLabel.URL
-        return NamedEntityLabel.NONE
+        return LITERAL_DETECTOR.determine_entity_mention(text)
 
     @staticmethod
     def _determine_symbol(text: str) -> Union[LiteralLabel, NamedEntityLabel]:
@@ -161,28 +123,113 @@ class AtomicColumnClassifier(AbstractAtomicColumnClassifier):
             return LiteralLabel.SYMBOL
         return NamedEntityLabel.NONE
 
+    def _recognize_named_entities_in_texts(self, texts: Iterable[str], batch_size: int = None) -> Dict[str, Union[str, List[str]]]:
+        """
+        Recognize named entities in distinct textual values by batches of documents processed in one Stanford NER call
+        :param texts: a set of textual values
+        :param batch_size: number of documents in one batch (configuration value is used by default)
+        :return: a dict of named entity types (a type, a list of types or NONE) for each textual value
+        """
+        texts, results = list(dict.fromkeys(texts)), {}
+        batch_size = batch_size or PreprocessingConfig.NER_BATCH_SIZE
+        for i in range(0, len(texts), batch_size):
+            batch = texts[i:i + batch_size]
+            docs = self.named_entity_recognition([Document([], text=text.lower().title() + ".") for text in batch])
+            for text, doc in zip(batch, docs):
+                results[text] = [ent.type for ent in doc.ents] if len(doc.ents) > 1 else NamedEntityLabel.NONE
+                if len(doc.ents) == 1:
+                    results[text] = doc.ents[0].type
+        return results
+
+    @staticmethod
+    def _is_unrecognized(recognized_named_entities: Union[str, List[str]]) -> bool:
+        return recognized_named_entities == NamedEntityLabel.NONE or recognized_named_entities == LiteralLabel.CARDINAL
+
+    def _determine_label(self, text: str, recognized_named_entities: Union[str, List[str]]) -> Union[str, List[str]]:
+        """
+        Determine a final label of a textual value by refining a NER result with the cascade of custom recognizers
+        :param text: an input textual value
+        :param recognized_named_entities: a NER result (a type, a list of types or NONE)
+        :return: a final label (or a list of labels) for cell value
+        """
+        if self._is_unrecognized(recognized_named_entities):
+            recognized_named_entities = self._determine_number(text).value
+        if self._is_unrecognized(recognized_named_entities):
+            recognized_named_entities = self._determine_time(text).value
+        if self._is_unrecognized(recognized_named_entities):
+            recognized_named_entities = self._determine_date(text).value
+        if self._is_unrecognized(recognized_named_entities):
+            recognized_named_entities = self._determine_entity_mention(text).value
+        if self._is_unrecognized(recognized_named_entities):
+            recognized_named_entities = self._determine_symbol(text).value
+        return recognized_named_entities if recognized_named_entities is not None else NamedEntityLabel.NONE.value
+
+    def _get_known_label(self, text: str) -> Optional[Union[str, List[str]]]:
+        """
+        Get a label of a textual value from cache or label it without NER if it is an unambiguous literal
+        :param text: an input textual value
+        :return: a label or None if a value requires named entity recognition
+        """
+        label = CELL_LABEL_CACHE.get(text)
+        if label is None and PreprocessingConfig.LITERAL_FAST_PATH_ENABLED:
+            literal = LITERAL_DETECTOR.determine_unambiguous_literal(text)
+            if literal != NamedEntityLabel.NONE:
+                label = literal.value
+                CELL_LABEL_CACHE.set(text, label)
+        return label
+
+    def _label_values(self, texts: Iterable[str], use_ner: bool = True) -> Dict[str, Union[str, List[str]]]:
+        """
+        Label distinct textual values, where values with unknown labels are processed by NER in batches
+        :param texts: a set of textual values
+        :param use_ner: flag to enable or disable NER (without NER only custom recognition is used and labels are not cached)
+        :return: a dict of labels for each textual value
+        """
+        labels = {text: self._get_known_label(text) for text in dict.fromkeys(texts)}
+        unknown_texts = [text for text, label in labels.items() if label is None]
+        # Named Entity Recognition for all new distinct values at once
+        recognized_named_entities = self._recognize_named_entities_in_texts(unknown_texts) if use_ner else \
+            dict.fromkeys(unknown_texts, NamedEntityLabel.NONE)
+        # Time expressions are parsed by batches for all values that reach time detection in the cascade of custom recognizers
+        self._temporal_detector.determine_times(text for text, entities in recognized_named_entities.items()
+                                                if self._is_unrecognized(entities) and self._is_unrecognized(
+                                                    self._determine_number(text)))
+        for text, entities in recognized_named_entities.items():
+            labels[text] = self._determine_label(text, entities)  # Custom recognition
+            if use_ner:
+                CELL_LABEL_CACHE.set(text, labels[text])
+        return labels
+
+    def _is_literal_column(self, values: List[str]) -> bool:
+        """
+        Check whether a column is overwhelmingly literal by an evenly spaced sample of its values labeled without NER
+        :param values: non-empty cell values of a column
+        :return: True if a share of literal labels in a sample reaches a threshold, otherwise False
+        """
+        if not values:
+            return False
+        sample = values[::max(1, len(values) // PreprocessingConfig.LITERAL_COLUMN_SAMPLE_SIZE)]
+        labels = [self._get_known_label(value) for value in sample]
+        literals = sum(1 for label in labels if isinstance(label, str) and LiteralLabel.has_value(label))
+        return literals >= PreprocessingConfig.LITERAL_COLUMN_THRESHOLD * len(sample)
+
     def _recognize_named_entities(self) -> Tuple[Dict[str, int], Dict[str, int]]:
         categorical_number, literal_number, empty_number = defaultdict(int), defaultdict(int), 0
+        # Values are keyed by column indexes (different columns can have the same header name)
+        values = {index: [cell.cleared_value for cell in column.cells if cell.cleared_value is not None]
+                  for index, column in enumerate(self.table_model.columns)}
+        # Values of overwhelmingly literal columns are labeled without NER
+        literal_columns = {index for index, column_values in values.items()
+                           if PreprocessingConfig.LITERAL_FAST_PATH_ENABLED and self._is_literal_column(column_values)}
+        labels = self._label_values(value for index, column_values in values.items() if index not in literal_columns
+                                    for value in column_values)
+        for value, label in self._label_values((value for index in literal_columns for value in values[index]
+                                                if value not in labels), False).items():
+            labels[value] = label
         for column in self.table_model.columns:
             for cell in column.cells:
                 if cell.cleared_value is not None:
-                    # Named Entity Recognition
-                    doc = self.named_entity_recognition(cell.cleared_value.lower().title() + ".")
-                    recognized_named_entities = [ent.type for ent in doc.ents] if len(doc.ents) > 1 else NamedEntityLabel.NONE
-                    if len(doc.ents) == 1:
-                        recognized_named_entities = doc.ents[0].type
-                    # Custom recognition
-                    if recognized_named_entities == NamedEntityLabel.NONE or recognized_named_entities == LiteralLabel.CARDINAL:
-                        recognized_named_entities = self._determine_number(cell.cleared_value).value
-                    if recognized_named_entities == NamedEntityLabel.NONE or recognized_named_entities == LiteralLabel.CARDINAL:
-                        recognized_named_entities = self._determine_time(cell.cleared_value, self.duckling_wrapper).value
-                    if recognized_named_entities == NamedEntityLabel.NONE or recognized_named_entities == LiteralLabel.CARDINAL:
-                        recognized_named_entities = self._determine_date(cell.cleared_value).value
-                    if recognized_named_entities == NamedEntityLabel.NONE or recognized_named_entities == LiteralLabel.CARDINAL:
-                        recognized_named_entities = self._determine_entity_mention(cell.cleared_value).value
-                    if recognized_named_entities == NamedEntityLabel.NONE or recognized_named_entities == LiteralLabel.CARDINAL:
-                        recognized_named_entities = self._determine_symbol(cell.cleared_value).value
-                    cell.set_label(recognized_named_entities if recognized_named_entities is not None else NamedEntityLabel.NONE.value)
+                    cell.set_label(labels[cell.cleared_value])
                 else:
                     cell.set_label(LiteralLabel.EMPTY.value)
                 # Counting categorical and literal cells
@@ -198,10 +245,77 @@ class AtomicColumnClassifier(AbstractAtomicColumnClassifier):
                 literal_number[column.header_name] -= empty_number
         return categorical_number, literal_number
 
-    def classify_columns(self) -> None:
+    def _label_cells(self, cells: List[ColumnCellModel]):
+        """
+        Label cells of a column by one batch of distinct values
+        :param cells: a list of cells without labels
+        """
+        for cell in cells:
+            cell.set_labeler(None)
+        labels = self._label_values(cell.cleared_value for cell in cells if cell.cleared_value is not None)
+        for cell in cells:
+            cell.set_label(labels[cell.cleared_value] if cell.cleared_value is not None else LiteralLabel.EMPTY.value)
+
+    @staticmethod
+    def _determine_column_type(categorical: int, literal: int) -> ColumnType:
+        """
+        Determine a column type by numbers of categorical and literal labels
+        :param categorical: number of categorical labels
+        :param literal: number of literal labels
+        :return: a column type
+        """
+        return ColumnType.CATEGORICAL_COLUMN if categorical >= literal else ColumnType.LITERAL_COLUMN
+
+    @staticmethod
+    def _is_decided(categorical: int, literal: int) -> bool:
+        """
+        Check whether the comparison of categorical and literal labels in a sample holds for a whole column with configured
+        confidence: a share of categorical labels differs from one half (a tie goes to categorical) by more than a Hoeffding bound
+        :param categorical: number of categorical labels in a sample
+        :param literal: number of literal labels in a sample
+        :return: True if a column type is determined with configured confidence, otherwise False
+        """
+        number = categorical + literal
+        if number == 0:
+            return False
+        bound = math.sqrt(math.log(2 / (1 - PreprocessingConfig.SAMPLING_CONFIDENCE)) / (2 * number))
+        return abs(categorical / number - 0.5) > bound
+
+    def _classify_column_by_sampling(self, column: TableColumnModel):
+        """
+        Determine a column type by labeling random batches of cells until the decision between categorical and literal
+        types is confident, where the remaining cells get a deferred labeler
+        :param column: a column model
+        """
+        order = list(range(len(column.cells)))
+        random.Random(0).shuffle(order)  # Deterministic sample for the same column size
+        categorical, literal, empty, position = 0, 0, 0, 0
+        while position < len(order) and not self._is_decided(categorical, literal):
+            cells = [column.cells[i] for i in order[position:position + PreprocessingConfig.SAMPLING_BATCH_SIZE]]
+            position += len(cells)
+            self._label_cells(cells)
+            for cell in cells:
+                for label in cell.label if isinstance(cell.label, list) else [cell.label]:
+                    categorical += 1 if NamedEntityLabel.has_value(label) else 0
+                    literal += 1 if LiteralLabel.has_value(label) and label != LiteralLabel.EMPTY else 0
+                    empty += 1 if label == LiteralLabel.EMPTY else 0
+        # Empty cells are counted as literal ones only in a column without categorical cells as in a full scan
+        column.set_column_type(self._determine_column_type(categorical, literal if categorical > 0 else literal + empty))
+        # Cells outside a sample are labeled all at once when a label of any of them is requested
+        pending = [column.cells[i] for i in order[position:]]
+        if pending:
+            labeler = lambda: self._label_cells(pending)
+            for cell in pending:
+                cell.set_labeler(labeler)
+
+    def classify_columns(self, sampling: bool = False) -> None:
+        if sampling:
+            for column in self.table_model.columns:
+                self._classify_column_by_sampling(column)
+            return
         categorical_number, literal_number = self._recognize_named_entities()  # Recognize named entities for table cells
         # Determine an atomic type for columns based on classified cells
         for column in self.table_model.columns:
             categorical, literal = categorical_number.get(column.header_name), literal_number.get(column.header_name)
             if categorical is not None and literal is not None:
-                column.set_column_type(ColumnType.CATEGORICAL_COLUMN if categorical >= literal else ColumnType.LITERAL_COLUMN)
+                column.set_column_type(self._determine_column_type(categorical, literal))
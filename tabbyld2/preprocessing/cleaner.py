@@ -1,4 +1,13 @@
+from typing import Any, List, Optional, Sequence
+
 import ftfy
+import pandas as pd
+from tabbyld2.config import PreprocessingConfig
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
 
 
 def remove_multiple_spaces(text: str) -> str:
@@ -27,14 +36,11 @@ def remove_garbage_characters(text: str) -> str:
     :param text: a source text
     :return: text with garbage characters removed
     """
-    new_text = ""
-    if check_letter_and_digit_existence(text):
-        if text.endswith("."):
-            text = text[:-1]
-        for word in text.split():
-            if check_letter_and_digit_existence(word) and word:
-                new_text += " " + word if new_text else word
-    return new_text
+    if not check_letter_and_digit_existence(text):
+        return ""
+    if text.endswith("."):
+        text = text[:-1]
+    return " ".join(word for word in text.split() if check_letter_and_digit_existence(word))
 
 
 def fix_text(text: str) -> str:
@@ -44,3 +50,57 @@ def fix_text(text: str) -> str:
     :return: corrected text
     """
     return ftfy.fix_text(ftfy.fix_encoding(str(text)))
+
+
+def is_plain_text(text: str) -> bool:
+    """
+    Check that a source text does not need fixing by ftfy: printable ASCII characters without HTML entities
+    :param text: a source text
+    :return: True if a text is plain, otherwise False
+    """
+    return text.isascii() and text.isprintable() and "&" not in text
+
+
+def clean_text(text: Any) -> Optional[str]:
+    """
+    Clean a source cell value: fix broken Unicode characters (only if necessary), remove garbage characters and multiple spaces
+    :param text: a source cell value
+    :return: a cleared value or None if nothing is left
+    """
+    text = str(text)
+    if not is_plain_text(text):
+        text = fix_text(text)
+    return remove_multiple_spaces(remove_garbage_characters(text)) or None
+
+
+def _clean_plain_texts_by_pandas(texts: pd.Series) -> pd.Series:
+    """
+    Clean plain (ASCII) texts of a column at once by pandas string methods (pyarrow string kernels are used if installed)
+    :param texts: a series of plain texts
+    :return: a series of cleared texts
+    """
+    if pyarrow is not None:
+        texts = texts.astype("string[pyarrow]")
+    # Remove a final dot and words without letters and digits (only ASCII letters and digits are in plain texts)
+    words = texts.str.replace(r"\.$", "", regex=True).str.findall(r"\S*[A-Za-z0-9]\S*")
+    return words.str.join(" ").astype(object)
+
+
+def clean_values(values: Sequence[Any], use_pandas: bool = None) -> List[Optional[str]]:
+    """
+    Clean source values of a column, where each distinct value is processed only once
+    :param values: a list of source cell values (without None)
+    :param use_pandas: flag to clean plain texts of a column at once by pandas (configuration value is used by default)
+    :return: a list of cleared values (None if nothing is left)
+    """
+    if use_pandas is None:
+        use_pandas = PreprocessingConfig.PANDAS_CLEANING_ENABLED
+    texts = [str(value) for value in values]
+    distinct_texts = list(dict.fromkeys(texts))
+    if use_pandas:
+        plain_texts = [text for text in distinct_texts if is_plain_text(text)]
+        cleared_texts = dict(zip(plain_texts, _clean_plain_texts_by_pandas(pd.Series(plain_texts, dtype=object)).tolist()))
+        cleared_texts = {text: cleared_texts[text] or None if text in cleared_texts else clean_text(text) for text in distinct_texts}
+    else:
+        cleared_texts = {text: clean_text(text) for text in distinct_texts}
+    return [cleared_texts[text] for text in texts]
@@ -0,0 +1,136 @@
+import re
+from typing import Dict, Optional, Pattern, Tuple, Union
+
+from tabbyld2.helpers.utility import is_float
+from tabbyld2.preprocessing.labels import LiteralLabel, NamedEntityLabel
+
+
+# Patterns of integer numbers (a value must start with a minus or a non-zero digit)
+NUMBER_PATTERNS = (
+    (LiteralLabel.NEGATIVE_INTEGER, r"^-[1-9]\d*$"),
+    (LiteralLabel.POSITIVE_INTEGER, r"^[1-9]\d*$"),
+)
+# Patterns of complex numerical values in order of priority
+COMPLEX_NUMERICAL_PATTERNS = (
+    (LiteralLabel.ISSN, r"^[0-9]{4}-[0-9]{3}[0-9xX]$"),
+    (LiteralLabel.ISBN, r"^(?:ISBN(?:: ?| ))?((?:97[89])?\d{9}[\dx])+$"),
+    (LiteralLabel.IP_ADDRESS_V4, r"(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4]"
+                                 r"[0-9]|[01]?[0-9][0-9]?)\.(25[0-5]|2[0-4][0-9]|[01]?[0-9][0-9]?)$"),
+    (LiteralLabel.BANK_CARD, r"^([456][0-9]{3})-?([0-9]{4})-?([0-9]{4})-?([0-9]{4})$"),
+    (LiteralLabel.COLOR, r"#[0-9A-Fa-f]{6}"),
+    (LiteralLabel.COORDINATES, r"^(-?\d+(\.\d+)?),\s*(-?\d+(\.\d+)?)$"),
+    (LiteralLabel.PHONE, r"^((?:\+\d{2}[-\.\s]??|\d{4}[-\.\s]??)?(?:\d{3}[-\.\s]??\d{3}[-\.\s]??\d{4}|\(\d{3}\)\s*\d{3}[-\.\s]??\d{4}|"
+                         r"\d{3}[-\.\s]??\d{4}))$"),
+    (LiteralLabel.TEMPERATURE, r"([+-]?\d+(\.\d+)*)\s?°([CcFf])"),
+    (LiteralLabel.HEXADECIMAL, r"^(0x)?[a-fA-F0-9]+$"),
+)
+# Patterns of literal values that can be recognized as entity mentions in order of priority
+ENTITY_MENTION_PATTERNS = (
+    (LiteralLabel.BOOLEAN, r"^'true|false|True|False|TRUE|FALSE'&"),
+    (LiteralLabel.MAIL, r"^\d{6}$"),
+    (LiteralLabel.MAIL, r"^\d{5}(?:[-\s]\d{4})?$"),
+    (LiteralLabel.EMAIL, r"[\w.-]+@[\w.-]+\.?[\w]+?"),
+    (LiteralLabel.ID, r"((id|ID)[^a-zA-Z])|((([[:punct:]]id)|([[:punct:]]ID))^[^a-zA-Z])"),
+    (LiteralLabel.URL, r"((http|https)\:\/\/)?[a-zA-Z0-9\.\/\?\:@\-_=#]+\.([a-zA-Z]){2,6}([a-zA-Z0-9\.\&\/\?\:@\-_=#])*"),
+)
+# Strict patterns of literal values that cannot be named entities (they are labeled without NER), where year-like
+# integers are excluded, since NER recognizes them as dates
+UNAMBIGUOUS_NUMBER_PATTERN = r"^(?!(?:1[0-9]{3}|20[0-9]{2})$)[+-]?\d+(?:[.,]\d+)?$"
+UNAMBIGUOUS_LITERAL_PATTERNS = (
+    (LiteralLabel.BOOLEAN, r"^(?i:true|false)$"),
+    (LiteralLabel.EMAIL, r"^[\w.+-]+@[\w-]+(?:\.[\w-]+)+$"),
+    (LiteralLabel.URL, r"^(?:https?://|www\.)\S+$"),
+    (LiteralLabel.ISBN, r"^ISBN(?:: ?| )(?:97[89])?\d{9}[\dxX]$"),
+    (LiteralLabel.IP_ADDRESS_V4, r"^(?:(?:25[0-5]|2[0-4]\d|[01]?\d\d?)\.){3}(?:25[0-5]|2[0-4]\d|[01]?\d\d?)$"),
+)
+# Prefilters with characters (or words) that are required by at least one pattern of a group
+COMPLEX_NUMERICAL_PREFILTER = r"[\d#]"
+ENTITY_MENTION_PREFILTER = r"[.@\d]|id|ID|true|false|True|False|TRUE|FALSE"
+
+
+def compile_patterns(patterns: Tuple[Tuple[LiteralLabel, str], ...]) -> Tuple[Pattern, Dict[str, LiteralLabel]]:
+    """
+    Combine patterns into one regular expression of alternatives with named groups, where each alternative is a lookahead
+    that searches its pattern anywhere in a text, so the first alternative in order of priority wins
+    :param patterns: pairs of a literal label and a pattern in order of priority
+    :return: a compiled regular expression and a dict of literal labels for its named groups
+    """
+    alternatives, labels = [], {}
+    for i, (label, pattern) in enumerate(patterns):
+        name = "pattern" + str(i)
+        alternatives.append("(?P<%s>(?=(?s:.*?)(?:%s)))" % (name, pattern))
+        labels[name] = label
+    return re.compile("|".join(alternatives)), labels
+
+
+class LiteralDetector:
+    """
+    Detector of literal types in textual values by precompiled regular expressions, where each group of patterns is checked in
+    a single search call with cheap prefilters
+    """
+    __slots__ = ("_number_patterns", "_complex_numerical_prefilter", "_complex_numerical_pattern", "_complex_numerical_labels",
+                 "_hexadecimal_pattern", "_entity_mention_prefilter", "_entity_mention_pattern", "_entity_mention_labels",
+                 "_unambiguous_number_pattern", "_unambiguous_literal_pattern", "_unambiguous_literal_labels")
+
+    def __init__(self):
+        self._number_patterns = tuple((label, re.compile(pattern)) for label, pattern in NUMBER_PATTERNS)
+        self._complex_numerical_prefilter = re.compile(COMPLEX_NUMERICAL_PREFILTER)
+        self._complex_numerical_pattern, self._complex_numerical_labels = compile_patterns(COMPLEX_NUMERICAL_PATTERNS)
+        self._hexadecimal_pattern = re.compile(dict((label, pattern) for label, pattern in COMPLEX_NUMERICAL_PATTERNS)[
+            LiteralLabel.HEXADECIMAL])
+        self._entity_mention_prefilter = re.compile(ENTITY_MENTION_PREFILTER)
+        self._entity_mention_pattern, self._entity_mention_labels = compile_patterns(ENTITY_MENTION_PATTERNS)
+        self._unambiguous_number_pattern = re.compile(UNAMBIGUOUS_NUMBER_PATTERN)
+        self._unambiguous_literal_pattern, self._unambiguous_literal_labels = compile_patterns(UNAMBIGUOUS_LITERAL_PATTERNS)
+
+    @staticmethod
+    def _search(pattern: Pattern, labels: Dict[str, LiteralLabel], text: str) -> Optional[LiteralLabel]:
+        match = pattern.match(text)
+        return labels[match.lastgroup] if match is not None else None
+
+    def determine_number(self, text: str) -> Union[LiteralLabel, NamedEntityLabel]:
+        """
+        Determine a number type in an input textual value
+        :param text: an input textual value
+        :return: a literal label for a number or NONE
+        """
+        # Integer numbers start with a minus or a non-zero digit
+        if text and text[0] in "-123456789":
+            for label, pattern in self._number_patterns:
+                if pattern.search(text):
+                    return label
+        return LiteralLabel.FLOAT if is_float(text) else NamedEntityLabel.NONE
+
+    def determine_complex_numerical_values(self, text: str) -> Union[LiteralLabel, NamedEntityLabel]:
+        """
+        Determine complex numerical values in an input textual value
+        :param text: an input textual value
+        :return: a literal label for a complex numerical value or NONE
+        """
+        # Only hexadecimal values (written by letters) can be without digits and '#' character
+        if not self._complex_numerical_prefilter.search(text):
+            return LiteralLabel.HEXADECIMAL if self._hexadecimal_pattern.search(text) else NamedEntityLabel.NONE
+        return self._search(self._complex_numerical_pattern, self._complex_numerical_labels, text) or NamedEntityLabel.NONE
+
+    def determine_entity_mention(self, text: str) -> Union[LiteralLabel, NamedEntityLabel]:
+        """
+        Determine a specific literal label for an entity mention
+        :param text: an input textual value
+        :return: a literal label or NONE
+        """
+        if not self._entity_mention_prefilter.search(text):
+            return NamedEntityLabel.NONE
+        return self._search(self._entity_mention_pattern, self._entity_mention_labels, text) or NamedEntityLabel.NONE
+
+    def determine_unambiguous_literal(self, text: str) -> Union[LiteralLabel, NamedEntityLabel]:
+        """
+        Determine a literal label for a value that unambiguously is a number, a boolean, an email, an URL, an ISBN or an IP address
+        :param text: an input textual value
+        :return: a literal label or NONE if a value requires named entity recognition
+        """
+        if self._unambiguous_number_pattern.match(text):
+            return self.determine_number(text)
+        return self._search(self._unambiguous_literal_pattern, self._unambiguous_literal_labels, text) or NamedEntityLabel.NONE
+
+
+LITERAL_DETECTOR = LiteralDetector()
@@ -1,5 +1,3 @@
-import collections
-import re
 from abc import ABC, abstractmethod
 from math import sqrt
 
@@ -93,17 +91,13 @@ class SubjectColumnIdentifier(AbstractSubjectColumnIdentifier):
         return self._table_model
 
     def get_empty_cell_fraction(self, column_index: int = None) -> float:
-        return sum(1 if not cell else 0 for cell in self.table_model.column(column_index)) / self.table_model.rows_number
+        return self.table_model.column_profile(column_index).empty_cell_number / self.table_model.rows_number
 
     def get_cell_fraction_with_acronyms(self, column_index: int = None) -> float:
-        cn = sum(1 if cell is not None and re.search(r"\b[A-ZА-Я.]{2,}\b", cell) else 0 for cell in self.table_model.column(column_index))
-        return cn / self.table_model.rows_number
+        return self.table_model.column_profile(column_index).acronym_cell_number / self.table_model.rows_number
 
     def get_unique_content_cell_fraction(self, column_index: int = None) -> float:
-        col = collections.Counter()
-        for cell in self.table_model.column(column_index):
-            col[cell] += 1
-        return len(col) / self.table_model.rows_number
+        return self.table_model.column_profile(column_index).unique_cell_number / self.table_model.rows_number
 
     def get_distance_from_first_ne_column(self, column_index: int = None) -> int:
         categorical_column_index = 0
@@ -114,7 +108,7 @@ class SubjectColumnIdentifier(AbstractSubjectColumnIdentifier):
         return sum(1 if i < column_index else 0 for i in range(categorical_column_index, self.table_model.columns_number))
 
     def get_average_word_number(self, column_index: int = None, threshold_factor: int = 0) -> float:
-        score = sum(len(cell.split()) if cell else 0 for cell in self.table_model.column(column_index)) / self.table_model.rows_number
+        score = self.table_model.column_profile(column_index).word_number / self.table_model.rows_number
         return score / threshold_factor if score <= threshold_factor else 0
 
     def determine_prepositions_in_column_header_name(self, column_index: int = None) -> int:
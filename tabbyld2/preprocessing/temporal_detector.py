@@ -0,0 +1,106 @@
+import threading
+from typing import Dict, Iterable, List, Tuple, Union
+
+from dateparser.date import DateDataParser
+from duckling import Dim, DucklingWrapper
+from tabbyld2.config import PreprocessingConfig
+from tabbyld2.helpers.cache import LRUCache
+from tabbyld2.preprocessing.labels import LiteralLabel, NamedEntityLabel
+
+
+# Separator of textual values joined into one Duckling input (it cannot be a part of any time expression)
+DUCKLING_SEPARATOR = "\n|||\n"
+# Memoized results of time and date detection shared by all tables of a process (keyed by languages and textual values)
+TIME_CACHE = LRUCache(PreprocessingConfig.TEMPORAL_CACHE_SIZE)
+DATE_CACHE = LRUCache(PreprocessingConfig.TEMPORAL_CACHE_SIZE)
+# DateParser objects built once per process for each set of languages
+_DATE_PARSERS: Dict[Tuple[str, ...], DateDataParser] = {}
+_DATE_PARSERS_LOCK = threading.Lock()
+
+
+def get_date_parser(languages: Tuple[str, ...]) -> DateDataParser:
+    """
+    Get a DateParser object restricted to languages, which is built once per process
+    :param languages: a set of language codes
+    :return: a shared DateParser object
+    """
+    with _DATE_PARSERS_LOCK:
+        if languages not in _DATE_PARSERS:
+            _DATE_PARSERS[languages] = DateDataParser(languages=list(languages))
+        return _DATE_PARSERS[languages]
+
+
+class TemporalLiteralDetector:
+    """
+    Detector of time and date literals, where Duckling parses batches of textual values in one call and DateParser
+    is prebuilt once per process for configured languages (without language detection over all installed locales)
+    """
+    __slots__ = ("_duckling_wrapper", "_languages", "_date_parser")
+
+    def __init__(self, duckling_wrapper: DucklingWrapper, languages: List[str] = None):
+        self._duckling_wrapper = duckling_wrapper
+        self._languages = tuple(languages or PreprocessingConfig.DATE_PARSER_LANGUAGES)
+        self._date_parser = get_date_parser(self._languages)
+
+    @property
+    def duckling_wrapper(self):
+        return self._duckling_wrapper
+
+    @property
+    def languages(self):
+        return self._languages
+
+    def _parse_times(self, texts: List[str]) -> Dict[str, bool]:
+        """
+        Parse textual values joined by a separator in one Duckling call
+        :param texts: a list of distinct textual values
+        :return: a dict of flags whether a whole textual value is a time expression
+        """
+        # Duckling is run on JVM, so its offsets are counted in UTF-16 code units (a non-BMP character takes two of them)
+        offsets, position = {}, 0
+        for text in texts:
+            offsets[position] = text
+            position += len((text + DUCKLING_SEPARATOR).encode("utf-16-le")) // 2
+        results = dict.fromkeys(texts, False)
+        dim_list = self.duckling_wrapper.parse(DUCKLING_SEPARATOR.join(texts), reference_time="1")
+        for item in dim_list or ():
+            text = offsets.get(item.get("start"))
+            if text is not None and item["text"] == text and item["dim"] == Dim.TIME:
+                results[text] = True
+        return results
+
+    def determine_times(self, texts: Iterable[str], batch_size: int = None) -> Dict[str, bool]:
+        """
+        Determine time expressions among textual values by batches, where only values without memoized results are parsed
+        :param texts: a set of textual values
+        :param batch_size: number of values in one Duckling call (configuration value is used by default)
+        :return: a dict of flags whether a textual value is a time expression
+        """
+        results = {text: TIME_CACHE.get((self._languages, text)) for text in dict.fromkeys(texts)}
+        unknown_texts = [text for text, result in results.items() if result is None and text]
+        batch_size = batch_size or PreprocessingConfig.DUCKLING_BATCH_SIZE
+        for i in range(0, len(unknown_texts), batch_size):
+            for text, result in self._parse_times(unknown_texts[i:i + batch_size]).items():
+                results[text] = result
+                TIME_CACHE.set((self._languages, text), result)
+        return {text: bool(result) for text, result in results.items()}
+
+    def determine_time(self, text: str) -> Union[LiteralLabel, NamedEntityLabel]:
+        """
+        Determine time label in a textual value based on the Duckling library
+        :param text: an input textual value
+        :return: a time label or NONE
+        """
+        return LiteralLabel.TIME if self.determine_times([text])[text] else NamedEntityLabel.NONE
+
+    def determine_date(self, text: str) -> Union[LiteralLabel, NamedEntityLabel]:
+        """
+        Determine date label in a textual value based on the DateParser library
+        :param text: an input textual value
+        :return: a date label or NONE
+        """
+        result = DATE_CACHE.get((self._languages, text))
+        if result is None:
+            result = self._date_parser.get_date_data(text).date_obj is not None
+            DATE_CACHE.set((self._languages, text), result)
+        return LiteralLabel.DATE if result else NamedEntityLabel.NONE
@@ -1,14 +1,16 @@
 from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 
 class AbstractSemanticTableAnnotator(ABC):
     __slots__ = ()
 
     @abstractmethod
-    def find_candidate_entities(self, only_subject_column: bool = False) -> None:
+    def find_candidate_entities(self, only_subject_column: bool = False, max_workers: Optional[int] = None) -> None:
         """
         Find a set of candidate entities based on a textual entity mention
         :param only_subject_column: flag to include or exclude all columns from result
+        :param max_workers: maximum number of concurrent lookups (configuration value is used by default)
         """
         pass
 
@@ -35,10 +37,11 @@ class AbstractSemanticTableAnnotator(ABC):
         pass
 
     @abstractmethod
-    def rank_candidate_entities_by_entity_embeddings_based_similarity(self) -> None:
+    def rank_candidate_entities_by_entity_embeddings_based_similarity(self, neighbours: Optional[int] = None) -> None:
         """
         Rank a set of candidate entities for cell values of categorical columns including a subject column by
         using an entity embeddings based similarity
+        :param neighbours: number of nearest candidates of other cells for approximate scoring (None means all candidates are compared)
         """
         pass
 
@@ -113,3 +116,132 @@ class AbstractSemanticTableAnnotator(ABC):
         Annotate all literal columns based on recognized named entities (NER) in cells
         """
         pass
+
+
+class AbstractKnowledgeBase(ABC):
+    __slots__ = ()
+
+    @abstractmethod
+    def get_candidate_entities(self, entity_mention: str = "", deep_search: bool = True, short_name: bool = False) \
+            -> Dict[str, List[str]]:
+        """
+        Get a set of candidate entities whose labels contain words of a textual entity mention
+        :param entity_mention: a textual entity mention
+        :param deep_search: flag to enable or disable deep search mode by various combinations of words
+        :param short_name: flag to enable or disable short entity name display mode (without full URI)
+        :return: a dict of candidate entities with their labels, comments and redirects
+        """
+        pass
+
+    @abstractmethod
+    def lookup_candidate_entities(self, query: str, max_results: int = None, short_name: bool = False) -> Dict[str, List[str]]:
+        """
+        Get a set of candidate entities by string query in the same way as the DBpedia Lookup service
+        :param query: query string
+        :param max_results: maximum number of candidate entities returned in a single lookup
+        :param short_name: flag to enable or disable short entity name display mode (without full URI)
+        :return: a dict of candidate entities with their labels, comments and redirects
+        """
+        pass
+
+    @abstractmethod
+    def get_candidate_classes(self, class_mention: str = "", deep_search: bool = True, short_name: bool = False) -> Dict[str, List[str]]:
+        """
+        Get a set of candidate classes whose labels contain words of a textual class mention
+        :param class_mention: a textual class mention
+        :param deep_search: flag to enable or disable deep search mode by various combinations of words
+        :param short_name: flag to enable or disable short class name display mode (without full URI)
+        :return: a dict of candidate classes with their labels and comments
+        """
+        pass
+
+    @abstractmethod
+    def get_classes_for_entities(self, entities: Iterable[str], short_name: bool = False) -> Dict[str, Dict[str, List]]:
+        """
+        Get sets of classes for entities
+        :param entities: a set of entities
+        :param short_name: flag to enable or disable short class name display mode (without full URI)
+        :return: a dict of classes with their labels and comments for each entity
+        """
+        pass
+
+    @abstractmethod
+    def get_class_hierarchy(self) -> List[Tuple[str, str]]:
+        """
+        Get all direct subclass relations between classes of the ontology
+        :return: a list of pairs (class, parent class)
+        """
+        pass
+
+    @abstractmethod
+    def get_parent_classes(self, dbpedia_class: str = "", short_name: bool = False) -> Tuple[str, ...]:
+        """
+        Get a set of parent classes (including a class itself) for a target class
+        :param dbpedia_class: a target class
+        :param short_name: flag to enable or disable short class name display mode (without full URI)
+        :return: a list of found parent classes
+        """
+        pass
+
+    @abstractmethod
+    def get_distance_to_class(self, entity: str = "", target_classes: Any = None) -> int:
+        """
+        Get a distance to target classes of an entity (number of classes between entity types and target classes)
+        :param entity: an entity
+        :param target_classes: a target class or a set of target classes
+        :return: a distance to a target class (non-negative integer including zero)
+        """
+        pass
+
+    @abstractmethod
+    def get_redirects(self, entities: Iterable[str]) -> Tuple[str, ...]:
+        """
+        Get entities that are redirects to these entities
+        :param entities: a set of entities
+        :return: a list of URI for redirect entities
+        """
+        pass
+
+    @abstractmethod
+    def get_subjects_for_entity(self, entity: str, short_name: bool = False) -> Dict[str, List[str]]:
+        """
+        Get entities that are subjects of RDF triples with an entity as an object
+        :param entity: an entity
+        :param short_name: flag to enable or disable short entity name display mode (without full URI)
+        :return: a dict of subject entities with their labels and comments
+        """
+        pass
+
+    @abstractmethod
+    def get_objects_for_entity(self, entity: str, short_name: bool = False) -> Dict[str, List[str]]:
+        """
+        Get entities that are objects of RDF triples with an entity as a subject
+        :param entity: an entity
+        :param short_name: flag to enable or disable short entity name display mode (without full URI)
+        :return: a dict of object entities with their labels and comments
+        """
+        pass
+
+    @abstractmethod
+    def get_contexts_for_entities(self, entities: Iterable[str], short_name: bool = False) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Get contexts (subjects and objects from RDF triples) for entities
+        :param entities: a set of entities
+        :param short_name: flag to enable or disable short entity name display mode (without full URI)
+        :return: a dict of context entities with their labels and comments for each entity
+        """
+        pass
+
+
+class AbstractVectorIndex(ABC):
+    __slots__ = ()
+
+    @abstractmethod
+    def search(self, queries: Any, k: int) -> Tuple[Any, Any]:
+        """
+        Find nearest neighbours of query vectors by cosine similarity
+        :param queries: a matrix of normalized query vectors
+        :param k: number of nearest neighbours for each query
+        :return: a matrix of neighbour indexes and a matrix of their similarities (ordered by decreasing similarity)
+        """
+        pass
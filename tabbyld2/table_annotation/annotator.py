@@ -1,16 +1,23 @@
-from collections import Counter
-from typing import Tuple
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
 
+import numpy as np
 import tabbyld2.table_annotation.dbpedia_lookup as dbl
 from Levenshtein._levenshtein import distance
-from gensim.models.word2vec import Word2Vec
+from tabbyld2.config import ConcurrencyConfig, EmbeddingsConfig, KnowledgeBaseConfig
 from tabbyld2.datamodel.knowledge_graph_model import ClassModel, EntityModel
 from tabbyld2.datamodel.tabular_data_model import TableModel
+from tabbyld2.helpers.embeddings import get_keyed_vectors
 from tabbyld2.preprocessing.atomic_column_classifier import ColumnType
 from tabbyld2.table_annotation.abstract import AbstractSemanticTableAnnotator
 from tabbyld2.table_annotation.concept_mapping import CLASS_MAPPING, DATATYPE_MAPPING, OntologyClass, XMLSchemaDataType
+from tabbyld2.table_annotation.context_index import TableContextIndex
+from tabbyld2.table_annotation.context_provider import CONTEXT_PROVIDER
 from tabbyld2.table_annotation.dbpedia_sparql_endpoint import DBPediaConfig, get_candidate_classes, get_candidate_entities, \
-    get_classes_for_entity, get_distance_to_class
+    get_classes_for_entities, get_fuzzy_candidate_entities
+from tabbyld2.table_annotation.ontology_hierarchy import get_ontology_hierarchy
+from tabbyld2.table_annotation.vector_index import create_vector_index
 
 
 class SemanticTableAnnotator(AbstractSemanticTableAnnotator):
@@ -22,27 +29,62 @@ class SemanticTableAnnotator(AbstractSemanticTableAnnotator):
     def table_model(self):
         return self._table_model
 
-    def find_candidate_entities(self, only_subject_column: bool = False):
-        for column in self.table_model.columns:
-            if (column.column_type == ColumnType.CATEGORICAL_COLUMN and not only_subject_column) or \
-                    column.column_type == ColumnType.SUBJECT_COLUMN:
-                for cell in column.cells:
-                    if cell.cleared_value is not None and cell.candidate_entities is None:
-                        # Get a set of candidate entities using the DBpedia Lookup
-                        candidate_entities_from_dbl = dbl.get_candidate_entities(cell.cleared_value, 100, None)
-                        # Get a set of candidate entities using the DBpedia SPARQL Endpoint
-                        candidate_entities = get_candidate_entities(cell.cleared_value, False if candidate_entities_from_dbl else True)
-                        # Form common dict for candidate entities
-                        for entity_uri, item in candidate_entities_from_dbl.items():
-                            if entity_uri not in candidate_entities:
-                                candidate_entities[entity_uri] = item
-                        if candidate_entities:
-                            cell.set_candidate_entities([EntityModel(uri, lb, cm, rd) for uri, (lb, cm, rd) in candidate_entities.items()])
-                        # Form a set of candidate entities for cells with same values
-                        for cl in column.cells:
-                            if cl.cleared_value == cell.cleared_value and cl.candidate_entities is None:
-                                cl.set_candidate_entities(cell.candidate_entities)
-                        print("The candidate entity lookup for '" + str(cell.cleared_value) + "' cell is complete.")
+    @staticmethod
+    def _search_candidate_entities(entity_mention: str) -> Dict[str, List]:
+        """
+        Search a set of candidate entities for a textual entity mention using DBpedia Lookup, DBpedia SPARQL Endpoint and
+        the approximate search by labels
+        :param entity_mention: a textual entity mention
+        :return: a dict of candidate entities
+        """
+        # Get a set of candidate entities using the DBpedia Lookup
+        candidate_entities_from_dbl = dbl.get_candidate_entities(entity_mention, 100, None)
+        # Get a set of candidate entities using the DBpedia SPARQL Endpoint
+        candidate_entities = get_candidate_entities(entity_mention, False if candidate_entities_from_dbl else True)
+        # Get a set of candidate entities with typos in labels using the approximate search
+        candidate_entities_from_fuzzy_search = get_fuzzy_candidate_entities(entity_mention, KnowledgeBaseConfig.FUZZY_SEARCH_MAX_RESULTS)
+        # Form common dict for candidate entities
+        for entity_uri, item in {**candidate_entities_from_fuzzy_search, **candidate_entities_from_dbl}.items():
+            if entity_uri not in candidate_entities:
+                candidate_entities[entity_uri] = item
+        print("The candidate entity lookup for '" + str(entity_mention) + "' cell is complete.")
+        return candidate_entities
+
+    @classmethod
+    def find_candidate_entities_for_tables(cls, table_models: Iterable[TableModel], only_subject_column: bool = False,
+                                           max_workers: Optional[int] = None):
+        """
+        Find a set of candidate entities for a batch of tables, where each distinct mention is looked up only once
+        :param table_models: a set of table models
+        :param only_subject_column: flag to include or exclude all columns from result
+        :param max_workers: maximum number of concurrent lookups (configuration value is used by default)
+        """
+        # Plan lookups: index cells by distinct mentions (cells of each column form a separate group)
+        cell_groups = defaultdict(list)
+        for table_model in table_models:
+            for column in table_model.columns:
+                if (column.column_type == ColumnType.CATEGORICAL_COLUMN and not only_subject_column) or \
+                        column.column_type == ColumnType.SUBJECT_COLUMN:
+                    column_index = defaultdict(list)
+                    for cell in column.cells:
+                        if cell.cleared_value is not None and cell.candidate_entities is None:
+                            column_index[cell.cleared_value].append(cell)
+                    for mention, cells in column_index.items():
+                        cell_groups[mention].append(cells)
+        max_workers = max_workers if max_workers is not None else ConcurrencyConfig.MAX_WORKERS
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            lookups = {mention: executor.submit(cls._search_candidate_entities, mention) for mention in cell_groups}
+            for mention, lookup in lookups.items():
+                candidate_entities = lookup.result()
+                # Scatter candidate entities to cells, where cells with same values in a column share the same candidates
+                for cells in cell_groups[mention]:
+                    entities = [EntityModel(uri, lb, cm, rd) for uri, (lb, cm, rd) in candidate_entities.items()] \
+                        if candidate_entities else None
+                    for cell in cells:
+                        cell.set_candidate_entities(entities)
+
+    def find_candidate_entities(self, only_subject_column: bool = False, max_workers: Optional[int] = None):
+        self.find_candidate_entities_for_tables([self.table_model], only_subject_column, max_workers)
 
     @staticmethod
     def _normalize(current_value: int, max_range: int, min_range: int = 0) -> float:
@@ -58,51 +100,52 @@ class SemanticTableAnnotator(AbstractSemanticTableAnnotator):
         except ZeroDivisionError:
             return 0
 
-    def get_levenshtein_distance(self, text_mention: str, candidate: str, candidates: Tuple[EntityModel, ...],
-                                 underscore_replacement: bool = True, short_name: bool = True) -> float:
+    def get_levenshtein_distances(self, text_mention: str, candidates: Iterable[Any], underscore_replacement: bool = True,
+                                  short_name: bool = True) -> List[float]:
         """
-        Calculate the Levenshtein distance (edit distance) between two strings
+        Calculate the Levenshtein distance (edit distance) between a textual mention and each of candidate concepts in one pass
         :param text_mention: a textual mention of entity or class
-        :param candidate: a candidate concept (entity or class)
         :param candidates: a set of candidate concepts (entities or classes)
         :param underscore_replacement: flag to enable or disable replace mode of underscore character with a space
         :param short_name: flag to enable or disable short concept name display mode (without full URI)
-        :return: normalized Levenshtein distance in the range [0, ..., 1]
+        :return: a list of normalized Levenshtein distances in the range [0, ..., 1] in the order of candidates
         """
-        if underscore_replacement:
-            candidate = candidate.replace("_", " ")
-        if short_name:
-            candidate = candidate.replace(DBPediaConfig.BASE_RESOURCE_URI, "").replace(DBPediaConfig.BASE_ONTOLOGY_URI, "")
-        levenshtein_distance = distance(text_mention, candidate)  # Calculate Levenshtein distance
-        # Normalize Levenshtein distance
-        max_range = len(text_mention)
-        for c in candidates:
-            cnd = c.uri.replace(DBPediaConfig.BASE_RESOURCE_URI, "").replace(DBPediaConfig.BASE_ONTOLOGY_URI, "") if short_name else c.uri
-            if len(cnd) > max_range:
-                max_range = len(cnd)
-        return 1 - self._normalize(levenshtein_distance, max_range)
+        names = [c.uri.replace(DBPediaConfig.BASE_RESOURCE_URI, "").replace(DBPediaConfig.BASE_ONTOLOGY_URI, "") if short_name else c.uri
+                 for c in candidates]
+        # Normalize Levenshtein distances by the same maximum length for all candidates
+        max_range = max([len(text_mention)] + [len(name) for name in names])
+        return [1 - self._normalize(distance(text_mention, name.replace("_", " ") if underscore_replacement else name), max_range)
+                for name in names]
 
     def rank_candidate_entities_by_string_similarity(self):
         for column in self.table_model.columns:
             for cell in column.cells:
                 if cell.candidate_entities is not None:
-                    for candidate_entity in cell.candidate_entities:
-                        candidate_entity._string_similarity = self.get_levenshtein_distance(
-                            cell.cleared_value,
-                            candidate_entity.uri,
-                            cell.candidate_entities
-                        )
+                    for candidate_entity, string_similarity in zip(cell.candidate_entities, self.get_levenshtein_distances(
+                            cell.cleared_value, cell.candidate_entities)):
+                        candidate_entity._string_similarity = string_similarity
         print("Ranking of candidate entities by string similarity is complete.")
 
     def rank_candidate_entities_by_ner_based_similarity(self):
+        # Get sets of classes from DBpedia for all candidate entities by batched queries
+        response = get_classes_for_entities([candidate_entity.uri for column in self.table_model.columns for cell in column.cells
+                                             if cell.candidate_entities is not None for candidate_entity in cell.candidate_entities])
+        ontology_hierarchy = get_ontology_hierarchy()
         for column in self.table_model.columns:
             for cell in column.cells:
                 if cell.candidate_entities is not None:
+                    # Define a set of target classes for all NER labels of a cell
+                    target_classes = []
+                    for value in cell.label if isinstance(cell.label, list) else [cell.label]:
+                        ontology_classes = CLASS_MAPPING.get(value)
+                        if ontology_classes is not None:
+                            target_classes.extend(ontology_classes if isinstance(ontology_classes, list) else [ontology_classes])
                     for candidate_entity in cell.candidate_entities:
                         # Define distance to a target class for a candidate entity
-                        distance_to_class = get_distance_to_class(candidate_entity.uri, CLASS_MAPPING.get(cell.label))
+                        distance_to_class = ontology_hierarchy.get_distance_to_class(response.get(candidate_entity.uri, {}),
+                                                                                     target_classes)
                         # Define a score based on distance to a target class
-                        candidate_entity._ner_based_similarity = 1 if int(distance_to_class) > 0 else 0
+                        candidate_entity._ner_based_similarity = 1 if distance_to_class > 0 else 0
         print("Ranking of candidate entities by NER based similarity is complete.")
 
     def rank_candidate_entities_by_heading_based_similarity(self):
@@ -113,99 +156,108 @@ class SemanticTableAnnotator(AbstractSemanticTableAnnotator):
                         candidate_entity._heading_based_similarity = 0
         print("Ranking of candidate entities by heading based similarity is complete.")
 
-    def rank_candidate_entities_by_entity_embeddings_based_similarity(self):
-        list_new = []
-        list_new1 = []
-        list_total = []
-        for column in self.table_model.columns:
-            for cell in column.cells:
-                if cell.candidate_entities is not None:
-                    for candidate_entity in cell.candidate_entities:
-                        if candidate_entity:
-                            list_new.append(candidate_entity.uri)
-                            list_new1.append(candidate_entity.uri)
-                    list_total.append(list_new1)
-                    list_new1 = []
-        dictionary_sym = {}
-
-        def sym(entity1, entity2):
-            try:
-                count = modeller.wv.similarity(entity1, entity2)
-            except:
-                count = 0
-            dictionary_sym.setdefault(entity1, []).append(float(count))
-            dictionary_sym.setdefault(entity2, []).append(float(count))
+    @staticmethod
+    def _get_cross_cell_similarities(vectors: np.ndarray, offsets: np.ndarray, block_size: int = 1024) -> np.ndarray:
+        """
+        Calculate scores of candidates by cosine similarity with candidates of other cells using blocked matrix multiplication
+        :param vectors: a matrix of normalized candidate vectors, where candidates of each cell form a contiguous segment
+        :param offsets: start offsets of cell segments in a matrix
+        :param block_size: number of matrix rows processed at once
+        :return: a sum (or a maximum for cells with one candidate) of maximum similarities with candidates of other cells
+        """
+        segments = np.repeat(np.arange(len(offsets)), np.diff(np.append(offsets, len(vectors))))
+        single = np.diff(np.append(offsets, len(vectors)))[segments] == 1
+        scores = np.zeros(len(vectors))
+        if len(offsets) < 2:
+            return scores
+        for begin in range(0, len(vectors), block_size):
+            rows = np.arange(begin, min(begin + block_size, len(vectors)))
+            # Maximum similarity between each candidate of a block and candidates of each cell
+            maximums = np.maximum.reduceat(vectors[rows] @ vectors.T, offsets, axis=1)
+            own = np.zeros(maximums.shape, dtype=bool)
+            own[np.arange(len(rows)), segments[rows]] = True
+            scores[rows] = np.where(single[rows], np.where(own, -np.inf, maximums).max(axis=1),
+                                    np.where(own, 0, maximums).sum(axis=1))
+        return scores
 
-        print("Model is loading")
-        modeller = Word2Vec.load("model")
-        print("Model loading completed")
-        count_list_candidates = 0
-        print("Similarity begin")
-        dictionary_list_sym = {}
-        end = len(list_total)
-        end_end = len(list_new) - len(list_total[end - 1])
-        begin = len(list_total[0])
-        for i in range(0, end_end):
-            if list_new[i] not in list_total[count_list_candidates]:
-                if count_list_candidates != 0:
-                    begin += len(list_total[count_list_candidates])
-                count_list_candidates += 1
-            for j in range(begin, len(list_new)):
-                if list_new[j] not in list_total[count_list_candidates]:
-                    sym(list_new[i], list_new[j])
-        count_list_candidates = 0
-        temp_list = []
+    @staticmethod
+    def _get_nearest_cross_cell_similarities(vectors: np.ndarray, offsets: np.ndarray, neighbours: int,
+                                             block_size: int = 1024) -> np.ndarray:
+        """
+        Calculate scores of candidates by cosine similarity with their nearest candidates of other cells found by a vector index
+        :param vectors: a matrix of normalized candidate vectors, where candidates of each cell form a contiguous segment
+        :param offsets: start offsets of cell segments in a matrix
+        :param neighbours: number of nearest candidates of other cells for each candidate
+        :param block_size: number of candidates processed at once
+        :return: a sum (or a maximum for cells with one candidate) of maximum similarities with the nearest candidates of other cells
+        """
+        sizes = np.diff(np.append(offsets, len(vectors)))
+        segments = np.repeat(np.arange(len(offsets)), sizes)
+        scores = np.zeros(len(vectors))
+        if len(offsets) < 2:
+            return scores
+        index = create_vector_index(vectors)
+        # Candidates of the same cell are also found by an index, so they are requested in addition to neighbours
+        k = neighbours + int(sizes.max())
+        for begin in range(0, len(vectors), block_size):
+            rows = np.arange(begin, min(begin + block_size, len(vectors)))
+            indexes, similarities = index.search(vectors[rows], k)
+            neighbour_segments = np.where(indexes >= 0, segments[indexes], -1)
+            # Keep the most similar candidate of each other cell among the nearest candidates
+            order = np.lexsort((-similarities, neighbour_segments), axis=-1)
+            neighbour_segments = np.take_along_axis(neighbour_segments, order, axis=1)
+            similarities = np.take_along_axis(similarities, order, axis=1)
+            first = np.ones(neighbour_segments.shape, dtype=bool)
+            first[:, 1:] = neighbour_segments[:, 1:] != neighbour_segments[:, :-1]
+            valid = first & (neighbour_segments >= 0) & (neighbour_segments != segments[rows][:, None])
+            maximums = np.where(valid, similarities, -np.inf).max(axis=1)
+            scores[rows] = np.where(sizes[segments[rows]] == 1, np.where(np.isfinite(maximums), maximums, 0),
+                                    np.where(valid, similarities, 0).sum(axis=1))
+        return scores
 
-        for key_values in dictionary_sym.keys():
-            if key_values not in list_total[count_list_candidates]:
-                count_list_candidates += 1
-            if count_list_candidates >= len(list_total):
-                count_list_candidates -= 1
-            len_list = 0
-            for j in range(len(list_total)):
-                if j != count_list_candidates:
-                    begin = len_list
-                    len_list += len(list_total[j])
-                    if len_list > len(dictionary_sym[key_values]):
-                        len_list -= len(list_total[j])
-                    for i in range(begin, len_list):
-                        temp_list.append(dictionary_sym[key_values][i])
-                    if begin != len_list:
-                        dictionary_list_sym.setdefault(key_values, []).append(temp_list)
-                        temp_list = []
-        for key_values in dictionary_list_sym.keys():
-            temp_list = []
-            for item in dictionary_list_sym[key_values]:
-                temp_list.append(float(max(item)))
-            dictionary_list_sym[key_values] = temp_list
-        ans_list = []
-        ans_temp = []
-        for i in range(len(list_total)):
-            for j in range(len(list_total[i])):
-                ans_temp.append(dictionary_list_sym[list_total[i][j]])
-            ans_list.append(ans_temp)
-            ans_temp = []
-        dict_ans = {}
-        for i in range(len(list_total)):
-            if len(list_total[i]) == 1:
-                dict_ans.setdefault(list_total[i][0], []).append(max(ans_list[i][0]))
-            else:
-                for j in range(len(list_total[i])):
-                    ans_list[i][j] = sum(ans_list[i][j])
-                    dict_ans.setdefault(list_total[i][j], []).append(ans_list[i][j])
-        for column in self.table_model.columns:
-            for cell in column.cells:
-                if cell.candidate_entities is not None:
-                    for candidate_entity in cell.candidate_entities:
-                        candidate_entity._entity_embeddings_based_similarity = dict_ans[candidate_entity.uri][0]
+    def rank_candidate_entities_by_entity_embeddings_based_similarity(self, neighbours: Optional[int] = None):
+        # Group candidate entities by cells with candidates
+        cells = [cell for column in self.table_model.columns for cell in column.cells if cell.candidate_entities]
+        if not cells:
+            return
+        keyed_vectors = get_keyed_vectors(EmbeddingsConfig.ENTITY_MODEL_PATH)
+        # Gather normalized vectors of all candidate entities into one matrix (a zero vector for entities without embeddings)
+        candidate_entities = [candidate_entity for cell in cells for candidate_entity in cell.candidate_entities]
+        offsets = np.cumsum([0] + [len(cell.candidate_entities) for cell in cells[:-1]])
+        vectors = np.zeros((len(candidate_entities), keyed_vectors.vector_size), dtype=np.float32)
+        for i, candidate_entity in enumerate(candidate_entities):
+            if candidate_entity.uri in keyed_vectors.key_to_index:
+                vectors[i] = keyed_vectors.get_vector(candidate_entity.uri, norm=True)
+        if neighbours is None or len(candidate_entities) <= neighbours:
+            scores = self._get_cross_cell_similarities(vectors, offsets)
+        else:
+            scores = self._get_nearest_cross_cell_similarities(vectors, offsets, neighbours)
+        for candidate_entity, score in zip(candidate_entities, scores):
+            candidate_entity._entity_embeddings_based_similarity = float(score)
         print("Ranking of candidate entities by entity embeddings based similarity is complete.")
 
     def rank_candidate_entities_by_context_based_similarity(self):
-        for column in self.table_model.columns:
-            for cell in column.cells:
-                if cell.candidate_entities is not None:
-                    for candidate_entity in cell.candidate_entities:
-                        candidate_entity._context_based_similarity = 0
+        context_index = TableContextIndex(self.table_model)  # Token index of row and column contexts of all cells
+        rows, columns, candidate_entities = [], [], []
+        for column_index, column in enumerate(self.table_model.columns):
+            # Contexts of all candidate entities of a column are requested at once and fetched by batches on first use
+            CONTEXT_PROVIDER.request(candidate_entity.uri for cell in column.cells if cell.candidate_entities is not None
+                                     for candidate_entity in cell.candidate_entities if candidate_entity.context is None)
+            for row_index, cell in enumerate(column.cells):
+                for candidate_entity in cell.candidate_entities or ():
+                    rows.append(row_index)
+                    columns.append(column_index)
+                    candidate_entities.append(candidate_entity)
+        # Tokens of neighbourhood labels are extracted once for each entity
+        neighbourhoods = {}
+        for candidate_entity in candidate_entities:
+            if candidate_entity.uri not in neighbourhoods:
+                candidate_entity.get_context()
+                neighbourhoods[candidate_entity.uri] = context_index.get_token_ids(
+                    entity.label for entity in candidate_entity.context or () if entity.label)
+        scores = context_index.score(rows, columns, [neighbourhoods[candidate_entity.uri] for candidate_entity in candidate_entities])
+        for candidate_entity, score in zip(candidate_entities, scores):
+            candidate_entity._context_based_similarity = float(score)
         print("Ranking of candidate entities by context based similarity is complete.")
 
     def aggregate_ranked_candidate_entities(self):
@@ -223,15 +275,16 @@ class SemanticTableAnnotator(AbstractSemanticTableAnnotator):
         print("Annotation of table cell values is completed.")
 
     def rank_candidate_classes_by_majority_voting(self):
+        # Get sets of classes from DBpedia for all referent entities of categorical columns by batched queries
+        response = get_classes_for_entities([cell.annotation.uri for column in self.table_model.columns
+                                             if column.column_type != ColumnType.LITERAL_COLUMN
+                                             for cell in column.cells if cell.annotation is not None], False)
         for column in self.table_model.columns:
             if column.column_type != ColumnType.LITERAL_COLUMN:
                 frequency = Counter()
-                dbpedia_classes, response = {}, {}
+                dbpedia_classes = {}
                 for cell in column.cells:
                     if cell.annotation is not None:
-                        # Get a set of classes from DBpedia for a referent entity
-                        if cell.annotation.uri not in response:
-                            response[cell.annotation.uri] = get_classes_for_entity(cell.annotation.uri, False)
                         dbpedia_classes.update(response[cell.annotation.uri])
                         frequency.update(Counter([*response[cell.annotation.uri]]))  # Calculate a class occurrence frequency
                 result = dict(sorted(dict(frequency).items(), key=lambda item: item[1], reverse=True))  # Sort by frequency
@@ -264,10 +317,9 @@ class SemanticTableAnnotator(AbstractSemanticTableAnnotator):
                         if not exist_class:
                             column._candidate_classes += (ClassModel(class_uri, class_label, class_comment),)  # Add new candidate class
                 if column.candidate_classes is not None:
-                    for candidate_class in column.candidate_classes:
-                        candidate_class.set_heading_similarity(
-                            self.get_levenshtein_distance(column.header_name, candidate_class.uri, column.candidate_classes)
-                        )
+                    for candidate_class, heading_similarity in zip(column.candidate_classes, self.get_levenshtein_distances(
+                            column.header_name, column.candidate_classes)):
+                        candidate_class.set_heading_similarity(heading_similarity)
                     # Sort candidate classes by heading similarity
                     column.candidate_classes.sort(key=lambda cl: cl.heading_similarity, reverse=True)
         print("Ranking of candidate classes by heading similarity is complete.")
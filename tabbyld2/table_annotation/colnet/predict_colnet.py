@@ -7,8 +7,8 @@ import argparse
 import numpy as np
 import tensorflow as tf
 import tensorflow.compat.v1 as v1
-from gensim.models import Word2Vec
 
+from tabbyld2.helpers.embeddings import get_keyed_vectors
 from tabbyld2.table_annotation.colnet.lookup_ents import read_csv_table
 from util_strings import Word2Wec_path
 from util_t2d import read_t2d_cells
@@ -57,7 +57,7 @@ parser.add_argument(
 FLAGS, unparsed = parser.parse_known_args()
 print(FLAGS)
 print('load word2vec model ...')
-w2v_model = Word2Vec.load(os.path.join(FLAGS.model_dir, 'word2vec_gensim'))
+w2v_model = get_keyed_vectors(os.path.join(FLAGS.model_dir, 'word2vec_gensim'))
 
 
 def predict(test_x, classifier_name):
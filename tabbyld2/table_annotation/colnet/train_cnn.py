@@ -13,7 +13,7 @@ import tensorflow as tf
 import tensorflow.compat.v1 as v1
 import time
 from tensorflow.python.ops import control_flow_ops
-from gensim.models import Word2Vec
+from tabbyld2.helpers.embeddings import get_keyed_vectors
 from util_cnn import SyntheticColumnCNN
 from util_cnn import generate_synthetic_columns
 from util_cnn import synthetic_columns2sequence
@@ -335,7 +335,7 @@ def train_cnns():
     cls_pos_gen_entities = read_cls_entities('general_pos_samples.csv')
 
     print('   Step #3: load word2vec model')
-    w2v_model = Word2Vec.load(os.path.join(FLAGS.model_dir, 'word2vec_gensim'))
+    w2v_model = get_keyed_vectors(os.path.join(FLAGS.model_dir, 'word2vec_gensim'))
 
     print('   Step #4: train class by class')
     for cls in classes:
@@ -72,11 +72,13 @@ def synthetic_columns2sequence(ent_units, sequence_size):
 
 
 def sequence2matrix(word_seq, sequence_size, w2v_model):
-    ent_v = np.zeros((sequence_size, w2v_model.vector_size, 1))
+    # Both a full Word2Vec model and its KeyedVectors are accepted
+    w2v_vectors = w2v_model.wv if hasattr(w2v_model, 'wv') else w2v_model
+    ent_v = np.zeros((sequence_size, w2v_vectors.vector_size, 1))
     for i, word in enumerate(word_seq):
-        if not word == 'NaN' and word in w2v_model.wv.key_to_index:
-            w_vec = w2v_model.wv[word]
-            ent_v[i] = w_vec.reshape((w2v_model.vector_size, 1))
+        if not word == 'NaN' and word in w2v_vectors.key_to_index:
+            w_vec = w2v_vectors[word]
+            ent_v[i] = w_vec.reshape((w2v_vectors.vector_size, 1))
     return ent_v
 
 
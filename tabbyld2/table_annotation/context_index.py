@@ -0,0 +1,109 @@
+import re
+from typing import Any, Iterable, List, Sequence
+
+import numpy as np
+from tabbyld2.datamodel.tabular_data_model import TableModel
+from tabbyld2.preprocessing.prepositions import Preposition
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+ARTICLES = frozenset(("a", "an", "the"))
+
+
+def tokenize(text: Any) -> List[str]:
+    """
+    Split a text into distinct lowercase word tokens without articles and prepositions
+    :param text: a source text
+    :return: a list of tokens
+    """
+    return list(dict.fromkeys(token for token in TOKEN_PATTERN.findall(str(text).lower())
+                              if token not in ARTICLES and not Preposition.has_value(token)))
+
+
+class TableContextIndex:
+    """
+    Token index of row and column contexts of table cells built once for a table, where a context of a cell is a multiset
+    of tokens of other cells in its row and its column. Token counts are stored as sorted arrays of (row, token),
+    (column, token) and (cell, token) keys, so a whole set of candidate entities is scored in one vectorized pass
+    """
+    __slots__ = ("_vocabulary", "_columns_number", "_row_keys", "_row_counts", "_column_keys", "_column_counts", "_cell_keys",
+                 "_context_sizes")
+
+    def __init__(self, table_model: TableModel):
+        self._vocabulary = {}
+        self._columns_number = table_model.columns_number
+        rows, columns, tokens, value_tokens = [], [], [], {}
+        for column_index, column in enumerate(table_model.columns):
+            for row_index, cell in enumerate(column.cells):
+                if cell.cleared_value is not None:
+                    # Repeated values are tokenized only once
+                    token_ids = value_tokens.get(cell.cleared_value)
+                    if token_ids is None:
+                        token_ids = value_tokens[cell.cleared_value] = [self._vocabulary.setdefault(token, len(self._vocabulary))
+                                                                        for token in tokenize(cell.cleared_value)]
+                    rows.extend([row_index] * len(token_ids))
+                    columns.extend([column_index] * len(token_ids))
+                    tokens.extend(token_ids)
+        rows, columns = np.array(rows, dtype=np.int64), np.array(columns, dtype=np.int64)
+        tokens, size = np.array(tokens, dtype=np.int64), self._size
+        self._row_keys, self._row_counts = np.unique(rows * size + tokens, return_counts=True)
+        self._column_keys, self._column_counts = np.unique(columns * size + tokens, return_counts=True)
+        self._cell_keys = np.unique((rows * self._columns_number + columns) * size + tokens)
+        # Context size of a cell: number of tokens in its row and its column except its own tokens
+        row_sizes = np.bincount(rows, minlength=table_model.rows_number)
+        column_sizes = np.bincount(columns, minlength=self._columns_number)
+        cell_sizes = np.bincount(rows * self._columns_number + columns, minlength=table_model.rows_number * self._columns_number)
+        self._context_sizes = (row_sizes[:, None] + column_sizes[None, :]).ravel() - 2 * cell_sizes
+
+    def __len__(self):
+        return len(self._vocabulary)
+
+    @property
+    def _size(self) -> int:
+        return max(1, len(self._vocabulary))
+
+    @staticmethod
+    def _lookup(keys: np.ndarray, counts: np.ndarray, queries: np.ndarray) -> np.ndarray:
+        """
+        Get counts for keys by binary search in a sorted array of keys
+        :param keys: a sorted array of keys
+        :param counts: counts of keys
+        :param queries: an array of requested keys
+        :return: an array of counts (0 for absent keys)
+        """
+        if len(keys) == 0:
+            return np.zeros(len(queries), dtype=np.int64)
+        positions = np.minimum(np.searchsorted(keys, queries), len(keys) - 1)
+        return np.where(keys[positions] == queries, counts[positions], 0)
+
+    def get_token_ids(self, texts: Iterable[Any]) -> np.ndarray:
+        """
+        Get identifiers of distinct tokens of texts that occur in a table (other tokens cannot match any context)
+        :param texts: a set of texts (e.g. labels of entities from a neighbourhood of a candidate entity)
+        :return: an array of token identifiers
+        """
+        token_ids = {self._vocabulary[token] for text in texts for token in tokenize(text) if token in self._vocabulary}
+        return np.fromiter(token_ids, dtype=np.int64, count=len(token_ids))
+
+    def score(self, rows: Sequence[int], columns: Sequence[int], token_ids: Sequence[np.ndarray]) -> np.ndarray:
+        """
+        Score sets of tokens by overlap with contexts of cells: a share of context tokens of a cell that are in a set
+        :param rows: row indexes of cells
+        :param columns: column indexes of cells
+        :param token_ids: arrays of token identifiers (one array for each cell position)
+        :return: an array of scores in the range [0, 1]
+        """
+        rows, columns = np.asarray(rows, dtype=np.int64), np.asarray(columns, dtype=np.int64)
+        lengths = np.array([len(ids) for ids in token_ids], dtype=np.int64)
+        if not lengths.sum():
+            return np.zeros(len(lengths))
+        owners = np.repeat(np.arange(len(lengths)), lengths)
+        tokens, size = np.concatenate(token_ids), self._size
+        cells = rows[owners] * self._columns_number + columns[owners]
+        # Own tokens of a cell are counted both in its row and its column, so they are subtracted twice
+        own = np.isin(cells * size + tokens, self._cell_keys).astype(np.int64)
+        matches = self._lookup(self._row_keys, self._row_counts, rows[owners] * size + tokens) + \
+            self._lookup(self._column_keys, self._column_counts, columns[owners] * size + tokens) - 2 * own
+        overlaps = np.bincount(owners, weights=matches, minlength=len(lengths))
+        sizes = self._context_sizes[rows * self._columns_number + columns]
+        return np.divide(overlaps, sizes, out=np.zeros(len(lengths)), where=sizes > 0)
@@ -0,0 +1,64 @@
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from tabbyld2.config import KnowledgeBaseConfig
+from tabbyld2.helpers.cache import LRUCache
+from tabbyld2.table_annotation.dbpedia_sparql_endpoint import get_contexts_for_entities
+
+
+class EntityContextProvider:
+    """
+    Provider of entity contexts (subjects and objects from RDF triples), where entities are requested in advance
+    (e.g. all candidate entities of a column) and their contexts are fetched by batches only when a context of any of
+    them is needed for the first time
+    """
+    __slots__ = ("_cache", "_pending", "_lock", "_batch_size")
+
+    def __init__(self, max_entries: int = None, batch_size: int = None):
+        self._cache = LRUCache(max_entries)
+        self._pending: Dict[str, None] = {}
+        self._lock = threading.Lock()
+        self._batch_size = batch_size or KnowledgeBaseConfig.CONTEXT_BATCH_SIZE
+
+    @property
+    def cache(self):
+        return self._cache
+
+    def request(self, entities: Iterable[str]):
+        """
+        Register entities which contexts will be needed (nothing is fetched at this moment)
+        :param entities: a set of entity URIs
+        """
+        with self._lock:
+            for entity in entities:
+                if entity and entity not in self._cache:
+                    self._pending[entity] = None
+
+    def _fetch_pending(self) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Fetch contexts for all requested entities by batches and memoize them, where entities which contexts could not
+        be fetched are not memoized (they are fetched again on next access)
+        :return: a dict of fetched contexts for each entity
+        """
+        with self._lock:
+            entities, self._pending = list(self._pending), {}
+        contexts = get_contexts_for_entities(entities, chunk_size=self._batch_size) if entities else {}
+        for entity, context in contexts.items():
+            self._cache.set(entity, context)
+        return contexts
+
+    def get_context(self, entity: str) -> Optional[Dict[str, List[str]]]:
+        """
+        Get a context of an entity, where all requested entities are fetched together if a context is not memoized
+        :param entity: an entity URI
+        :return: a dict of context entities with their labels and comments or None if it could not be fetched
+        """
+        context = self._cache.get(entity)
+        if context is None:
+            self.request([entity])
+            contexts = self._fetch_pending()
+            context = contexts[entity] if entity in contexts else self._cache.get(entity)
+        return context
+
+
+CONTEXT_PROVIDER = EntityContextProvider(KnowledgeBaseConfig.CONTEXT_CACHE_SIZE)
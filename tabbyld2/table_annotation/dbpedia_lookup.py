@@ -2,7 +2,8 @@ import json
 from typing import Dict, List
 
 import requests
-from dbpedia_sparql_endpoint import DBPediaConfig
+from tabbyld2.helpers.http_client import get_session
+from tabbyld2.table_annotation.dbpedia_sparql_endpoint import DBPediaConfig, RATE_LIMITER, get_knowledge_base
 
 
 URL = ""
@@ -28,6 +29,8 @@ def get_candidate_entities(query: str, max_results: int = None, min_relevance: i
     :param short_name: flag to enable or disable short entity name display mode (without full URI)
     :return: a set of found candidate entities
     """
+    if get_knowledge_base() is not None:
+        return get_knowledge_base().lookup_candidate_entities(query, max_results, short_name) if query != "" else {}
     results = {}
     if query != "":
         parameters = {"query": query, "format": "JSON"}
@@ -36,7 +39,8 @@ def get_candidate_entities(query: str, max_results: int = None, min_relevance: i
         if min_relevance:
             parameters["minRelevance"] = min_relevance
         try:
-            response = requests.get(url=URL, params=parameters)
+            RATE_LIMITER.acquire(URL)
+            response = get_session(URL).get(url=URL, params=parameters)
             if response.status_code == 200:
                 json_response = json.loads(response.text)
                 for doc in json_response["docs"]:
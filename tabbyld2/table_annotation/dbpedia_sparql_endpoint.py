@@ -1,37 +1,115 @@
 import re
 from enum import Enum
 from itertools import combinations
-from typing import Any, Dict, List, Tuple
-from urllib.error import URLError
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from SPARQLWrapper import JSON, SPARQLWrapper
+import requests
+from tabbyld2.config import CacheConfig, ConcurrencyConfig
+from tabbyld2.helpers.cache import ResponseCache
+from tabbyld2.helpers.http_client import get_session
+from tabbyld2.helpers.rate_limiter import RateLimiter
 from tabbyld2.preprocessing.cleaner import check_letter_and_digit_existence
+from tabbyld2.table_annotation.abstract import AbstractKnowledgeBase
+from tabbyld2.table_annotation.fuzzy_index import FuzzyLabelIndex
+
+
+GET, POST = "GET", "POST"
+# Characters that are not allowed in IRI references of SPARQL queries
+IRI_FORBIDDEN_CHARACTERS = re.compile(r'[\x00-\x20<>"{}|^`\\]')
 
 
 class DBPediaConfig(str, Enum):
     ENDPOINT_NAME = "http://dbpedia.org/sparql"
+    SECURE_ENDPOINT_NAME = "https://dbpedia.org/sparql"
     BASE_RESOURCE_URI = "http://dbpedia.org/resource/"
     BASE_ONTOLOGY_URI = "http://dbpedia.org/ontology/"
 
 
+# Persistent cache of SPARQL query responses shared by all queries to DBpedia
+SPARQL_CACHE = ResponseCache(CacheConfig.SPARQL_CACHE_PATH, CacheConfig.SPARQL_CACHE_TTL, CacheConfig.SPARQL_CACHE_MAX_ENTRIES)
+# Per-host rate limiter shared by all requests to DBpedia SPARQL Endpoint and DBpedia Lookup
+RATE_LIMITER = RateLimiter(ConcurrencyConfig.DEFAULT_REQUESTS_PER_SECOND, ConcurrencyConfig.REQUESTS_PER_SECOND)
+# Knowledge base backend that answers all queries instead of DBpedia SPARQL Endpoint and DBpedia Lookup (if it is set)
+_KNOWLEDGE_BASE = None
+_FUZZY_INDEX = None
+
+
+def set_knowledge_base(knowledge_base: Optional[AbstractKnowledgeBase]):
+    """
+    Set a knowledge base backend (e.g. a local store of a DBpedia subset) that answers queries instead of remote DBpedia services
+    :param knowledge_base: a knowledge base backend or None to query remote DBpedia services
+    """
+    global _KNOWLEDGE_BASE
+    _KNOWLEDGE_BASE = knowledge_base
+
+
+def get_knowledge_base() -> Optional[AbstractKnowledgeBase]:
+    """
+    Get a current knowledge base backend
+    :return: a knowledge base backend or None if remote DBpedia services are used
+    """
+    return _KNOWLEDGE_BASE
+
+
+def set_fuzzy_index(fuzzy_index: Optional[FuzzyLabelIndex]):
+    """
+    Set an index for approximate search of candidate entities by labels with typos
+    :param fuzzy_index: a trigram index of entity labels or None to disable approximate search
+    """
+    global _FUZZY_INDEX
+    _FUZZY_INDEX = fuzzy_index
+
+
+def execute_query(query: str, endpoint: str = DBPediaConfig.ENDPOINT_NAME.value, method: str = GET, timeout: int = 300) \
+        -> Dict[str, Any]:
+    """
+    Execute SPARQL query to DBpedia or get its response from the persistent cache if this query has already been executed
+    :param query: a text of SPARQL query
+    :param endpoint: an URL of SPARQL endpoint
+    :param method: HTTP method (GET or POST)
+    :param timeout: a query timeout (in seconds)
+    :return: a SPARQL query response in the JSON format
+    :raise requests.exceptions.RequestException: if a query failed after all retries
+    """
+    response = SPARQL_CACHE.get(query, endpoint) if CacheConfig.SPARQL_CACHE_ENABLED else None
+    if response is None:
+        parameters, headers = {"query": query, "format": "json"}, {"Accept": "application/sparql-results+json"}
+        RATE_LIMITER.acquire(endpoint)
+        if method == POST:
+            http_response = get_session(endpoint).post(endpoint, data=parameters, headers=headers, timeout=timeout)
+        else:
+            http_response = get_session(endpoint).get(endpoint, params=parameters, headers=headers, timeout=timeout)
+        http_response.raise_for_status()
+        response = http_response.json()
+        if CacheConfig.SPARQL_CACHE_ENABLED:
+            SPARQL_CACHE.set(query, response, endpoint)
+    return response
+
+
+def escape_iri(uri: str) -> str:
+    """
+    Percent-encode characters that are not allowed in IRI references of SPARQL queries (spaces, control characters and <>"{}|^`\\)
+    :param uri: a source URI
+    :return: a URI that can be written in angle brackets in a SPARQL query
+    """
+    return IRI_FORBIDDEN_CHARACTERS.sub(lambda match: "%{:02X}".format(ord(match.group())), uri)
+
+
 def get_redirects(entities: str) -> Tuple[str, ...]:
     """
     Get entities that are redirects to this entity
     :param entities: a text sequence of entities to SPARQL query
     :return: a list of URI for redirect entities
     """
-    sparql = SPARQLWrapper("https://dbpedia.org/sparql")
-    sparql.setMethod("POST")
-    sparql.setQuery("""
+    if _KNOWLEDGE_BASE is not None:
+        return _KNOWLEDGE_BASE.get_redirects(entities)
+    response = execute_query("""
         SELECT DISTINCT (str(?redirect) as ?redirect)
         WHERE {
             ?redirect dbo:wikiPageRedirects ?subject .
             FILTER (?subject IN (%s))
         }
-    """ % entities)
-    sparql.setTimeout(300)
-    sparql.setReturnFormat(JSON)
-    response = sparql.query().convert()
+    """ % entities, DBPediaConfig.SECURE_ENDPOINT_NAME.value, POST)
     return tuple(result["redirect"]["value"] for result in response["results"]["bindings"] if "redirect" in result)
 
 
@@ -68,57 +146,48 @@ def get_candidate_entities(entity_mention: str = "", deep_search: bool = True, s
     :param deep_search: flag to enable or disable deep search mode by various combinations of words
     :param short_name: flag to enable or disable short entity name display mode (without full URI)
     :return: a dict of candidate entities
+    :raise requests.exceptions.RequestException: if a query failed after all retries
     """
+    if _KNOWLEDGE_BASE is not None:
+        return _KNOWLEDGE_BASE.get_candidate_entities(entity_mention, deep_search, short_name)
     results, processing_query, number = {}, False, len(re.split(r"[\\/,.'* ]+", entity_mention))
     while not processing_query:
         variable_query = get_variable_for_query(generate_ngrams(entity_mention, number))
         if variable_query and variable_query != "()":
             print("Searching entities for " + variable_query)
-            connection_error = True
-            while connection_error:
-                try:
-                    # Execute SPARQL query to DBpedia
-                    sparql = SPARQLWrapper("https://dbpedia.org/sparql")
-                    sparql.setMethod("POST")
-                    sparql.setQuery("""
-                        SELECT DISTINCT (str(?subject) as ?subject) (str(?label) as ?label) (str(?comment) as ?comment) (str(?rd) as ?rd)
-                        WHERE {
-                            {
-                                ?subject rdfs:comment ?comment .
-                                ?subject a ?type .
-                                ?subject rdfs:label ?label .
-                                ?label bif:contains "%s" .
-                                OPTIONAL
-                                {
-                                    ?rd dbo:wikiPageRedirects ?subject .
-                                }
-                            }
-                            FILTER NOT EXISTS { ?subject dbo:wikiPageRedirects ?r2 } .
-                            FILTER (!strstarts(str(?subject), "http://dbpedia.org/resource/Category:")) .
-                            FILTER (!strstarts(str(?subject), "http://dbpedia.org/property/")) .
-                            FILTER (!strstarts(str(?subject), "http://dbpedia.org/ontology/")) .
-                            FILTER (strstarts(str(?type), "http://dbpedia.org/ontology/")) .
-                            FILTER (lang(?label) = "en") .
-                            FILTER (lang(?comment) = "en")
+            # Execute SPARQL query to DBpedia
+            response = execute_query("""
+                SELECT DISTINCT (str(?subject) as ?subject) (str(?label) as ?label) (str(?comment) as ?comment) (str(?rd) as ?rd)
+                WHERE {
+                    {
+                        ?subject rdfs:comment ?comment .
+                        ?subject a ?type .
+                        ?subject rdfs:label ?label .
+                        ?label bif:contains "%s" .
+                        OPTIONAL
+                        {
+                            ?rd dbo:wikiPageRedirects ?subject .
                         }
-                        ORDER BY ASC(strlen(?label))
-                        LIMIT 100
-                    """ % variable_query)
-                    sparql.setReturnFormat(JSON)
-                    sparql.setTimeout(300)
-                    response = sparql.query().convert()
-                    redirects = []
-                    for rs in response["results"]["bindings"]:
-                        uri = rs["subject"]["value"].replace(DBPediaConfig.BASE_RESOURCE_URI, "") if short_name else rs["subject"]["value"]
-                        if uri in results:
-                            redirects.append(rs["rd"]["value"])
-                        else:
-                            redirects = [rs["rd"]["value"]] if "rd" in rs else []
-                        results[uri] = [rs["label"]["value"], rs["comment"]["value"], redirects]
-                    connection_error = False
-                except URLError:
-                    connection_error = True
-                    print("Connection error to DBpedia SPARQL Endpoint! Reconnection is carried out.")
+                    }
+                    FILTER NOT EXISTS { ?subject dbo:wikiPageRedirects ?r2 } .
+                    FILTER (!strstarts(str(?subject), "http://dbpedia.org/resource/Category:")) .
+                    FILTER (!strstarts(str(?subject), "http://dbpedia.org/property/")) .
+                    FILTER (!strstarts(str(?subject), "http://dbpedia.org/ontology/")) .
+                    FILTER (strstarts(str(?type), "http://dbpedia.org/ontology/")) .
+                    FILTER (lang(?label) = "en") .
+                    FILTER (lang(?comment) = "en")
+                }
+                ORDER BY ASC(strlen(?label))
+                LIMIT 100
+            """ % variable_query, DBPediaConfig.SECURE_ENDPOINT_NAME.value, POST)
+            redirects = []
+            for rs in response["results"]["bindings"]:
+                uri = rs["subject"]["value"].replace(DBPediaConfig.BASE_RESOURCE_URI, "") if short_name else rs["subject"]["value"]
+                if uri in results:
+                    redirects.append(rs["rd"]["value"])
+                else:
+                    redirects = [rs["rd"]["value"]] if "rd" in rs else []
+                results[uri] = [rs["label"]["value"], rs["comment"]["value"], redirects]
         if results or number == 1 or not deep_search:
             processing_query = True
         else:
@@ -127,6 +196,22 @@ def get_candidate_entities(entity_mention: str = "", deep_search: bool = True, s
     return results
 
 
+def get_fuzzy_candidate_entities(entity_mention: str = "", max_results: int = 10, short_name: bool = False) -> Dict[str, List]:
+    """
+    Get a set of candidate entities with labels close to an entity mention by edit distance based on the local trigram index
+    :param entity_mention: a textual entity mention
+    :param max_results: maximum number of candidate entities
+    :param short_name: flag to enable or disable short entity name display mode (without full URI)
+    :return: a dict of candidate entities (empty if approximate search is disabled)
+    """
+    if _FUZZY_INDEX is None:
+        return {}
+    results = {}
+    for uri, label, _ in _FUZZY_INDEX.search(entity_mention, max_results):
+        results[uri.replace(DBPediaConfig.BASE_RESOURCE_URI, "") if short_name else uri] = [label, "", []]
+    return results
+
+
 def get_distance_to_class(entity: str = "", target_classes: str = None) -> int:
     """
     Get a distance to a target class of an entity based on the direct SPARQL query to DBpedia
@@ -134,28 +219,27 @@ def get_distance_to_class(entity: str = "", target_classes: str = None) -> int:
     :param target_classes: a set of target classes
     :return: a distance to a target class (non-negative integer including zero)
     """
+    if _KNOWLEDGE_BASE is not None:
+        return _KNOWLEDGE_BASE.get_distance_to_class(entity, target_classes)
     # Execute SPARQL query to DBpedia
-    sparql = SPARQLWrapper(DBPediaConfig.ENDPOINT_NAME)
     if target_classes is None:
-        sparql.setQuery("""
+        query = """
             SELECT COUNT DISTINCT ?type
             WHERE {
                 <%s> rdf:type/rdfs:subClassOf* ?type .
                 ?type rdfs:subClassOf* ""
             }
-        """ % entity)
+        """ % entity
     else:
-        sparql.setQuery("""
+        query = """
             SELECT COUNT DISTINCT ?type
             WHERE {
                 <%s> rdf:type/rdfs:subClassOf* ?type .
                 ?type rdfs:subClassOf* ?c .
                 FILTER (?c IN (%s))
             }
-        """ % (entity, target_classes if isinstance(target_classes, str) else ", ".join(target_classes)))
-    sparql.setReturnFormat(JSON)
-    sparql.setTimeout(300)
-    results = sparql.query().convert()
+        """ % (entity, target_classes if isinstance(target_classes, str) else ", ".join(target_classes))
+    results = execute_query(query)
     # Calculate a distance to a target class
     distance_to_class = 0
     for result in results["results"]["bindings"]:
@@ -163,6 +247,27 @@ def get_distance_to_class(entity: str = "", target_classes: str = None) -> int:
     return distance_to_class
 
 
+def get_class_hierarchy() -> List[Tuple[str, str]]:
+    """
+    Get all direct subclass relations between classes of the DBpedia ontology based on the direct SPARQL query to DBpedia
+    (a connection error is raised, so an incomplete hierarchy is never returned)
+    :return: a list of pairs (class, parent class)
+    """
+    if _KNOWLEDGE_BASE is not None:
+        return _KNOWLEDGE_BASE.get_class_hierarchy()
+    print("Searching subclass relations of the DBpedia ontology")
+    # Execute SPARQL query to DBpedia
+    response = execute_query("""
+        SELECT DISTINCT (str(?class) as ?class) (str(?parent) as ?parent)
+        WHERE {
+            ?class rdf:type owl:Class .
+            ?class rdfs:subClassOf ?parent .
+            FILTER (strstarts(str(?class), "http://dbpedia.org/ontology/")) .
+        }
+    """, timeout=600)
+    return [(rs["class"]["value"], rs["parent"]["value"]) for rs in response["results"]["bindings"]]
+
+
 def get_parent_classes(dbpedia_class: str = "", short_name: bool = False) -> Tuple[str, ...]:
     """
     Get a set of parent classes for a target class based on the direct SPARQL query to DBpedia
@@ -170,17 +275,15 @@ def get_parent_classes(dbpedia_class: str = "", short_name: bool = False) -> Tup
     :param short_name: flag to enable or disable short class name display mode (without full URI)
     :return: a list of found parent classes
     """
-    sparql = SPARQLWrapper(DBPediaConfig.ENDPOINT_NAME)
-    sparql.setQuery("""
+    if _KNOWLEDGE_BASE is not None:
+        return _KNOWLEDGE_BASE.get_parent_classes(dbpedia_class, short_name)
+    response = execute_query("""
         SELECT DISTINCT ?type
         WHERE {
             <%s> rdfs:subClassOf* ?type .
             FILTER (strstarts(str(?type), "http://dbpedia.org/ontology/")) .
         }
     """ % dbpedia_class)
-    sparql.setTimeout(300)
-    sparql.setReturnFormat(JSON)
-    response = sparql.query().convert()
     class_uris = []
     for rs in response["results"]["bindings"]:
         class_uris.append(rs["type"]["value"].replace(DBPediaConfig.BASE_ONTOLOGY_URI, "") if short_name else rs["type"]["value"])
@@ -193,17 +296,56 @@ def get_classes_for_entity(entity: str = "", short_name: bool = False) -> Dict[s
     :param entity: an entity from DBpedia
     :param short_name: flag to enable or disable short class name display mode (without full URI)
     :return: a set of found classes
+    :raise requests.exceptions.RequestException: if a query failed after all retries
     """
+    if _KNOWLEDGE_BASE is not None:
+        return _KNOWLEDGE_BASE.get_classes_for_entities([entity], short_name)[entity]
     print("Searching classes for entity: " + entity)
-    results, connection_error = {}, True
-    while connection_error:
+    results = {}
+    # Execute SPARQL query to DBpedia
+    response = execute_query("""
+        SELECT DISTINCT (str(?type) as ?type) (str(?label) as ?label) (str(?comment) as ?comment)
+        WHERE {
+            <%s> a ?type .
+            ?type rdfs:label ?label .
+            OPTIONAL {
+                ?type rdfs:comment ?comment .
+                FILTER (lang(?comment) = "en") .
+            } .
+            FILTER (strstarts(str(?type), "http://dbpedia.org/ontology/")) .
+            FILTER (lang(?label) = "en")
+        }
+    """ % escape_iri(entity), timeout=600)
+    for rs in response["results"]["bindings"]:
+        class_uri = rs["type"]["value"].replace(DBPediaConfig.BASE_ONTOLOGY_URI, "") if short_name else rs["type"]["value"]
+        results[class_uri] = [rs["label"]["value"] if "label" in rs else None, rs["comment"]["value"] if "comment" in rs else None]
+    return results
+
+
+def get_classes_for_entities(entities: Iterable[str], short_name: bool = False, chunk_size: int = 200) -> Dict[str, Dict[str, List]]:
+    """
+    Get sets of classes for many entities at once based on the batched SPARQL queries (with VALUES clause) to DBpedia
+    :param entities: a set of entities from DBpedia
+    :param short_name: flag to enable or disable short class name display mode (without full URI)
+    :param chunk_size: maximum number of entities in one SPARQL query
+    :return: a dict of found classes for each entity
+    :raise requests.exceptions.RequestException: if a query for a single entity of a failed chunk failed after all retries
+    """
+    if _KNOWLEDGE_BASE is not None:
+        return _KNOWLEDGE_BASE.get_classes_for_entities(entities, short_name)
+    entities = list(dict.fromkeys(entity for entity in entities if entity))
+    results = {entity: {} for entity in entities}
+    for i in range(0, len(entities), chunk_size):
+        chunk = entities[i:i + chunk_size]
+        escaped_entities = {escape_iri(entity): entity for entity in chunk}
+        print("Searching classes for " + str(len(chunk)) + " entities")
         try:
             # Execute SPARQL query to DBpedia
-            sparql = SPARQLWrapper(DBPediaConfig.ENDPOINT_NAME)
-            sparql.setQuery("""
-                SELECT DISTINCT (str(?type) as ?type) (str(?label) as ?label) (str(?comment) as ?comment)
+            response = execute_query("""
+                SELECT DISTINCT (str(?entity) as ?entity) (str(?type) as ?type) (str(?label) as ?label) (str(?comment) as ?comment)
                 WHERE {
-                    <%s> a ?type .
+                    VALUES ?entity { %s }
+                    ?entity a ?type .
                     ?type rdfs:label ?label .
                     OPTIONAL {
                         ?type rdfs:comment ?comment .
@@ -212,17 +354,19 @@ def get_classes_for_entity(entity: str = "", short_name: bool = False) -> Dict[s
                     FILTER (strstarts(str(?type), "http://dbpedia.org/ontology/")) .
                     FILTER (lang(?label) = "en")
                 }
-            """ % entity)
-            sparql.setReturnFormat(JSON)
-            sparql.setTimeout(600)
-            response = sparql.query().convert()
+            """ % " ".join("<" + entity + ">" for entity in escaped_entities), DBPediaConfig.SECURE_ENDPOINT_NAME.value, POST, 600)
+            # Fan out result rows to their entities
             for rs in response["results"]["bindings"]:
+                entity = escaped_entities.get(rs["entity"]["value"], rs["entity"]["value"])
                 class_uri = rs["type"]["value"].replace(DBPediaConfig.BASE_ONTOLOGY_URI, "") if short_name else rs["type"]["value"]
-                results[class_uri] = [rs["label"]["value"] if "label" in rs else None, rs["comment"]["value"] if "comment" in rs else None]
-            connection_error = False
-        except URLError:
-            connection_error = True
-            print("Connection error to DBpedia SPARQL Endpoint! Reconnection is carried out.")
+                results.setdefault(entity, {})[class_uri] = [rs["label"]["value"] if "label" in rs else None,
+                                                             rs["comment"]["value"] if "comment" in rs else None]
+        except requests.exceptions.RequestException:
+            print("Connection error to DBpedia SPARQL Endpoint!")
+            # A failed query must not lose classes of all entities in a chunk, so they are requested one by one (errors of
+            # these queries are raised, so a failure is never taken for an entity without classes)
+            for entity in chunk:
+                results[entity] = get_classes_for_entity(entity, short_name)
     return results
 
 
@@ -233,130 +377,181 @@ def get_candidate_classes(class_mention: str = "", deep_search: bool = True, sho
     :param deep_search: flag to enable or disable deep search mode by various combinations of words
     :param short_name: flag to enable or disable short class name display mode (without full URI)
     :return: a dict of candidate classes
+    :raise requests.exceptions.RequestException: if a query failed after all retries
     """
+    if _KNOWLEDGE_BASE is not None:
+        return _KNOWLEDGE_BASE.get_candidate_classes(class_mention, deep_search, short_name)
     results, processing_query, number = {}, False, len(re.split(r"[\\/,.'* ]+", class_mention))
     while not processing_query:
         variable_query = get_variable_for_query(generate_ngrams(class_mention, number))
         if variable_query and variable_query != "()":
             print("Searching classes for " + variable_query)
-            connection_error = True
-            while connection_error:
-                try:
-                    # Execute SPARQL query to DBpedia
-                    sparql = SPARQLWrapper("https://dbpedia.org/sparql")
-                    sparql.setMethod("POST")
-                    sparql.setQuery("""
-                        SELECT DISTINCT (str(?subject) as ?subject) (str(?label) as ?label) (str(?comment) as ?comment)
-                        WHERE {
-                            {
-                                ?subject rdf:type owl:Class .
-                                ?subject rdfs:label ?label .
-                                ?label bif:contains "%s" .
-                                OPTIONAL {
-                                    ?subject rdfs:comment ?comment .
-                                    FILTER (lang(?comment) = "en") .
-                                } .
-                            }
-                            FILTER NOT EXISTS { ?subject dbo:wikiPageRedirects ?r2 } .
-                            FILTER (!strstarts(str(?subject), "http://dbpedia.org/resource/Category:")) .
-                            FILTER (!strstarts(str(?subject), "http://dbpedia.org/property/")) .
-                            FILTER (!strstarts(str(?subject), "http://dbpedia.org/resource/")) .
-                            FILTER (lang(?label) = "en")
-                        }
-                        ORDER BY ASC(strlen(?label))
-                        LIMIT 10
-                        """ % variable_query)
-                    sparql.setReturnFormat(JSON)
-                    sparql.setTimeout(600)
-                    response = sparql.query().convert()
-                    for rs in response["results"]["bindings"]:
-                        uri = rs["subject"]["value"].replace(DBPediaConfig.BASE_ONTOLOGY_URI, "") if short_name else rs["subject"]["value"]
-                        results[uri] = [rs["label"]["value"], rs["comment"]["value"] if "comment" in rs else None]
-                    connection_error = False
-                except URLError:
-                    connection_error = True
-                    print("Connection error to DBpedia SPARQL Endpoint! Reconnection is carried out.")
-        if results or number == 1 or not deep_search:
-            processing_query = True
-        else:
-            processing_query = False
-            number -= 1
-    return results
-
-
-def get_subjects_for_entity(entity: str, short_name: bool = False) -> Dict[str, List[str]]:
-    results, no_processing_query = {}, True
-    while no_processing_query:
-        try:
             # Execute SPARQL query to DBpedia
-            sparql = SPARQLWrapper(DBPediaConfig.ENDPOINT_NAME)
-            sparql.setQuery("""
+            response = execute_query("""
                 SELECT DISTINCT (str(?subject) as ?subject) (str(?label) as ?label) (str(?comment) as ?comment)
                 WHERE {
                     {
-                        ?subject ?property <%s> .
-                        ?subject rdfs:comment ?comment .
-                        ?subject a ?type .
+                        ?subject rdf:type owl:Class .
                         ?subject rdfs:label ?label .
+                        ?label bif:contains "%s" .
+                        OPTIONAL {
+                            ?subject rdfs:comment ?comment .
+                            FILTER (lang(?comment) = "en") .
+                        } .
                     }
                     FILTER NOT EXISTS { ?subject dbo:wikiPageRedirects ?r2 } .
                     FILTER (!strstarts(str(?subject), "http://dbpedia.org/resource/Category:")) .
                     FILTER (!strstarts(str(?subject), "http://dbpedia.org/property/")) .
-                    FILTER (!strstarts(str(?subject), "http://dbpedia.org/ontology/")) .
-                    FILTER (!strstarts(str(?property), "http://dbpedia.org/ontology/")) .
-                    FILTER (strstarts(str(?type), "http://dbpedia.org/ontology/")) .
-                    FILTER (lang(?label) = "en") .
-                    FILTER (lang(?comment) = "en")
+                    FILTER (!strstarts(str(?subject), "http://dbpedia.org/resource/")) .
+                    FILTER (lang(?label) = "en")
                 }
                 ORDER BY ASC(strlen(?label))
-            """ % entity)
-            sparql.setReturnFormat(JSON)
-            sparql.setTimeout(300)
-            response = sparql.query().convert()
-            for item in response["results"]["bindings"]:
-                key = item["subject"]["value"].replace(DBPediaConfig.BASE_RESOURCE_URI, "") if short_name else item["subject"]["value"]
-                results[key] = [item["label"]["value"], item["comment"]["value"]]
-            no_processing_query = False
-        except URLError:
-            no_processing_query = True
-            print("Connection error to DBpedia SPARQL Endpoint! Reconnection is carried out.")
+                LIMIT 10
+                """ % variable_query, DBPediaConfig.SECURE_ENDPOINT_NAME.value, POST, 600)
+            for rs in response["results"]["bindings"]:
+                uri = rs["subject"]["value"].replace(DBPediaConfig.BASE_ONTOLOGY_URI, "") if short_name else rs["subject"]["value"]
+                results[uri] = [rs["label"]["value"], rs["comment"]["value"] if "comment" in rs else None]
+        if results or number == 1 or not deep_search:
+            processing_query = True
+        else:
+            processing_query = False
+            number -= 1
+    return results
+
+
+def get_subjects_for_entity(entity: str, short_name: bool = False) -> Dict[str, List[str]]:
+    if _KNOWLEDGE_BASE is not None:
+        return _KNOWLEDGE_BASE.get_subjects_for_entity(entity, short_name)
+    results = {}
+    # Execute SPARQL query to DBpedia
+    response = execute_query("""
+        SELECT DISTINCT (str(?subject) as ?subject) (str(?label) as ?label) (str(?comment) as ?comment)
+        WHERE {
+            {
+                ?subject ?property <%s> .
+                ?subject rdfs:comment ?comment .
+                ?subject a ?type .
+                ?subject rdfs:label ?label .
+            }
+            FILTER NOT EXISTS { ?subject dbo:wikiPageRedirects ?r2 } .
+            FILTER (!strstarts(str(?subject), "http://dbpedia.org/resource/Category:")) .
+            FILTER (!strstarts(str(?subject), "http://dbpedia.org/property/")) .
+            FILTER (!strstarts(str(?subject), "http://dbpedia.org/ontology/")) .
+            FILTER (!strstarts(str(?property), "http://dbpedia.org/ontology/")) .
+            FILTER (strstarts(str(?type), "http://dbpedia.org/ontology/")) .
+            FILTER (lang(?label) = "en") .
+            FILTER (lang(?comment) = "en")
+        }
+        ORDER BY ASC(strlen(?label))
+    """ % entity)
+    for item in response["results"]["bindings"]:
+        key = item["subject"]["value"].replace(DBPediaConfig.BASE_RESOURCE_URI, "") if short_name else item["subject"]["value"]
+        results[key] = [item["label"]["value"], item["comment"]["value"]]
     return results
 
 
 def get_objects_for_entity(entity: str, short_name: bool = False) -> Dict[str, List[str]]:
-    results, no_processing_query = {}, True
-    while no_processing_query:
+    if _KNOWLEDGE_BASE is not None:
+        return _KNOWLEDGE_BASE.get_objects_for_entity(entity, short_name)
+    results = {}
+    # Execute SPARQL query to DBpedia
+    response = execute_query("""
+        SELECT DISTINCT (str(?object) as ?object) (str(?label) as ?label) (str(?comment) as ?comment)
+        WHERE {
+            {
+                <%s> ?property ?object .
+                ?object rdfs:comment ?comment .
+                ?object a ?type .
+                ?object rdfs:label ?label .
+            }
+            FILTER NOT EXISTS { ?object dbo:wikiPageRedirects ?r2 } .
+            FILTER (!strstarts(str(?object), "http://dbpedia.org/resource/Category:")) .
+            FILTER (!strstarts(str(?object), "http://dbpedia.org/property/")) .
+            FILTER (!strstarts(str(?object), "http://dbpedia.org/ontology/")) .
+            FILTER (!strstarts(str(?property), "http://dbpedia.org/ontology/")) .
+            FILTER (strstarts(str(?type), "http://dbpedia.org/ontology/")) .
+            FILTER (lang(?label) = "en") .
+            FILTER (lang(?comment) = "en")
+        }
+        ORDER BY ASC(strlen(?label))
+    """ % entity)
+    for item in response["results"]["bindings"]:
+        key = item["object"]["value"].replace(DBPediaConfig.BASE_RESOURCE_URI, "") if short_name else item["object"]["value"]
+        results[key] = [item["label"]["value"], item["comment"]["value"]]
+    return results
+
+
+def get_contexts_for_entities(entities: Iterable[str], short_name: bool = False, chunk_size: int = 50,
+                              page_size: int = 10000) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Get contexts (subjects and objects from RDF triples) for many entities at once based on the batched SPARQL queries
+    (with VALUES clause) to DBpedia, where results of each query are read by pages, so they are not truncated by a limit
+    of result rows of an endpoint
+    :param entities: a set of entities from DBpedia
+    :param short_name: flag to enable or disable short entity name display mode (without full URI)
+    :param chunk_size: maximum number of entities in one SPARQL query
+    :param page_size: maximum number of result rows in one page (it must not exceed a limit of 10000 result rows of DBpedia)
+    :return: a dict of context entities with their labels and comments for each entity, where entities which contexts
+    could not be fetched are absent (callers check it to distinguish a failure from an empty context)
+    """
+    if _KNOWLEDGE_BASE is not None:
+        return _KNOWLEDGE_BASE.get_contexts_for_entities(entities, short_name)
+    entities = list(dict.fromkeys(entity for entity in entities if entity))
+    results = {}
+    for i in range(0, len(entities), chunk_size):
+        chunk = entities[i:i + chunk_size]
+        print("Searching contexts for " + str(len(chunk)) + " entities")
         try:
-            # Execute SPARQL query to DBpedia
-            sparql = SPARQLWrapper(DBPediaConfig.ENDPOINT_NAME)
-            sparql.setQuery("""
-                SELECT DISTINCT (str(?object) as ?object) (str(?label) as ?label) (str(?comment) as ?comment)
-                WHERE {
-                    {
-                        <%s> ?property ?object .
-                        ?object rdfs:comment ?comment .
-                        ?object a ?type .
-                        ?object rdfs:label ?label .
-                    }
-                    FILTER NOT EXISTS { ?object dbo:wikiPageRedirects ?r2 } .
-                    FILTER (!strstarts(str(?object), "http://dbpedia.org/resource/Category:")) .
-                    FILTER (!strstarts(str(?object), "http://dbpedia.org/property/")) .
-                    FILTER (!strstarts(str(?object), "http://dbpedia.org/ontology/")) .
-                    FILTER (!strstarts(str(?property), "http://dbpedia.org/ontology/")) .
-                    FILTER (strstarts(str(?type), "http://dbpedia.org/ontology/")) .
-                    FILTER (lang(?label) = "en") .
-                    FILTER (lang(?comment) = "en")
-                }
-                ORDER BY ASC(strlen(?label))
-            """ % entity)
-            sparql.setReturnFormat(JSON)
-            sparql.setTimeout(300)
-            response = sparql.query().convert()
-            for item in response["results"]["bindings"]:
-                key = item["object"]["value"].replace(DBPediaConfig.BASE_RESOURCE_URI, "") if short_name else item["object"]["value"]
-                results[key] = [item["label"]["value"], item["comment"]["value"]]
-            no_processing_query = False
-        except URLError:
-            no_processing_query = True
-            print("Connection error to DBpedia SPARQL Endpoint! Reconnection is carried out.")
+            results.update(_get_contexts_for_chunk(chunk, short_name, page_size))
+        except requests.exceptions.RequestException:
+            print("Connection error to DBpedia SPARQL Endpoint!")
+            # A failed query must not lose contexts of all entities in a chunk, so they are requested one by one
+            if len(chunk) > 1:
+                results.update(get_contexts_for_entities(chunk, short_name, 1, page_size))
     return results
+
+
+def _get_contexts_for_chunk(chunk: List[str], short_name: bool, page_size: int) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Get contexts for a chunk of entities by one SPARQL query, where its results are read page by page
+    :param chunk: a list of entities from DBpedia
+    :param short_name: flag to enable or disable short entity name display mode (without full URI)
+    :param page_size: maximum number of result rows in one page
+    :return: a dict of context entities with their labels and comments for each entity of a chunk
+    """
+    escaped_entities = {escape_iri(entity): entity for entity in chunk}
+    results, offset = {entity: {} for entity in chunk}, 0
+    while True:
+        # Execute SPARQL query to DBpedia (rows are totally ordered, so pages neither overlap nor skip rows)
+        response = execute_query("""
+            SELECT DISTINCT (str(?entity) as ?entity) (str(?neighbour) as ?neighbour) (str(?label) as ?label)
+                (str(?comment) as ?comment)
+            WHERE {
+                VALUES ?entity { %s }
+                { ?neighbour ?property ?entity . } UNION { ?entity ?property ?neighbour . }
+                ?neighbour rdfs:comment ?comment .
+                ?neighbour a ?type .
+                ?neighbour rdfs:label ?label .
+                FILTER NOT EXISTS { ?neighbour dbo:wikiPageRedirects ?r2 } .
+                FILTER (!strstarts(str(?neighbour), "http://dbpedia.org/resource/Category:")) .
+                FILTER (!strstarts(str(?neighbour), "http://dbpedia.org/property/")) .
+                FILTER (!strstarts(str(?neighbour), "http://dbpedia.org/ontology/")) .
+                FILTER (!strstarts(str(?property), "http://dbpedia.org/ontology/")) .
+                FILTER (strstarts(str(?type), "http://dbpedia.org/ontology/")) .
+                FILTER (lang(?label) = "en") .
+                FILTER (lang(?comment) = "en")
+            }
+            ORDER BY ASC(strlen(?label)) ?entity ?neighbour ?label ?comment
+            LIMIT %d
+            OFFSET %d
+        """ % (" ".join("<" + entity + ">" for entity in escaped_entities), page_size, offset),
+            DBPediaConfig.SECURE_ENDPOINT_NAME.value, POST, 600)
+        # Fan out result rows to their entities
+        for item in response["results"]["bindings"]:
+            neighbour = item["neighbour"]["value"]
+            key = neighbour.replace(DBPediaConfig.BASE_RESOURCE_URI, "") if short_name else neighbour
+            entity = escaped_entities.get(item["entity"]["value"], item["entity"]["value"])
+            results.setdefault(entity, {})[key] = [item["label"]["value"], item["comment"]["value"]]
+        if len(response["results"]["bindings"]) < page_size:
+            return results
+        offset += page_size
@@ -0,0 +1,95 @@
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from Levenshtein import distance
+
+
+class FuzzyLabelIndex:
+    """
+    Approximate string matching index over labels of knowledge base concepts based on character trigrams
+    """
+    __slots__ = ("_keys", "_labels", "_normalized_labels", "_postings")
+
+    def __init__(self, labels: Iterable[Tuple[str, str]] = ()):
+        self._keys: List[str] = []
+        self._labels: List[str] = []
+        self._normalized_labels: List[str] = []
+        self._postings: Dict[str, array] = {}
+        for key, label in labels:
+            self.add(key, label)
+
+    def __len__(self):
+        return len(self._labels)
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Normalize a text for approximate matching (lowercase with collapsed whitespaces)
+        :param text: a source text
+        :return: a normalized text
+        """
+        return " ".join(text.lower().split())
+
+    @staticmethod
+    def get_trigrams(text: str) -> List[str]:
+        """
+        Get distinct character trigrams of a normalized text padded at the beginning and the end
+        :param text: a normalized text
+        :return: a list of trigrams
+        """
+        padded = "  " + text + " "
+        return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+    def add(self, key: str, label: str):
+        """
+        Add a label of a concept to an index
+        :param key: a concept key (e.g. an entity URI)
+        :param label: a textual label of a concept
+        """
+        normalized_label = self.normalize(label)
+        if not normalized_label:
+            return
+        identifier = len(self._labels)
+        self._keys.append(key)
+        self._labels.append(label)
+        self._normalized_labels.append(normalized_label)
+        for trigram in self.get_trigrams(normalized_label):
+            postings = self._postings.get(trigram)
+            if postings is None:
+                postings = self._postings[trigram] = array("I")
+            postings.append(identifier)
+
+    def search(self, text: str, max_results: int = 10, max_distance: Optional[int] = None) -> List[Tuple[str, str, int]]:
+        """
+        Find concepts with labels that are close to a text by edit (Levenshtein) distance
+        :param text: a textual mention
+        :param max_results: maximum number of found concepts
+        :param max_distance: maximum edit distance (by default it depends on a text length: one typo per three characters, but
+        at least two typos, so a transposition of two characters is allowed)
+        :return: a list of concept keys with their labels and edit distances ordered by distance
+        """
+        text = self.normalize(text)
+        if not text:
+            return []
+        if max_distance is None:
+            max_distance = max(2, len(text) // 3)
+        trigrams = self.get_trigrams(text)
+        # Count filter: each edit operation destroys no more than three trigrams of a text
+        min_overlap = len(trigrams) - 3 * max_distance
+        overlaps = Counter()
+        for trigram in trigrams:
+            overlaps.update(self._postings.get(trigram, ()))
+        best = {}
+        for identifier, overlap in overlaps.items():
+            if overlap < min_overlap:
+                continue
+            normalized_label = self._normalized_labels[identifier]
+            if abs(len(normalized_label) - len(text)) > max_distance:
+                continue
+            label_distance = distance(text, normalized_label)
+            key = self._keys[identifier]
+            if label_distance <= max_distance and (key not in best or label_distance < best[key][1]):
+                best[key] = (self._labels[identifier], label_distance)
+        ranked = sorted(best.items(), key=lambda item: (item[1][1], len(item[1][0])))[:max_results]
+        return [(key, label, label_distance) for key, (label, label_distance) in ranked]
@@ -0,0 +1,479 @@
+import argparse
+import bz2
+import gzip
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from tabbyld2.config import KnowledgeBaseConfig
+from tabbyld2.helpers.cache import LRUCache
+from tabbyld2.preprocessing.cleaner import check_letter_and_digit_existence
+from tabbyld2.table_annotation.abstract import AbstractKnowledgeBase
+from tabbyld2.table_annotation.dbpedia_sparql_endpoint import DBPediaConfig, generate_ngrams
+
+
+class Vocabulary:
+    RDF_TYPE = "http://www.w3.org/1999/02/22-rdf-syntax-ns#type"
+    RDFS_LABEL = "http://www.w3.org/2000/01/rdf-schema#label"
+    RDFS_COMMENT = "http://www.w3.org/2000/01/rdf-schema#comment"
+    RDFS_SUBCLASS_OF = "http://www.w3.org/2000/01/rdf-schema#subClassOf"
+    OWL_CLASS = "http://www.w3.org/2002/07/owl#Class"
+    WIKI_PAGE_REDIRECTS = "http://dbpedia.org/ontology/wikiPageRedirects"
+    CATEGORY_URI = "http://dbpedia.org/resource/Category:"
+    PROPERTY_URI = "http://dbpedia.org/property/"
+
+
+# Pattern of a triple in the N-Triples format (DBpedia dumps in the Turtle format are also written as N-Triples)
+TRIPLE_PATTERN = re.compile(r'^\s*<([^>]*)>\s+<([^>]*)>\s+(?:<([^>]*)>|"((?:[^"\\]|\\.)*)"(?:@([a-zA-Z][\w-]*)|\^\^<[^>]*>)?)\s*\.\s*$')
+ESCAPE_PATTERN = re.compile(r"\\(u[0-9A-Fa-f]{4}|U[0-9A-Fa-f]{8}|.)")
+ESCAPE_CHARACTERS = {"t": "\t", "b": "\b", "n": "\n", "r": "\r", "f": "\f"}
+# Marker of a resource without a memoized identifier (None is memoized for unknown resources)
+MISSING_IDENTIFIER = object()
+
+
+def unescape_literal(literal: str) -> str:
+    """
+    Replace escape sequences in a literal value from the N-Triples format
+    :param literal: an escaped literal value
+    :return: an unescaped literal value
+    """
+    def replace(match):
+        sequence = match.group(1)
+        if sequence[0] in "uU" and len(sequence) > 1:
+            return chr(int(sequence[1:], 16))
+        return ESCAPE_CHARACTERS.get(sequence, sequence)
+    return ESCAPE_PATTERN.sub(replace, literal) if "\\" in literal else literal
+
+
+def parse_triples(file_path: str) -> Iterator[Tuple[str, str, Optional[str], Optional[str], Optional[str]]]:
+    """
+    Parse triples from a file in the N-Triples format (the file can be compressed by bzip2 or gzip)
+    :param file_path: full path to a file
+    :return: an iterator of triples (subject, predicate, object resource, object literal, literal language)
+    """
+    opener = bz2.open if file_path.endswith(".bz2") else gzip.open if file_path.endswith(".gz") else open
+    with opener(file_path, "rt", encoding="utf-8") as file:
+        for line in file:
+            match = TRIPLE_PATTERN.match(line)
+            if match:
+                subject, predicate, resource, literal, language = match.groups()
+                yield subject, predicate, resource, unescape_literal(literal) if literal is not None else None, language
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split a source text into lowercase word tokens
+    :param text: a source text
+    :return: a list of tokens
+    """
+    return re.findall(r"\w+", text.lower())
+
+
+def get_word_groups(mention: str, n: int) -> List[List[str]]:
+    """
+    Get groups of words for full-text search in the same way as the 'bif:contains' query is formed for DBpedia
+    :param mention: a textual mention
+    :param n: a value for N-grams
+    :return: a list of word groups (words of a group are joined by 'AND' and groups are joined by 'OR')
+    """
+    groups = []
+    for ngram in generate_ngrams(mention, n):
+        words = [token for value in ngram if value and check_letter_and_digit_existence(value) and len(value) > 1
+                 for token in tokenize(value)]
+        if words:
+            groups.append(words)
+    return groups
+
+
+def split_uris(uris: Any) -> List[str]:
+    """
+    Get a list of URIs from a text sequence of URIs (e.g. '<uri1>, <uri2>') or from a set of URIs
+    :param uris: a text sequence of URIs or a set of URIs
+    :return: a list of URIs
+    """
+    if isinstance(uris, str):
+        return re.findall(r"[^\s<>,]+", uris)
+    return [uri for item in uris for uri in split_uris(item)]
+
+
+class LocalKnowledgeBase(AbstractKnowledgeBase):
+    """
+    Knowledge base that answers queries locally based on a subset of DBpedia stored in SQLite, where a database file must
+    exist unless it is created for loading dump files
+    """
+    __slots__ = ("_path", "_local", "_lock", "_indexed", "_identifiers")
+
+    def __init__(self, path: str, create: bool = False):
+        # A mistyped path must not silently create an empty database (only a loader of dump files creates a new one)
+        if not create and not os.path.isfile(path):
+            raise FileNotFoundError("Local knowledge base file is not found: " + path)
+        self._path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._indexed = False
+        self._identifiers = LRUCache(KnowledgeBaseConfig.IDENTIFIER_CACHE_SIZE)
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        # Each thread uses its own connection to the same database
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            connection = sqlite3.connect(self.path)
+            self._create_schema(connection)
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _create_schema(connection: sqlite3.Connection):
+        """
+        Create tables and indexes of a knowledge base
+        :param connection: a database connection
+        """
+        connection.executescript("""
+            CREATE TABLE IF NOT EXISTS resources (id INTEGER PRIMARY KEY, uri TEXT NOT NULL UNIQUE);
+            CREATE TABLE IF NOT EXISTS triples (
+                subject INTEGER NOT NULL,
+                predicate INTEGER NOT NULL,
+                object INTEGER NOT NULL,
+                PRIMARY KEY (subject, predicate, object)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS triples_predicate_object ON triples (predicate, object);
+            CREATE INDEX IF NOT EXISTS triples_object_subject ON triples (object, subject);
+            CREATE TABLE IF NOT EXISTS literals (
+                subject INTEGER NOT NULL,
+                predicate INTEGER NOT NULL,
+                value TEXT NOT NULL,
+                language TEXT
+            );
+            CREATE INDEX IF NOT EXISTS literals_subject_predicate ON literals (subject, predicate);
+            CREATE INDEX IF NOT EXISTS literals_predicate ON literals (predicate);
+            CREATE VIRTUAL TABLE IF NOT EXISTS label_index USING fts5 (label, resource UNINDEXED, entity UNINDEXED);
+        """)
+        connection.commit()
+
+    def load(self, file_paths: Iterable[str], languages: Tuple[str, ...] = ("en",), batch_size: int = 100000):
+        """
+        Load triples from DBpedia dump files in the N-Triples format into a knowledge base
+        :param file_paths: full paths to dump files
+        :param languages: languages of literals to load (literals without language are always loaded)
+        :param batch_size: number of triples inserted in one transaction
+        """
+        connection, identifiers = self.connection, {}
+
+        def get_identifier(uri: str) -> int:
+            if uri not in identifiers:
+                connection.execute("INSERT OR IGNORE INTO resources (uri) VALUES (?)", (uri,))
+                identifiers[uri] = connection.execute("SELECT id FROM resources WHERE uri = ?", (uri,)).fetchone()[0]
+            return identifiers[uri]
+
+        for file_path in file_paths:
+            print("Loading triples from " + file_path)
+            triples, literals, number = [], [], 0
+            for subject, predicate, resource, literal, language in parse_triples(file_path):
+                if resource is not None:
+                    triples.append((get_identifier(subject), get_identifier(predicate), get_identifier(resource)))
+                elif language is None or language in languages:
+                    literals.append((get_identifier(subject), get_identifier(predicate), literal, language))
+                if len(triples) + len(literals) >= batch_size:
+                    number += self._insert(triples, literals)
+                    triples, literals = [], []
+            number += self._insert(triples, literals)
+            print(str(number) + " triples are loaded from " + file_path)
+        self._identifiers.clear()
+        self.build_label_index()
+
+    def build_label_index(self):
+        """
+        Build a full-text (FTS5) index over english labels of resources, where labels of redirect pages point to target entities
+        """
+        print("Building a full-text index of labels")
+        connection = self.connection
+        connection.execute("DELETE FROM label_index")
+        connection.execute("""
+            INSERT INTO label_index (label, resource, entity)
+            SELECT literals.value, literals.subject, COALESCE(triples.object, literals.subject) FROM literals
+            LEFT JOIN triples ON triples.subject = literals.subject AND triples.predicate = ?
+            WHERE literals.predicate = ? AND literals.language = 'en'
+        """, (self._get_identifier(Vocabulary.WIKI_PAGE_REDIRECTS), self._get_identifier(Vocabulary.RDFS_LABEL)))
+        connection.execute("INSERT INTO label_index (label_index) VALUES ('optimize')")
+        connection.commit()
+        self._indexed = True
+
+    def _check_label_index(self):
+        """
+        Build a full-text index of labels once for a knowledge base loaded without it
+        """
+        if not self._indexed:
+            with self._lock:
+                if not self._indexed:
+                    if self.connection.execute("SELECT 1 FROM label_index LIMIT 1").fetchone() is None:
+                        self.build_label_index()
+                    self._indexed = True
+
+    def _insert(self, triples: List[Tuple[int, int, int]], literals: List[Tuple[int, int, str, Optional[str]]]) -> int:
+        """
+        Insert a batch of triples into a knowledge base
+        :param triples: a list of triples with resource objects
+        :param literals: a list of triples with literal objects
+        :return: number of inserted triples
+        """
+        self.connection.executemany("INSERT OR IGNORE INTO triples (subject, predicate, object) VALUES (?, ?, ?)", triples)
+        self.connection.executemany("INSERT INTO literals (subject, predicate, value, language) VALUES (?, ?, ?, ?)", literals)
+        self.connection.commit()
+        return len(triples) + len(literals)
+
+    def _get_identifier(self, uri: str) -> Optional[int]:
+        """
+        Get an internal identifier of a resource
+        :param uri: a resource URI
+        :return: an identifier or None if there is no such resource
+        """
+        identifier = self._identifiers.get(uri, MISSING_IDENTIFIER)
+        if identifier is MISSING_IDENTIFIER:
+            row = self.connection.execute("SELECT id FROM resources WHERE uri = ?", (uri,)).fetchone()
+            identifier = row[0] if row is not None else None
+            self._identifiers.set(uri, identifier)
+        return identifier
+
+    def _get_uri(self, identifier: int) -> str:
+        return self.connection.execute("SELECT uri FROM resources WHERE id = ?", (identifier,)).fetchone()[0]
+
+    def _get_objects(self, subject: int, predicate: str) -> List[int]:
+        return [row[0] for row in self.connection.execute("SELECT object FROM triples WHERE subject = ? AND predicate = ?",
+                                                          (subject, self._get_identifier(predicate)))]
+
+    def _get_subjects(self, predicate: str, resource: int) -> List[int]:
+        return [row[0] for row in self.connection.execute("SELECT subject FROM triples WHERE predicate = ? AND object = ?",
+                                                          (self._get_identifier(predicate), resource))]
+
+    def _get_literal(self, subject: int, predicate: str, language: Optional[str] = "en") -> Optional[str]:
+        row = self.connection.execute("SELECT value FROM literals WHERE subject = ? AND predicate = ? AND language IS ? LIMIT 1",
+                                      (subject, self._get_identifier(predicate), language)).fetchone()
+        return row[0] if row is not None else None
+
+    def _get_uris(self, identifiers: Iterable[int]) -> List[str]:
+        return [self._get_uri(identifier) for identifier in identifiers]
+
+    def get_labels(self) -> Iterator[Tuple[str, str]]:
+        """
+        Get english labels of all entities including labels of their redirect pages
+        :return: pairs of an entity URI and its label
+        """
+        self._check_label_index()
+        rows = self.connection.execute("""
+            SELECT resources.uri, label_index.label FROM label_index JOIN resources ON resources.id = label_index.entity
+        """)
+        for uri, label in rows:
+            if uri.startswith(DBPediaConfig.BASE_RESOURCE_URI.value) and not uri.startswith(Vocabulary.CATEGORY_URI):
+                yield uri, label
+
+    def _search_labels(self, word_groups: List[List[str]]) -> Iterator[Tuple[int, str]]:
+        """
+        Find resources with english labels (or labels of their redirect pages) that contain all words of at least one word group
+        :param word_groups: a list of word groups
+        :return: resources with their labels ranked by BM25 and then by label length
+        """
+        self._check_label_index()
+        # Words of a group are joined by 'AND' and groups are joined by 'OR' as in the 'bif:contains' query
+        query = " OR ".join("(" + " AND ".join('"' + word + '"' for word in words) + ")" for words in word_groups if words)
+        if not query:
+            return
+        rows = self.connection.execute("""
+            SELECT resource, entity, label FROM label_index WHERE label_index MATCH ? ORDER BY bm25(label_index), length(label)
+        """, (query,))
+        found = set()
+        for resource, entity, label in rows:
+            if entity not in found:
+                found.add(entity)
+                yield entity, label if resource == entity else self._get_literal(entity, Vocabulary.RDFS_LABEL) or label
+
+    def _is_entity(self, resource: int, uri: str) -> bool:
+        """
+        Check that a resource is a DBpedia entity (not a redirect, category, property or ontology resource and has an ontology type)
+        :param resource: a resource identifier
+        :param uri: a resource URI
+        :return: True if a resource is an entity, False otherwise
+        """
+        if uri.startswith((Vocabulary.CATEGORY_URI, Vocabulary.PROPERTY_URI, DBPediaConfig.BASE_ONTOLOGY_URI.value)):
+            return False
+        if self._get_objects(resource, Vocabulary.WIKI_PAGE_REDIRECTS):
+            return False
+        return any(uri.startswith(DBPediaConfig.BASE_ONTOLOGY_URI.value) for uri in self._get_uris(self._get_objects(resource,
+                                                                                                                    Vocabulary.RDF_TYPE)))
+
+    def _search_with_deep_search(self, mention: str, deep_search: bool, search) -> Dict[str, List]:
+        """
+        Search concepts by decreasing N-grams of a mention until something is found
+        :param mention: a textual mention
+        :param deep_search: flag to enable or disable deep search mode by various combinations of words
+        :param search: a function that searches concepts by word groups
+        :return: a dict of found concepts
+        """
+        results, number = {}, len(re.split(r"[\\/,.'* ]+", mention))
+        while True:
+            word_groups = get_word_groups(mention, number)
+            if word_groups:
+                results = search(word_groups)
+            if results or number <= 1 or not deep_search:
+                return results
+            number -= 1
+
+    def get_candidate_entities(self, entity_mention: str = "", deep_search: bool = True, short_name: bool = False) \
+            -> Dict[str, List[str]]:
+        def search(word_groups: List[List[str]]) -> Dict[str, List]:
+            results = {}
+            for resource, label in self._search_labels(word_groups):
+                uri = self._get_uri(resource)
+                comment = self._get_literal(resource, Vocabulary.RDFS_COMMENT)
+                if comment is None or not self._is_entity(resource, uri):
+                    continue
+                redirects = self._get_uris(self._get_subjects(Vocabulary.WIKI_PAGE_REDIRECTS, resource))
+                results[uri.replace(DBPediaConfig.BASE_RESOURCE_URI, "") if short_name else uri] = [label, comment, redirects]
+                if len(results) >= 100:
+                    break
+            return results
+        return self._search_with_deep_search(entity_mention, deep_search, search)
+
+    def lookup_candidate_entities(self, query: str, max_results: int = None, short_name: bool = False) -> Dict[str, List[str]]:
+        results = {}
+        tokens = [token for token in tokenize(query) if len(token) > 1]
+        for resource, label in self._search_labels([[token] for token in tokens]):
+            if max_results is not None and len(results) >= max_results:
+                break
+            uri = self._get_uri(resource)
+            if not self._is_entity(resource, uri):
+                continue
+            redirects = self._get_uris(self._get_subjects(Vocabulary.WIKI_PAGE_REDIRECTS, resource))
+            results[uri.replace(DBPediaConfig.BASE_RESOURCE_URI, "") if short_name else uri] = [label, "", redirects]
+        return results
+
+    def get_candidate_classes(self, class_mention: str = "", deep_search: bool = True, short_name: bool = False) -> Dict[str, List[str]]:
+        def search(word_groups: List[List[str]]) -> Dict[str, List]:
+            results = {}
+            owl_class = self._get_identifier(Vocabulary.OWL_CLASS)
+            for resource, label in self._search_labels(word_groups):
+                uri = self._get_uri(resource)
+                if owl_class not in self._get_objects(resource, Vocabulary.RDF_TYPE) or uri.startswith(
+                        (Vocabulary.CATEGORY_URI, Vocabulary.PROPERTY_URI, DBPediaConfig.BASE_RESOURCE_URI.value)):
+                    continue
+                comment = self._get_literal(resource, Vocabulary.RDFS_COMMENT)
+                results[uri.replace(DBPediaConfig.BASE_ONTOLOGY_URI, "") if short_name else uri] = [label, comment]
+                if len(results) >= 10:
+                    break
+            return results
+        return self._search_with_deep_search(class_mention, deep_search, search)
+
+    def get_classes_for_entities(self, entities: Iterable[str], short_name: bool = False) -> Dict[str, Dict[str, List]]:
+        results = {}
+        for entity in entities:
+            results[entity], resource = {}, self._get_identifier(entity)
+            if resource is None:
+                continue
+            for class_resource in self._get_objects(resource, Vocabulary.RDF_TYPE):
+                class_uri = self._get_uri(class_resource)
+                label = self._get_literal(class_resource, Vocabulary.RDFS_LABEL)
+                if class_uri.startswith(DBPediaConfig.BASE_ONTOLOGY_URI.value) and label is not None:
+                    key = class_uri.replace(DBPediaConfig.BASE_ONTOLOGY_URI, "") if short_name else class_uri
+                    results[entity][key] = [label, self._get_literal(class_resource, Vocabulary.RDFS_COMMENT)]
+        return results
+
+    def _get_ancestors(self, resources: Iterable[int]) -> List[int]:
+        """
+        Get all superclasses of classes including classes themselves (rdfs:subClassOf*)
+        :param resources: class identifiers
+        :return: a list of class identifiers
+        """
+        ancestors, stack = set(), list(resources)
+        while stack:
+            resource = stack.pop()
+            if resource not in ancestors:
+                ancestors.add(resource)
+                stack.extend(self._get_objects(resource, Vocabulary.RDFS_SUBCLASS_OF))
+        return list(ancestors)
+
+    def get_class_hierarchy(self) -> List[Tuple[str, str]]:
+        rows = self.connection.execute("""
+            SELECT child.uri, parent.uri FROM triples
+            JOIN resources AS child ON child.id = triples.subject
+            JOIN resources AS parent ON parent.id = triples.object
+            WHERE triples.predicate = ?
+        """, (self._get_identifier(Vocabulary.RDFS_SUBCLASS_OF),))
+        return [(child, parent) for child, parent in rows if child.startswith(DBPediaConfig.BASE_ONTOLOGY_URI.value)]
+
+    def get_parent_classes(self, dbpedia_class: str = "", short_name: bool = False) -> Tuple[str, ...]:
+        resource = self._get_identifier(dbpedia_class)
+        if resource is None:
+            return ()
+        class_uris = [uri for uri in self._get_uris(self._get_ancestors([resource]))
+                      if uri.startswith(DBPediaConfig.BASE_ONTOLOGY_URI.value)]
+        return tuple(uri.replace(DBPediaConfig.BASE_ONTOLOGY_URI, "") if short_name else uri for uri in class_uris)
+
+    def get_distance_to_class(self, entity: str = "", target_classes: Any = None) -> int:
+        resource = self._get_identifier(entity)
+        if resource is None or target_classes is None:
+            return 0
+        targets = {self._get_identifier(uri) for uri in split_uris(target_classes)} - {None}
+        # Count entity classes (with their superclasses) that are subclasses of target classes
+        return sum(1 for ancestor in self._get_ancestors(self._get_objects(resource, Vocabulary.RDF_TYPE))
+                   if targets.intersection(self._get_ancestors([ancestor])))
+
+    def get_redirects(self, entities: Iterable[str]) -> Tuple[str, ...]:
+        redirects = []
+        for uri in split_uris(entities):
+            resource = self._get_identifier(uri)
+            if resource is not None:
+                redirects.extend(self._get_uris(self._get_subjects(Vocabulary.WIKI_PAGE_REDIRECTS, resource)))
+        return tuple(dict.fromkeys(redirects))
+
+    def _get_neighbours(self, neighbours: Iterable[Tuple[int, int]], short_name: bool) -> Dict[str, List[str]]:
+        """
+        Describe neighbour entities of an entity by their labels and comments
+        :param neighbours: pairs of property and neighbour entity identifiers
+        :param short_name: flag to enable or disable short entity name display mode (without full URI)
+        :return: a dict of neighbour entities with their labels and comments ordered by label length
+        """
+        results = {}
+        for predicate, resource in neighbours:
+            if self._get_uri(predicate).startswith(DBPediaConfig.BASE_ONTOLOGY_URI.value):
+                continue
+            uri = self._get_uri(resource)
+            label, comment = self._get_literal(resource, Vocabulary.RDFS_LABEL), self._get_literal(resource, Vocabulary.RDFS_COMMENT)
+            if label is not None and comment is not None and self._is_entity(resource, uri):
+                results[uri.replace(DBPediaConfig.BASE_RESOURCE_URI, "") if short_name else uri] = [label, comment]
+        return dict(sorted(results.items(), key=lambda item: len(item[1][0])))
+
+    def get_subjects_for_entity(self, entity: str, short_name: bool = False) -> Dict[str, List[str]]:
+        resource = self._get_identifier(entity)
+        if resource is None:
+            return {}
+        rows = self.connection.execute("SELECT predicate, subject FROM triples WHERE object = ?", (resource,)).fetchall()
+        return self._get_neighbours(rows, short_name)
+
+    def get_objects_for_entity(self, entity: str, short_name: bool = False) -> Dict[str, List[str]]:
+        resource = self._get_identifier(entity)
+        if resource is None:
+            return {}
+        rows = self.connection.execute("SELECT predicate, object FROM triples WHERE subject = ?", (resource,)).fetchall()
+        return self._get_neighbours(rows, short_name)
+
+    def get_contexts_for_entities(self, entities: Iterable[str], short_name: bool = False) -> Dict[str, Dict[str, List[str]]]:
+        return {entity: {**self.get_subjects_for_entity(entity, short_name), **self.get_objects_for_entity(entity, short_name)}
+                for entity in entities}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load DBpedia dump files in the N-Triples format into a local knowledge base")
+    parser.add_argument("database", type=str, help="full path to a SQLite database file of a local knowledge base")
+    parser.add_argument("dumps", type=str, nargs="+", help="full paths to dump files (*.nt, *.ttl, optionally compressed by bz2 or gz)")
+    parser.add_argument("--languages", type=str, nargs="+", default=["en"], help="languages of literals to load")
+    arguments = parser.parse_args()
+    LocalKnowledgeBase(arguments.database, create=True).load(arguments.dumps, tuple(arguments.languages))
@@ -0,0 +1,117 @@
+import threading
+from enum import Enum
+from typing import Any, Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+from tabbyld2.table_annotation.dbpedia_sparql_endpoint import get_class_hierarchy
+
+
+class OntologyHierarchy:
+    """
+    In-memory index of an ontology class hierarchy (DAG) with precomputed ancestor sets for constant time subclass checks
+    """
+    __slots__ = ("_parents", "_ancestors")
+
+    def __init__(self, subclass_relations: Iterable[Tuple[str, str]] = ()):
+        self._parents: Dict[str, Set[str]] = {}
+        for subclass, superclass in subclass_relations:
+            self._parents.setdefault(subclass, set()).add(superclass)
+            self._parents.setdefault(superclass, set())
+        self._ancestors: Dict[str, FrozenSet[str]] = {}
+        for ontology_class in self._parents:
+            self._ancestors[ontology_class] = self._collect_ancestors(ontology_class)
+
+    @property
+    def classes(self):
+        return self._parents.keys()
+
+    def _collect_ancestors(self, ontology_class: str) -> FrozenSet[str]:
+        """
+        Collect all ancestors of a class (including the class itself) by a depth-first traversal tolerant to cycles
+        :param ontology_class: a class URI
+        :return: a set of ancestor class URIs
+        """
+        ancestors, stack = set(), [ontology_class]
+        while stack:
+            current_class = stack.pop()
+            if current_class not in ancestors:
+                ancestors.add(current_class)
+                if current_class in self._ancestors:
+                    ancestors.update(self._ancestors[current_class])
+                else:
+                    stack.extend(self._parents.get(current_class, ()))
+        return frozenset(ancestors)
+
+    @staticmethod
+    def normalize_classes(target_classes: Any) -> Set[str]:
+        """
+        Normalize target classes (a class, an enumeration member or a list of them) to a set of class URIs
+        :param target_classes: a class or a set of classes
+        :return: a set of class URIs
+        """
+        if target_classes is None:
+            return set()
+        if isinstance(target_classes, str):
+            target_classes = [target_classes]
+        return {target_class.value if isinstance(target_class, Enum) else target_class for target_class in target_classes}
+
+    def get_ancestors(self, ontology_class: str) -> FrozenSet[str]:
+        """
+        Get all ancestors of a class including the class itself
+        :param ontology_class: a class URI
+        :return: a set of ancestor class URIs
+        """
+        return self._ancestors.get(ontology_class, frozenset((ontology_class,)))
+
+    def is_subclass_of(self, ontology_class: str, target_class: str) -> bool:
+        """
+        Check whether a class is a target class or its (transitive) subclass
+        :param ontology_class: a class URI
+        :param target_class: a target class URI
+        :return: True if a class is subsumed by a target class, otherwise False
+        """
+        return target_class in self.get_ancestors(ontology_class)
+
+    def get_distance_to_class(self, entity_classes: Iterable[str], target_classes: Any = None) -> int:
+        """
+        Get a distance to target classes for an entity with known classes, that is the number of entity classes and their
+        ancestors which are subsumed by any of target classes (the same value as the SPARQL based distance to class)
+        :param entity_classes: a set of entity class URIs
+        :param target_classes: a target class or a set of target classes
+        :return: a distance to a target class (non-negative integer including zero)
+        """
+        target_classes = self.normalize_classes(target_classes)
+        if not target_classes:
+            return 0
+        types = set()
+        for entity_class in entity_classes:
+            types.update(self.get_ancestors(entity_class))
+        return sum(1 for entity_class in types if not target_classes.isdisjoint(self.get_ancestors(entity_class)))
+
+
+_ONTOLOGY_HIERARCHY: Optional[OntologyHierarchy] = None
+_ONTOLOGY_HIERARCHY_LOCK = threading.Lock()
+
+
+def get_ontology_hierarchy() -> OntologyHierarchy:
+    """
+    Get an index of the ontology class hierarchy which is built once per process from the current knowledge base, where
+    an empty hierarchy is not memoized (it is requested again on next call) and connection errors are raised
+    :return: an ontology hierarchy index
+    """
+    global _ONTOLOGY_HIERARCHY
+    with _ONTOLOGY_HIERARCHY_LOCK:
+        if _ONTOLOGY_HIERARCHY is not None:
+            return _ONTOLOGY_HIERARCHY
+        ontology_hierarchy = OntologyHierarchy(get_class_hierarchy())
+        if ontology_hierarchy.classes:
+            _ONTOLOGY_HIERARCHY = ontology_hierarchy
+        return ontology_hierarchy
+
+
+def reset_ontology_hierarchy():
+    """
+    Drop the built index of the ontology class hierarchy (e.g. after switching to another knowledge base)
+    """
+    global _ONTOLOGY_HIERARCHY
+    with _ONTOLOGY_HIERARCHY_LOCK:
+        _ONTOLOGY_HIERARCHY = None
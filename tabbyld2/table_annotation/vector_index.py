@@ -0,0 +1,74 @@
+from typing import Tuple
+
+import numpy as np
+from tabbyld2.table_annotation.abstract import AbstractVectorIndex
+
+try:
+    import hnswlib
+except ImportError:
+    hnswlib = None
+
+
+class HNSWVectorIndex(AbstractVectorIndex):
+    """
+    Approximate nearest neighbour index based on hierarchical navigable small world graphs (requires hnswlib)
+    """
+    __slots__ = ("_index", "_size")
+
+    def __init__(self, vectors: np.ndarray, ef_construction: int = 200, m: int = 16):
+        self._size = len(vectors)
+        self._index = hnswlib.Index(space="ip", dim=vectors.shape[1])
+        self._index.init_index(max_elements=max(1, self._size), ef_construction=ef_construction, M=m)
+        self._index.add_items(vectors, np.arange(self._size))
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        k = min(k, self._size)
+        self._index.set_ef(max(k, 50))
+        indexes, distances = self._index.knn_query(queries, k=k)
+        return indexes.astype(np.int64), 1 - distances  # Inner product distance is 1 - similarity
+
+
+class IVFVectorIndex(AbstractVectorIndex):
+    """
+    Approximate nearest neighbour index based on inverted lists of spherical k-means clusters (NumPy only)
+    """
+    __slots__ = ("_vectors", "_centroids", "_lists", "_probes")
+
+    def __init__(self, vectors: np.ndarray, lists_number: int = None, probes: int = 8, iterations: int = 10, seed: int = 0):
+        self._vectors = vectors
+        lists_number = max(1, min(len(vectors), lists_number or int(np.sqrt(len(vectors)))))
+        random = np.random.default_rng(seed)
+        self._centroids = vectors[random.choice(len(vectors), lists_number, replace=False)].copy()
+        assignments = np.zeros(len(vectors), dtype=np.int64)
+        for _ in range(iterations):
+            assignments = np.argmax(vectors @ self._centroids.T, axis=1)
+            for i in range(lists_number):
+                members = vectors[assignments == i]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    norm = np.linalg.norm(centroid)
+                    self._centroids[i] = centroid / norm if norm else centroid
+        self._lists = [np.flatnonzero(assignments == i) for i in range(lists_number)]
+        self._probes = min(probes, lists_number)
+
+    def search(self, queries: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        k = min(k, len(self._vectors))
+        indexes = np.full((len(queries), k), -1, dtype=np.int64)
+        similarities = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        # Search only in inverted lists of clusters with the closest centroids
+        probes = np.argsort(-(queries @ self._centroids.T), axis=1)[:, :self._probes]
+        for i, query in enumerate(queries):
+            candidates = np.concatenate([self._lists[probe] for probe in probes[i]])
+            scores = self._vectors[candidates] @ query
+            top = np.argsort(-scores)[:k]
+            indexes[i, :len(top)], similarities[i, :len(top)] = candidates[top], scores[top]
+        return indexes, similarities
+
+
+def create_vector_index(vectors: np.ndarray) -> AbstractVectorIndex:
+    """
+    Create an approximate nearest neighbour index over normalized vectors (HNSW if hnswlib is installed, otherwise IVF)
+    :param vectors: a matrix of normalized vectors
+    :return: a vector index
+    """
+    return HNSWVectorIndex(vectors) if hnswlib is not None else IVFVectorIndex(vectors)
@@ -0,0 +1,82 @@
+import pytest
+from tabbyld2.helpers import cache
+from tabbyld2.helpers.cache import LRUCache, ResponseCache
+
+
+class Clock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache.time, "time", clock)
+    return clock
+
+
+def test_lru_cache_evicts_least_recently_used_value():
+    lru_cache = LRUCache(2)
+    lru_cache.set("a", 1)
+    lru_cache.set("b", 2)
+    assert lru_cache.get("a") == 1
+    lru_cache.set("c", 3)
+    assert "a" in lru_cache and "c" in lru_cache and "b" not in lru_cache
+    assert len(lru_cache) == 2
+
+
+def test_lru_cache_counts_hits_and_misses():
+    lru_cache = LRUCache()
+    lru_cache.set("a", None)
+    assert lru_cache.get("a", 0) is None
+    assert lru_cache.get("b", 0) == 0
+    assert lru_cache.statistics() == {"size": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+    lru_cache.clear()
+    assert lru_cache.statistics() == {"size": 0, "hits": 0, "misses": 0, "hit_rate": 0}
+
+
+def test_response_cache_normalizes_queries_and_separates_namespaces(tmp_path):
+    response_cache = ResponseCache(str(tmp_path / "cache" / "responses.sqlite"))
+    response_cache.set("SELECT ?s\n  WHERE { ?s ?p ?o }", {"results": ["Moscow"]}, "endpoint")
+    assert response_cache.get("SELECT ?s WHERE { ?s ?p ?o }", "endpoint") == {"results": ["Moscow"]}
+    assert response_cache.get("SELECT ?s WHERE { ?s ?p ?o }", "another endpoint") is None
+    assert response_cache.statistics() == {"size": 1, "hits": 1, "misses": 1, "hit_rate": 0.5}
+
+
+def test_response_cache_is_persistent(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    ResponseCache(path).set("query", [1, 2, 3])
+    response_cache = ResponseCache(path)
+    assert response_cache.get("query") == [1, 2, 3]
+    assert response_cache.statistics()["size"] == 1
+
+
+def test_response_cache_expires_responses_by_ttl(tmp_path, clock):
+    response_cache = ResponseCache(str(tmp_path / "responses.sqlite"), ttl=60)
+    response_cache.set("query", "response")
+    clock.now += 60
+    assert response_cache.get("query") == "response"
+    clock.now += 1
+    # TTL is counted from a time of putting a response, not from a last access
+    assert response_cache.get("query") is None
+    assert response_cache.statistics()["size"] == 0
+
+
+def test_response_cache_evicts_least_recently_accessed_responses(tmp_path, clock):
+    response_cache = ResponseCache(str(tmp_path / "responses.sqlite"), max_entries=2)
+    response_cache.set("first", 1)
+    clock.now += 1
+    response_cache.set("second", 2)
+    clock.now += 1
+    assert response_cache.get("first") == 1
+    clock.now += 1
+    response_cache.set("third", 3)
+    assert response_cache.get("second") is None
+    assert response_cache.get("first") == 1
+    assert response_cache.get("third") == 3
+    # Replacing a cached response does not change cache size
+    response_cache.set("third", 4)
+    assert response_cache.statistics()["size"] == 2
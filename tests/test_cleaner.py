@@ -0,0 +1,37 @@
+import pytest
+from tabbyld2.preprocessing.cleaner import clean_text, clean_values, is_plain_text
+
+
+VALUES = ["Moscow", "  Saint   Petersburg  ", "Moscow", "New York.", "...", "-", "U.S.A.", "12", 12, 1.5, True, "a - b", "x & y",
+          "cafÃ©", "Café de Flore", "Tom &amp; Jerry", "line\nbreak", "Москва", "#1 hit!", "end.."]
+
+
+@pytest.mark.parametrize("text, cleared_text", [
+    ("  Saint   Petersburg  ", "Saint Petersburg"),
+    ("New York.", "New York"),
+    ("a - b", "a b"),
+    ("...", None),
+    ("", None),
+    ("cafÃ©", "café"),
+    ("Tom &amp; Jerry", "Tom Jerry"),
+    (12, "12"),
+])
+def test_clean_text(text, cleared_text):
+    assert clean_text(text) == cleared_text
+
+
+def test_is_plain_text():
+    assert is_plain_text("New York, 1990")
+    assert not is_plain_text("Tom &amp; Jerry")
+    assert not is_plain_text("café")
+    assert not is_plain_text("line\nbreak")
+
+
+@pytest.mark.parametrize("use_pandas", [False, True])
+def test_clean_values_matches_clean_text(use_pandas):
+    assert clean_values(VALUES, use_pandas) == [clean_text(value) for value in VALUES]
+
+
+def test_clean_values_of_empty_column():
+    assert clean_values([], True) == []
+    assert clean_values([], False) == []
@@ -0,0 +1,100 @@
+import pytest
+from tabbyld2.datamodel.columnar_table_model import ColumnarTableModel, ValuePool
+from tabbyld2.helpers.parser import deserialize_table
+from tabbyld2.preprocessing.labels import LiteralLabel, NamedEntityLabel
+
+
+ROWS = [
+    {"City": "Moscow", "Country": "Russia", "Population": "12 655 050", "Flag": 1},
+    {"City": "Saint  Petersburg.", "Country": "Russia", "Population": 5384342, "Flag": 1.0},
+    {"City": "Paris", "Country": "France", "Population": "...", "Flag": True},
+    {"City": "Moscow", "Country": "U.S.A.", "Population": 22, "Flag": "1"},
+    {"City": "cafÃ©", "Country": None, "Population": None, "Flag": "USA"},
+]
+
+
+def make_tables(header_indexes=(0,)):
+    tables = deserialize_table("table", ROWS, columnar=False), deserialize_table("table", ROWS, columnar=True)
+    for table in tables:
+        table.set_header_indexes(header_indexes)
+    return tables
+
+
+def test_deserialize_columnar_table():
+    table_model, columnar_table_model = make_tables()
+    assert isinstance(columnar_table_model, ColumnarTableModel)
+    assert not isinstance(table_model, ColumnarTableModel)
+    assert columnar_table_model.rows_number == table_model.rows_number == len(ROWS)
+    assert columnar_table_model.columns_number == table_model.columns_number == len(ROWS[0])
+
+
+@pytest.mark.parametrize("cleaned", [False, True])
+@pytest.mark.parametrize("header_indexes", [(), (0,), (0, 2)])
+def test_columnar_table_matches_table(cleaned, header_indexes):
+    table_model, columnar_table_model = make_tables(header_indexes)
+    if cleaned:
+        table_model.clean(True)
+        columnar_table_model.clean(True)
+    for column_index in range(table_model.columns_number):
+        for include_header in (False, True):
+            assert columnar_table_model.column(column_index, include_header=include_header) == \
+                table_model.column(column_index, include_header=include_header)
+        if cleaned:
+            # Column profiles are computed for cleared (textual) values
+            profile, columnar_profile = table_model.column_profile(column_index), columnar_table_model.column_profile(column_index)
+            for statistic in ("empty_cell_number", "acronym_cell_number", "unique_cell_number", "word_number"):
+                assert getattr(columnar_profile, statistic) == getattr(profile, statistic)
+        assert columnar_table_model.columns[column_index].header_name == table_model.columns[column_index].header_name
+        for row_index in range(table_model.rows_number):
+            assert columnar_table_model.cell(column_index, row_index) == table_model.cell(column_index, row_index)
+    for row_index in range(table_model.rows_number):
+        assert columnar_table_model.row(row_index) == table_model.row(row_index)
+    assert columnar_table_model.serialize_cleared_table() == table_model.serialize_cleared_table()
+
+
+def test_columnar_table_keeps_types_of_equal_values():
+    _, columnar_table_model = make_tables()
+    cells = columnar_table_model.columns[3].cells
+    source_values = [cell.source_value for cell in cells]
+    assert source_values == [1, 1.0, True, "1", "USA"]
+    assert [type(value) for value in source_values] == [int, float, bool, str, str]
+
+
+def test_columnar_cell_views():
+    _, columnar_table_model = make_tables()
+    columnar_table_model.clean()
+    cell = columnar_table_model.columns[0].cells[1]
+    assert cell == columnar_table_model.columns[0].cells[1]
+    assert cell.cleared_value == "Saint Petersburg"
+    cell.set_label(LiteralLabel.FLOAT)
+    cell.set_candidate_entities([])
+    assert cell.label == LiteralLabel.FLOAT and cell.candidate_entities == []
+    cell.set_candidate_entities(None)
+    assert cell.candidate_entities is None
+    cells = columnar_table_model.columns[0].cells[2:4]
+    assert [cell.cleared_value for cell in cells] == ["Paris", "Moscow"]
+
+
+def test_columnar_cell_deferred_label():
+    _, columnar_table_model = make_tables()
+    cell, calls = columnar_table_model.columns[0].cells[2], []
+
+    def labeler():
+        calls.append(1)
+        cell.set_label(NamedEntityLabel.GPE)
+
+    cell.set_labeler(labeler)
+    assert cell.has_deferred_label
+    assert cell.label == NamedEntityLabel.GPE and cell.label == NamedEntityLabel.GPE
+    assert calls == [1] and not cell.has_deferred_label
+
+
+def test_value_pool():
+    pool = ValuePool()
+    identifiers = [pool.add(value) for value in (1, 1.0, True, "1", 1, ["a", "b"], ("a", "b"))]
+    assert identifiers == [0, 1, 2, 3, 0, 4, 4]
+    assert pool.add(None) == -1 and pool.get(-1) is None
+    assert len(pool) == 5
+    assert [type(pool.get(identifier)) for identifier in identifiers[:4]] == [int, float, bool, str]
+    # A list label is stored as a tuple and returned as a list
+    assert pool.get(identifiers[5]) == ["a", "b"]
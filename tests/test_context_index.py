@@ -0,0 +1,65 @@
+import pytest
+from tabbyld2.helpers.parser import deserialize_table
+from tabbyld2.table_annotation.context_index import TableContextIndex, tokenize
+
+
+ROWS = [
+    {"City": "Moscow", "Country": "Russia", "Capital of": "Russia", "River": "Moskva river"},
+    {"City": "Saint Petersburg", "Country": "Russia", "Capital of": None, "River": "Neva river"},
+    {"City": "Paris", "Country": "France", "Capital of": "France", "River": "Seine"},
+    {"City": "Moscow", "Country": "The United States", "Capital of": None, "River": "Moskva river"},
+    {"City": "...", "Country": "United Kingdom of Great Britain", "Capital of": "United Kingdom", "River": "The Thames"},
+]
+TEXTS = (["Russia", "Moskva river"], ["France", "Seine river"], ["United States of America"], ["Moscow"], ["Berlin"], [])
+
+
+@pytest.fixture
+def table_model():
+    table_model = deserialize_table("table", ROWS)
+    table_model.set_header_indexes([0])
+    table_model.clean(True)
+    return table_model
+
+
+def get_naive_score(table_model, row, column, texts):
+    """
+    Reference implementation: a share of tokens of other cells in a row and a column of a cell that occur in texts
+    """
+    tokens = {token for text in texts for token in tokenize(text)}
+    context = []
+    for column_index, other_column in enumerate(table_model.columns):
+        for row_index, cell in enumerate(other_column.cells):
+            if cell.cleared_value is not None and (row_index == row) != (column_index == column):
+                context.extend(tokenize(cell.cleared_value))
+    return sum(token in tokens for token in context) / len(context) if context else 0
+
+
+def test_tokenize():
+    assert tokenize("The River of  the Moscow, Moscow 2") == ["river", "moscow", "2"]
+    assert tokenize(None) == ["none"]
+
+
+def test_token_ids_contain_only_table_tokens(table_model):
+    context_index = TableContextIndex(table_model)
+    assert len(context_index.get_token_ids(["Berlin", "Germany"])) == 0
+    assert len(context_index.get_token_ids(["Russia", "russia river", "Moscow"])) == 3
+
+
+def test_scores_match_naive_computation(table_model):
+    context_index = TableContextIndex(table_model)
+    positions = [(row, column) for row in range(table_model.rows_number) for column in range(table_model.columns_number)]
+    for texts in TEXTS:
+        token_ids = context_index.get_token_ids(texts)
+        scores = context_index.score([row for row, _ in positions], [column for _, column in positions], [token_ids] * len(positions))
+        for (row, column), score in zip(positions, scores):
+            assert score == pytest.approx(get_naive_score(table_model, row, column, texts))
+
+
+def test_scores_of_cells_with_different_token_sets(table_model):
+    context_index = TableContextIndex(table_model)
+    token_ids = [context_index.get_token_ids(texts) for texts in TEXTS]
+    rows, columns = [1, 2, 3, 4, 1, 2], [0, 1, 3, 0, 2, 3]
+    scores = context_index.score(rows, columns, token_ids)
+    assert scores == pytest.approx([get_naive_score(table_model, row, column, texts)
+                                    for row, column, texts in zip(rows, columns, TEXTS)])
+    assert all(0 <= score <= 1 for score in scores)
@@ -0,0 +1,52 @@
+import numpy as np
+import pytest
+
+
+annotator = pytest.importorskip("tabbyld2.table_annotation.annotator")
+SemanticTableAnnotator = annotator.SemanticTableAnnotator
+
+
+def get_naive_similarities(cells):
+    """
+    Reference implementation: for each candidate entity of a cell, take its maximum cosine similarity with candidate entities
+    of every other cell, then sum these maximums (or take the largest of them if a cell has only one candidate entity)
+    """
+    scores = []
+    for i, cell in enumerate(cells):
+        for vector in cell:
+            maximums = [max(float(vector @ other_vector) for other_vector in other_cell) for j, other_cell in enumerate(cells) if j != i]
+            scores.append((max(maximums) if len(cell) == 1 else sum(maximums)) if maximums else 0)
+    return scores
+
+
+def make_cells(sizes, dimension=8, seed=0):
+    rng = np.random.default_rng(seed)
+    cells = []
+    for size in sizes:
+        vectors = rng.normal(size=(size, dimension)).astype(np.float32)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        # Entities without embeddings are represented by zero vectors
+        vectors[rng.random(size) < 0.15] = 0
+        cells.append(vectors)
+    return cells
+
+
+def get_similarities(cells, block_size=1024):
+    offsets = np.cumsum([0] + [len(cell) for cell in cells[:-1]])
+    return SemanticTableAnnotator._get_cross_cell_similarities(np.concatenate(cells), offsets, block_size)
+
+
+def test_cross_cell_similarities_of_small_table():
+    cells = [np.array([[1, 0], [0, 1]], dtype=np.float32), np.array([[1, 0]], dtype=np.float32),
+             np.array([[0.6, 0.8]], dtype=np.float32)]
+    assert get_similarities(cells) == pytest.approx([1.6, 0.8, 1.0, 0.8])
+
+
+@pytest.mark.parametrize("sizes", [[3, 3, 2, 2, 1, 1], [1, 4, 1, 2], [2, 2, 2], [1, 1], [5]])
+@pytest.mark.parametrize("block_size", [1024, 3])
+def test_cross_cell_similarities_match_naive_computation(sizes, block_size):
+    # Uneven numbers of candidate entities in cells are covered explicitly: the original pairwise loop mixed up
+    # similarities of neighbouring cells in this case
+    for seed in range(5):
+        cells = make_cells(sizes, seed=seed)
+        assert get_similarities(cells, block_size) == pytest.approx(get_naive_similarities(cells), abs=1e-5)
@@ -0,0 +1,76 @@
+from tabbyld2.table_annotation.fuzzy_index import FuzzyLabelIndex
+
+
+LABELS = [
+    ("dbr:Moscow", "Moscow"),
+    ("dbr:Moscow", "Moskva"),
+    ("dbr:Moscow,_Idaho", "Moscow Idaho"),
+    ("dbr:Mosco", "Mosco"),
+    ("dbr:Oslo", "Oslo"),
+    ("dbr:Paris", "Paris"),
+    ("dbr:Paris_Hilton", "Paris  HILTON"),
+    ("dbr:Empty", "   "),
+]
+
+
+def test_index_skips_empty_labels():
+    assert len(FuzzyLabelIndex(LABELS)) == len(LABELS) - 1
+
+
+def test_search_finds_transposition():
+    # A transposition of two characters is two edit operations
+    assert ("dbr:Moscow", "Moscow", 2) in FuzzyLabelIndex(LABELS).search("Mosocw")
+
+
+def test_search_orders_by_distance_and_label_length():
+    results = FuzzyLabelIndex(LABELS).search("Moscow", max_distance=6)
+    assert results[0] == ("dbr:Moscow", "Moscow", 0)
+    assert [key for key, _, _ in results] == ["dbr:Moscow", "dbr:Mosco", "dbr:Moscow,_Idaho"]
+    assert [label_distance for _, _, label_distance in results] == [0, 1, 6]
+
+
+def test_search_keeps_best_label_of_concept():
+    results = FuzzyLabelIndex(LABELS).search("Moskva")
+    assert results[0] == ("dbr:Moscow", "Moskva", 0)
+    assert len([key for key, _, _ in results if key == "dbr:Moscow"]) == 1
+
+
+def test_search_normalizes_texts_and_labels():
+    assert FuzzyLabelIndex(LABELS).search("  paris hilton ", max_results=1) == [("dbr:Paris_Hilton", "Paris  HILTON", 0)]
+
+
+def test_search_limits():
+    fuzzy_index = FuzzyLabelIndex(LABELS)
+    assert fuzzy_index.search("Moscow", max_results=1) == [("dbr:Moscow", "Moscow", 0)]
+    assert fuzzy_index.search("Mosocw", max_distance=1) == []
+    assert fuzzy_index.search("Berlin") == []
+    assert fuzzy_index.search("  ") == []
+
+
+def test_search_matches_brute_force():
+    fuzzy_index = FuzzyLabelIndex(LABELS)
+    for text in ("Moscow", "Mosocw", "Mscow", "Pariss", "Olso", "Paris Hiltn", "Moscow Idaho"):
+        for max_distance in (1, 2, 3):
+            # The index finds only labels that share trigrams with a text, so the count filter is lossless if a text keeps at
+            # least one trigram after max_distance edit operations
+            if len(FuzzyLabelIndex.get_trigrams(FuzzyLabelIndex.normalize(text))) - 3 * max_distance < 1:
+                continue
+            expected = {}
+            for key, label in LABELS:
+                normalized_label = FuzzyLabelIndex.normalize(label)
+                if normalized_label:
+                    label_distance = _levenshtein(FuzzyLabelIndex.normalize(text), normalized_label)
+                    if label_distance <= max_distance:
+                        expected[key] = min(label_distance, expected.get(key, label_distance))
+            results = fuzzy_index.search(text, max_results=len(LABELS), max_distance=max_distance)
+            assert {key: label_distance for key, _, label_distance in results} == expected
+
+
+def _levenshtein(first: str, second: str) -> int:
+    previous = list(range(len(second) + 1))
+    for i, first_char in enumerate(first, 1):
+        current = [i]
+        for j, second_char in enumerate(second, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (first_char != second_char)))
+        previous = current
+    return previous[-1]
@@ -0,0 +1,68 @@
+import re
+
+import pytest
+from tabbyld2.helpers.utility import is_float
+from tabbyld2.preprocessing.labels import LiteralLabel, NamedEntityLabel
+from tabbyld2.preprocessing.literal_detector import COMPLEX_NUMERICAL_PATTERNS, ENTITY_MENTION_PATTERNS, LITERAL_DETECTOR, \
+    NUMBER_PATTERNS
+
+
+VALUES = ("", "0", "7", "-7", "-0", "042", "1990", "12.5", "12,5", "-3.14", "1e5", "abc", "Moscow", "0x1F", "DEADBEEF", "face",
+          "1234-567X", "ISBN 978-3-16-148410-0", "9783161484100", "ISBN: 316148410X", "192.168.0.1", "300.1.1.1",
+          "4111-1111-1111-1111", "4111111111111111", "#ffaa00", "color #FFAA00", "55.75, 37.61", "-33.9,18.4",
+          "+79-123-456-7890", "(495) 123-4567", "123-4567", "36.6 °C", "-40°F", "664025", "12345-6789", "12345 6789",
+          "true", "False", "TRUE story", "a@b.com", "user.name@mail.example.org", "id 42", "ID-7", "ID", "Ideal", "http://a.com",
+          "https://www.example.com/path?x=1", "example.org", "www.site.ru", "2020-01-01", "12/10/2020", "5pm", "N/A", "...",
+          "John Smith", "1.2.3")
+
+
+def search_in_order(patterns, text):
+    """
+    Reference implementation: sequential search of patterns in order of priority
+    """
+    for label, pattern in patterns:
+        if re.search(pattern, text):
+            return label
+    return NamedEntityLabel.NONE
+
+
+@pytest.mark.parametrize("text", VALUES)
+def test_number_matches_sequential_search(text):
+    expected = search_in_order(NUMBER_PATTERNS, text)
+    if expected == NamedEntityLabel.NONE:
+        expected = LiteralLabel.FLOAT if is_float(text) else NamedEntityLabel.NONE
+    assert LITERAL_DETECTOR.determine_number(text) == expected
+
+
+@pytest.mark.parametrize("text", VALUES)
+def test_complex_numerical_values_match_sequential_search(text):
+    assert LITERAL_DETECTOR.determine_complex_numerical_values(text) == search_in_order(COMPLEX_NUMERICAL_PATTERNS, text)
+
+
+@pytest.mark.parametrize("text", VALUES)
+def test_entity_mention_matches_sequential_search(text):
+    assert LITERAL_DETECTOR.determine_entity_mention(text) == search_in_order(ENTITY_MENTION_PATTERNS, text)
+
+
+@pytest.mark.parametrize("text, label", [
+    ("42", LiteralLabel.POSITIVE_INTEGER),
+    ("-42", LiteralLabel.NEGATIVE_INTEGER),
+    ("3.5", LiteralLabel.FLOAT),
+    ("3,5", LiteralLabel.FLOAT),
+    ("True", LiteralLabel.BOOLEAN),
+    ("FALSE", LiteralLabel.BOOLEAN),
+    ("a.b+c@mail.example.org", LiteralLabel.EMAIL),
+    ("https://example.org/a", LiteralLabel.URL),
+    ("www.example.org", LiteralLabel.URL),
+    ("ISBN 9783161484100", LiteralLabel.ISBN),
+    ("192.168.0.1", LiteralLabel.IP_ADDRESS_V4),
+])
+def test_unambiguous_literals(text, label):
+    assert LITERAL_DETECTOR.determine_unambiguous_literal(text) == label
+
+
+@pytest.mark.parametrize("text", ["1990", "2024", "1000", "Moscow", "true story", "5pm", "2020-01-01", "example.org", "300.1.1.1"])
+def test_ambiguous_values_require_named_entity_recognition(text):
+    # Year-like integers are recognized by NER as dates, so they are not unambiguous literals
+    assert LITERAL_DETECTOR.determine_unambiguous_literal(text) == NamedEntityLabel.NONE
+
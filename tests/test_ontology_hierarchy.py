@@ -0,0 +1,95 @@
+from enum import Enum
+
+import pytest
+from tabbyld2.table_annotation import ontology_hierarchy
+from tabbyld2.table_annotation.ontology_hierarchy import OntologyHierarchy, get_ontology_hierarchy, reset_ontology_hierarchy
+
+
+RELATIONS = [
+    ("dbo:City", "dbo:Settlement"),
+    ("dbo:Town", "dbo:Settlement"),
+    ("dbo:Settlement", "dbo:PopulatedPlace"),
+    ("dbo:PopulatedPlace", "dbo:Place"),
+    ("dbo:Country", "dbo:PopulatedPlace"),
+    ("dbo:Capital", "dbo:City"),
+    ("dbo:Capital", "dbo:Administrative"),
+    ("dbo:Person", "dbo:Agent"),
+]
+
+
+class OntologyClass(str, Enum):
+    PLACE = "dbo:Place"
+    AGENT = "dbo:Agent"
+
+
+@pytest.fixture
+def hierarchy():
+    return OntologyHierarchy(RELATIONS)
+
+
+@pytest.fixture
+def reset():
+    reset_ontology_hierarchy()
+    yield
+    reset_ontology_hierarchy()
+
+
+def test_ancestors(hierarchy):
+    assert hierarchy.get_ancestors("dbo:Capital") == {"dbo:Capital", "dbo:City", "dbo:Administrative", "dbo:Settlement",
+                                                      "dbo:PopulatedPlace", "dbo:Place"}
+    assert hierarchy.get_ancestors("dbo:Place") == {"dbo:Place"}
+    assert hierarchy.get_ancestors("dbo:Unknown") == {"dbo:Unknown"}
+    assert len(hierarchy.classes) == 10
+
+
+def test_is_subclass_of(hierarchy):
+    assert hierarchy.is_subclass_of("dbo:Capital", "dbo:Place")
+    assert hierarchy.is_subclass_of("dbo:City", "dbo:City")
+    assert not hierarchy.is_subclass_of("dbo:Settlement", "dbo:City")
+    assert not hierarchy.is_subclass_of("dbo:Person", "dbo:Place")
+
+
+def test_cycles_are_tolerated():
+    hierarchy = OntologyHierarchy([("A", "B"), ("B", "C"), ("C", "A"), ("C", "D")])
+    for ontology_class in ("A", "B", "C"):
+        assert hierarchy.get_ancestors(ontology_class) == {"A", "B", "C", "D"}
+    assert hierarchy.get_ancestors("D") == {"D"}
+
+
+def test_normalize_classes():
+    assert OntologyHierarchy.normalize_classes(None) == set()
+    assert OntologyHierarchy.normalize_classes("dbo:City") == {"dbo:City"}
+    assert OntologyHierarchy.normalize_classes(OntologyClass.PLACE) == {"dbo:Place"}
+    assert OntologyHierarchy.normalize_classes([OntologyClass.AGENT, "dbo:City"]) == {"dbo:Agent", "dbo:City"}
+
+
+@pytest.mark.parametrize("entity_classes, target_classes, distance", [
+    (["dbo:City"], OntologyClass.PLACE, 4),
+    (["dbo:City"], "dbo:Settlement", 2),
+    (["dbo:City", "dbo:Town"], "dbo:Settlement", 3),
+    (["dbo:Capital"], ["dbo:City", "dbo:Administrative"], 3),
+    (["dbo:Person"], OntologyClass.PLACE, 0),
+    (["dbo:Person", "dbo:Country"], [OntologyClass.PLACE, OntologyClass.AGENT], 5),
+    (["dbo:City"], None, 0),
+    ([], "dbo:Place", 0),
+])
+def test_distance_to_class(hierarchy, entity_classes, target_classes, distance):
+    assert hierarchy.get_distance_to_class(entity_classes, target_classes) == distance
+
+
+def test_non_empty_hierarchy_is_memoized(monkeypatch, reset):
+    calls = []
+    monkeypatch.setattr(ontology_hierarchy, "get_class_hierarchy", lambda: calls.append(1) or RELATIONS)
+    assert get_ontology_hierarchy() is get_ontology_hierarchy()
+    assert len(calls) == 1
+    reset_ontology_hierarchy()
+    get_ontology_hierarchy()
+    assert len(calls) == 2
+
+
+def test_empty_hierarchy_is_not_memoized(monkeypatch, reset):
+    responses = [[], RELATIONS]
+    monkeypatch.setattr(ontology_hierarchy, "get_class_hierarchy", lambda: responses.pop(0))
+    assert not get_ontology_hierarchy().classes
+    assert get_ontology_hierarchy().is_subclass_of("dbo:City", "dbo:Place")
+    assert not responses